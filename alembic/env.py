@@ -24,6 +24,17 @@ def get_sync_url():
 
 target_metadata = Base.metadata
 
+# Объекты, которые создаются только миграциями и отсутствуют в моделях
+MIGRATION_ONLY_OBJECTS = {
+    "geog", "ix_buildings_geog",
+    "ix_organizations_name_trgm", "ix_activities_name_trgm", "ix_organization_search_name_trgm",
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Не даём autogenerate удалять объекты, управляемые только миграциями"""
+    return not (reflected and compare_to is None and name in MIGRATION_ONLY_OBJECTS)
+
 
 def run_migrations_offline():
     """Запуск миграций в offline-режиме (alembic downgrade/upgrade --sql)"""
@@ -33,6 +44,7 @@ def run_migrations_offline():
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -45,6 +57,7 @@ def do_run_migrations(connection):
         target_metadata=target_metadata,
         compare_type=True,
         compare_server_default=True,
+        include_object=include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,43 @@
+"""Building geography column with GiST index
+
+Revision ID: 3f1c2a7b9d40
+Revises: 9d97126e2889
+Create Date: 2026-10-18 10:12:05.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7b9d40'
+down_revision: Union[str, Sequence[str], None] = '9d97126e2889'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def postgis_available() -> bool:
+    """PostGIS is optional: on plain Postgres radius search uses the ix_building_coords prefilter"""
+    return bool(op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'")
+    ).scalar())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not postgis_available():
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+    op.execute(
+        "ALTER TABLE buildings ADD COLUMN geog geography(Point, 4326) "
+        "GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED"
+    )
+    op.create_index('ix_buildings_geog', 'buildings', ['geog'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_buildings_geog")
+    op.execute("ALTER TABLE buildings DROP COLUMN IF EXISTS geog")
@@ -0,0 +1,46 @@
+"""Trigram GIN indexes for organization and activity names
+
+Revision ID: 7a4e91c0d2b6
+Revises: 3f1c2a7b9d40
+Create Date: 2026-10-18 11:02:47.530119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4e91c0d2b6'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a7b9d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def pg_trgm_available() -> bool:
+    """pg_trgm ships with the standard contrib package, but is not guaranteed everywhere"""
+    return bool(op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not pg_trgm_available():
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_organizations_name_trgm', 'organizations', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_activities_name_trgm', 'activities', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_activities_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_organizations_name_trgm")
@@ -0,0 +1,91 @@
+"""Lock organizations before refreshing their organization_search rows
+
+Revision ID: a6c2e8d47b19
+Revises: b81f4d6a2c37
+Create Date: 2026-10-19 10:12:44.381507
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e8d47b19'
+down_revision: Union[str, Sequence[str], None] = 'b81f4d6a2c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Without the lock, writers of different source tables for the same organization each upsert
+# a row built from a snapshot taken before the other one committed, and the later upsert wins
+REFRESH_FUNCTION_SQL = """
+        CREATE OR REPLACE FUNCTION refresh_organization_search(ids integer[]) RETURNS void AS $$
+        BEGIN
+            IF ids IS NULL THEN
+                DELETE FROM organization_search s
+                WHERE NOT EXISTS (SELECT 1 FROM organizations o WHERE o.id = s.organization_id);
+                ids := ARRAY(SELECT id FROM organizations);
+            ELSE
+                DELETE FROM organization_search WHERE organization_id = ANY(
+                    ARRAY(SELECT unnest(ids) EXCEPT SELECT id FROM organizations WHERE id = ANY(ids))
+                );
+            END IF;
+            IF cardinality(ids) = 0 THEN
+                RETURN;
+            END IF;
+{lock}
+            INSERT INTO organization_search (
+                organization_id, name, building_id, latitude, longitude, phones, activity_ids, document
+            )
+            SELECT o.id, o.name, o.building_id, b.latitude, b.longitude,
+                   ARRAY(SELECT p.number FROM phones p WHERE p.organization_id = o.id ORDER BY p.id),
+                   ARRAY(SELECT oa.activity_id FROM organization_activity oa
+                         WHERE oa.organization_id = o.id ORDER BY oa.activity_id),
+                   json_build_object(
+                       'id', o.id,
+                       'name', o.name,
+                       'building', CASE WHEN b.id IS NOT NULL THEN json_build_object(
+                           'id', b.id, 'address', b.address, 'latitude', b.latitude, 'longitude', b.longitude
+                       ) END,
+                       'activities', COALESCE((
+                           SELECT json_agg(json_build_object('id', a.id, 'name', a.name, 'parent_id', a.parent_id) ORDER BY a.id)
+                           FROM organization_activity oa JOIN activities a ON a.id = oa.activity_id
+                           WHERE oa.organization_id = o.id
+                       ), '[]'::json),
+                       'phones', COALESCE((
+                           SELECT json_agg(json_build_object('id', p.id, 'number', p.number) ORDER BY p.id)
+                           FROM phones p WHERE p.organization_id = o.id
+                       ), '[]'::json)
+                   )
+            FROM organizations o
+            LEFT JOIN buildings b ON b.id = o.building_id
+            WHERE o.id = ANY(ids)
+            ON CONFLICT (organization_id) DO UPDATE SET
+                name = EXCLUDED.name,
+                building_id = EXCLUDED.building_id,
+                latitude = EXCLUDED.latitude,
+                longitude = EXCLUDED.longitude,
+                phones = EXCLUDED.phones,
+                activity_ids = EXCLUDED.activity_ids,
+                document = EXCLUDED.document;
+        END;
+        $$ LANGUAGE plpgsql
+        SET enable_seqscan = off
+"""
+
+LOCK_SQL = """\
+            -- Held until commit: a concurrent writer of these organizations, to whichever source table,
+            -- refreshes them only once this transaction has committed, from a snapshot that includes it.
+            -- NO KEY UPDATE conflicts with itself but not with the key share locks of foreign key checks
+            PERFORM 1 FROM organizations WHERE id = ANY(ids) ORDER BY id FOR NO KEY UPDATE;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(REFRESH_FUNCTION_SQL.format(lock=LOCK_SQL))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(REFRESH_FUNCTION_SQL.format(lock=""))
@@ -0,0 +1,104 @@
+"""Activity closure table maintained by triggers
+
+Revision ID: b81f4d6a2c37
+Revises: e3b7a9c41f25
+Create Date: 2026-10-18 22:05:37.518340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f4d6a2c37'
+down_revision: Union[str, Sequence[str], None] = 'e3b7a9c41f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'activity_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['activities.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['activities.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index(op.f('ix_activity_closure_descendant_id'), 'activity_closure', ['descendant_id'], unique=False)
+
+    # Pairs are only stale below a moved activity, so the subtrees to recompute come from the
+    # closure itself; deleted activities take their pairs with them through the foreign keys
+    op.execute("""
+        CREATE OR REPLACE FUNCTION refresh_activity_closure(ids integer[]) RETURNS void AS $$
+        BEGIN
+            IF ids IS NULL THEN
+                DELETE FROM activity_closure;
+                ids := ARRAY(SELECT id FROM activities);
+            ELSE
+                ids := ARRAY(
+                    SELECT unnest(ids)
+                    UNION SELECT descendant_id FROM activity_closure WHERE ancestor_id = ANY(ids)
+                );
+                DELETE FROM activity_closure WHERE descendant_id = ANY(ids);
+            END IF;
+
+            INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+            WITH RECURSIVE paths AS (
+                SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth, parent_id
+                FROM activities WHERE id = ANY(ids)
+                UNION ALL
+                SELECT a.id, p.descendant_id, p.depth + 1, a.parent_id
+                FROM paths p JOIN activities a ON a.id = p.parent_id
+            ) CYCLE ancestor_id SET is_cycle USING path
+            SELECT ancestor_id, descendant_id, depth FROM paths;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_activity_closure() RETURNS trigger AS $$
+        DECLARE
+            moved integer;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM refresh_activity_closure(ARRAY(SELECT id FROM new_rows));
+                RETURN NULL;
+            END IF;
+
+            SELECT n.id INTO moved
+            FROM new_rows n JOIN activity_closure c ON c.ancestor_id = n.id AND c.descendant_id = n.parent_id
+            LIMIT 1;
+            IF moved IS NOT NULL THEN
+                RAISE EXCEPTION USING MESSAGE = 'Activity ' || moved || ' cannot be moved under its own descendant';
+            END IF;
+            PERFORM refresh_activity_closure(ARRAY(
+                SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+                WHERE n.parent_id IS DISTINCT FROM o.parent_id
+            ));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER activities_sync_closure_insert AFTER INSERT ON activities "
+        "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION sync_activity_closure()"
+    )
+    op.execute(
+        "CREATE TRIGGER activities_sync_closure_update AFTER UPDATE ON activities "
+        "REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION sync_activity_closure()"
+    )
+    op.execute("SELECT refresh_activity_closure(NULL)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS activities_sync_closure_update ON activities")
+    op.execute("DROP TRIGGER IF EXISTS activities_sync_closure_insert ON activities")
+    op.execute("DROP FUNCTION IF EXISTS sync_activity_closure()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_activity_closure(integer[])")
+    op.drop_index(op.f('ix_activity_closure_descendant_id'), table_name='activity_closure')
+    op.drop_table('activity_closure')
@@ -0,0 +1,175 @@
+"""Denormalized organization_search read model maintained by triggers
+
+Revision ID: e3b7a9c41f25
+Revises: c5d8e2f14a90
+Create Date: 2026-10-18 20:41:12.904217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7a9c41f25'
+down_revision: Union[str, Sequence[str], None] = 'c5d8e2f14a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Organizations affected by the changed rows of each source table, {rows} being a transition table
+SEARCH_SOURCES = {
+    'organizations': "SELECT id FROM {rows}",
+    'phones': "SELECT organization_id FROM {rows}",
+    'organization_activity': "SELECT organization_id FROM {rows}",
+    'buildings': "SELECT organization_id FROM organization_search WHERE building_id IN (SELECT id FROM {rows})",
+    'activities': "SELECT organization_id FROM organization_search WHERE activity_ids && ARRAY(SELECT id FROM {rows})",
+}
+
+TRANSITION_TABLES = {
+    'INSERT': "NEW TABLE AS new_rows",
+    'UPDATE': "NEW TABLE AS new_rows OLD TABLE AS old_rows",
+    'DELETE': "OLD TABLE AS old_rows",
+}
+
+
+def pg_trgm_installed() -> bool:
+    return bool(op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).scalar())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'organization_search',
+        sa.Column('organization_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('building_id', sa.Integer(), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('phones', postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column('activity_ids', postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('document', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('organization_id')
+    )
+    op.create_index('ix_organization_search_building_id', 'organization_search', ['building_id'], unique=False)
+    op.create_index('ix_organization_search_coords', 'organization_search', ['latitude', 'longitude'], unique=False)
+    op.create_index(
+        'ix_organization_search_activity_ids', 'organization_search', ['activity_ids'],
+        unique=False, postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_organization_search_phones', 'organization_search', ['phones'], unique=False, postgresql_using='gin'
+    )
+    # Installed by 7a4e91c0d2b6 where available
+    if pg_trgm_installed():
+        op.create_index(
+            'ix_organization_search_name_trgm', 'organization_search', ['name'], unique=False,
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+        )
+
+    # enable_seqscan = off keeps the per-organization lookups on the indexes when the rows were
+    # written in the same transaction and have no statistics yet
+    op.execute("""
+        CREATE OR REPLACE FUNCTION refresh_organization_search(ids integer[]) RETURNS void AS $$
+        BEGIN
+            IF ids IS NULL THEN
+                DELETE FROM organization_search s
+                WHERE NOT EXISTS (SELECT 1 FROM organizations o WHERE o.id = s.organization_id);
+                ids := ARRAY(SELECT id FROM organizations);
+            ELSE
+                DELETE FROM organization_search WHERE organization_id = ANY(
+                    ARRAY(SELECT unnest(ids) EXCEPT SELECT id FROM organizations WHERE id = ANY(ids))
+                );
+            END IF;
+            IF cardinality(ids) = 0 THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO organization_search (
+                organization_id, name, building_id, latitude, longitude, phones, activity_ids, document
+            )
+            SELECT o.id, o.name, o.building_id, b.latitude, b.longitude,
+                   ARRAY(SELECT p.number FROM phones p WHERE p.organization_id = o.id ORDER BY p.id),
+                   ARRAY(SELECT oa.activity_id FROM organization_activity oa
+                         WHERE oa.organization_id = o.id ORDER BY oa.activity_id),
+                   json_build_object(
+                       'id', o.id,
+                       'name', o.name,
+                       'building', CASE WHEN b.id IS NOT NULL THEN json_build_object(
+                           'id', b.id, 'address', b.address, 'latitude', b.latitude, 'longitude', b.longitude
+                       ) END,
+                       'activities', COALESCE((
+                           SELECT json_agg(json_build_object('id', a.id, 'name', a.name, 'parent_id', a.parent_id) ORDER BY a.id)
+                           FROM organization_activity oa JOIN activities a ON a.id = oa.activity_id
+                           WHERE oa.organization_id = o.id
+                       ), '[]'::json),
+                       'phones', COALESCE((
+                           SELECT json_agg(json_build_object('id', p.id, 'number', p.number) ORDER BY p.id)
+                           FROM phones p WHERE p.organization_id = o.id
+                       ), '[]'::json)
+                   )
+            FROM organizations o
+            LEFT JOIN buildings b ON b.id = o.building_id
+            WHERE o.id = ANY(ids)
+            ON CONFLICT (organization_id) DO UPDATE SET
+                name = EXCLUDED.name,
+                building_id = EXCLUDED.building_id,
+                latitude = EXCLUDED.latitude,
+                longitude = EXCLUDED.longitude,
+                phones = EXCLUDED.phones,
+                activity_ids = EXCLUDED.activity_ids,
+                document = EXCLUDED.document;
+        END;
+        $$ LANGUAGE plpgsql
+        SET enable_seqscan = off
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rebuild_organization_search() RETURNS trigger AS $$
+        BEGIN
+            PERFORM refresh_organization_search(NULL);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table, source in SEARCH_SOURCES.items():
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION sync_organization_search_{table}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    PERFORM refresh_organization_search(ARRAY({source.format(rows='new_rows')}));
+                ELSIF TG_OP = 'DELETE' THEN
+                    PERFORM refresh_organization_search(ARRAY({source.format(rows='old_rows')}));
+                ELSE
+                    PERFORM refresh_organization_search(ARRAY(
+                        {source.format(rows='new_rows')} UNION {source.format(rows='old_rows')}
+                    ));
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        for operation, rows in TRANSITION_TABLES.items():
+            op.execute(
+                f"CREATE TRIGGER {table}_sync_search_{operation.lower()} "
+                f"AFTER {operation} ON {table} REFERENCING {rows} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION sync_organization_search_{table}()"
+            )
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_search_truncate AFTER TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION rebuild_organization_search()"
+        )
+    op.execute("SELECT refresh_organization_search(NULL)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in SEARCH_SOURCES:
+        for operation in (*TRANSITION_TABLES, 'TRUNCATE'):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_search_{operation.lower()} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS sync_organization_search_{table}()")
+    op.execute("DROP FUNCTION IF EXISTS rebuild_organization_search()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_organization_search(integer[])")
+    op.drop_table('organization_search')
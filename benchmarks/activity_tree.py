@@ -0,0 +1,117 @@
+"""Compares database round trips of activity subtree resolution on deep and wide trees.
+
+Usage:
+    python -m benchmarks.activity_tree --fanout 10 --depth 3
+    python -m benchmarks.activity_tree --fanout 2 --depth 12 --level 12
+
+The tree is created inside a transaction that is rolled back at the end,
+so the benchmark leaves the configured database untouched.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from src.cache.activity_tree import ActivityTreeIndex
+from src.config.db import Base
+from src.config.settings import settings
+from src.crud.organization import organization_crud
+from src.models import Activity
+
+
+async def legacy_tree_ids(db: AsyncSession, activity_id: int, level: int) -> List[int]:
+    """Per-node recursive resolution used before the closure table"""
+    if level < 1:
+        return []
+    result = await db.execute(
+        select(Activity)
+        .where(Activity.id == activity_id)
+        .options(selectinload(Activity.children))
+    )
+    activity = result.scalars().first()
+    if not activity:
+        return []
+    ids = [activity.id]
+    if level > 1 and activity.children:
+        for child in activity.children:
+            ids.extend(await legacy_tree_ids(db, child.id, level - 1))
+    return ids
+
+
+async def build_tree(db: AsyncSession, fanout: int, depth: int) -> int:
+    """Inserts a complete tree level by level and returns the root ID"""
+    root_id = (await db.execute(
+        insert(Activity).values(name="bench-root").returning(Activity.id)
+    )).scalar_one()
+    parents = [root_id]
+    for level in range(1, depth):
+        rows = [
+            {"name": f"bench-{level}-{i}", "parent_id": parent_id}
+            for parent_id in parents
+            for i in range(fanout)
+        ]
+        parents = list((await db.execute(
+            insert(Activity).returning(Activity.id), rows
+        )).scalars().all())
+    return root_id
+
+
+async def measure(counter: dict, label: str, coro_factory) -> None:
+    counter["statements"] = 0
+    start = time.perf_counter()
+    ids = await coro_factory()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<16} nodes={len(ids):<8} round_trips={counter['statements']:<8} time={elapsed:.2f}ms")
+
+
+async def _load_and_lookup(index: ActivityTreeIndex, db: AsyncSession, root_id: int, level: int) -> List[int]:
+    await index.load(db)
+    return index.subtree_ids(root_id, level)
+
+
+async def _lookup(index: ActivityTreeIndex, root_id: int, level: int) -> List[int]:
+    return index.subtree_ids(root_id, level)
+
+
+async def main(fanout: int, depth: int, level: int) -> None:
+    engine = create_async_engine(settings.DB_URL)
+    counter = {"statements": 0}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        counter["statements"] += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            root_id = await build_tree(db, fanout, depth)
+            print(f"tree: fanout={fanout} depth={depth} level={level}")
+            await measure(counter, "legacy", lambda: legacy_tree_ids(db, root_id, level))
+            db.expunge_all()
+            await measure(
+                counter, "closure",
+                lambda: organization_crud._get_activity_tree_ids(db, root_id, level)
+            )
+            index = ActivityTreeIndex(settings.MAX_ACTIVITY_DEPTH)
+            await measure(counter, "index_cold", lambda: _load_and_lookup(index, db, root_id, level))
+            await measure(counter, "index_warm", lambda: _lookup(index, root_id, level))
+        finally:
+            await db.close()
+            await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fanout", type=int, default=10, help="Children per activity")
+    parser.add_argument("--depth", type=int, default=3, help="Number of tree levels")
+    parser.add_argument("--level", type=int, default=settings.MAX_ACTIVITY_DEPTH, help="Traversal depth bound")
+    args = parser.parse_args()
+    asyncio.run(main(args.fanout, args.depth, args.level))
@@ -0,0 +1,62 @@
+"""Compares radius queries on the building grid index with a full scan over all buildings.
+
+Usage:
+    python -m benchmarks.building_index
+    python -m benchmarks.building_index --sizes 10000 100000 --radius 2 --queries 50
+
+Buildings are generated in memory around Moscow, no database is required. The full
+scan checks every building with calculate_distance_km, as get_in_radius did before
+the index was introduced.
+"""
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+from src.cache.buildings import BuildingGridIndex
+from src.config.settings import settings
+from src.utils.geo import calculate_distance_km
+
+
+def full_scan(rows: List[Tuple[int, float, float]], lat: float, lng: float, radius_km: float) -> List[int]:
+    return [
+        building_id for building_id, b_lat, b_lng in rows
+        if calculate_distance_km(lat, lng, b_lat, b_lng) <= radius_km
+    ]
+
+
+def timed(queries: List[Tuple[float, float]], search: Callable[[float, float], List[int]]) -> Tuple[float, int]:
+    start = time.perf_counter()
+    found = sum(len(search(lat, lng)) for lat, lng in queries)
+    return (time.perf_counter() - start) * 1000 / len(queries), found
+
+
+def main(sizes: List[int], radius_km: float, query_count: int, cell_size: float) -> None:
+    rng = random.Random(0)
+    queries = [(rng.uniform(55.55, 55.90), rng.uniform(37.35, 37.85)) for _ in range(query_count)]
+    print(f"radius={radius_km}km cell={cell_size}deg queries={query_count}")
+    for size in sizes:
+        rows = [(i, rng.uniform(55.55, 55.90), rng.uniform(37.35, 37.85)) for i in range(size)]
+
+        start = time.perf_counter()
+        index = BuildingGridIndex(cell_size)
+        index.build(rows)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        scan_ms, scan_found = timed(queries, lambda lat, lng: full_scan(rows, lat, lng, radius_km))
+        grid_ms, grid_found = timed(queries, lambda lat, lng: index.within_radius(lat, lng, radius_km))
+        assert scan_found == grid_found, "grid index and full scan disagree"
+        print(
+            f"buildings={size:<9} build={build_ms:9.1f}ms "
+            f"full_scan={scan_ms:9.3f}ms/query grid={grid_ms:7.3f}ms/query "
+            f"speedup={scan_ms / grid_ms:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--radius", type=float, default=1.0, help="Search radius in kilometers")
+    parser.add_argument("--queries", type=int, default=20, help="Number of random query points")
+    parser.add_argument("--cell", type=float, default=settings.BUILDING_INDEX_CELL_DEG, help="Grid cell size in degrees")
+    args = parser.parse_args()
+    main(args.sizes, args.radius, args.queries, args.cell)
@@ -0,0 +1,52 @@
+"""Microbenchmark of the scalar haversine against the vectorized batch version.
+
+Usage:
+    python -m benchmarks.haversine
+    python -m benchmarks.haversine --sizes 1000 100000 --repeat 5
+"""
+import argparse
+import random
+import time
+import numpy as np
+from src.utils.geo import calculate_distance_km, within_radius_km
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main(sizes, repeat: int, radius_km: float) -> None:
+    rng = random.Random(0)
+    lat, lng = 55.751244, 37.618423
+    for size in sizes:
+        points = [(rng.uniform(55.55, 55.90), rng.uniform(37.35, 37.85)) for _ in range(size)]
+        lats = np.array([p[0] for p in points], dtype=np.float64)
+        lngs = np.array([p[1] for p in points], dtype=np.float64)
+
+        scalar_ms = best_of(repeat, lambda: [
+            calculate_distance_km(lat, lng, p_lat, p_lng) <= radius_km for p_lat, p_lng in points
+        ])
+        batch_ms = best_of(repeat, lambda: within_radius_km(lat, lng, lats, lngs, radius_km))
+
+        mask, distances = within_radius_km(lat, lng, lats, lngs, radius_km)
+        expected = np.array([calculate_distance_km(lat, lng, p_lat, p_lng) for p_lat, p_lng in points])
+        assert np.allclose(distances, expected), "batch distances differ from scalar ones"
+
+        print(
+            f"points={size:<9} scalar={scalar_ms:9.3f}ms numpy={batch_ms:8.3f}ms "
+            f"speedup={scalar_ms / batch_ms:6.1f}x in_radius={int(mask.sum())}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--radius", type=float, default=5.0, help="Search radius in kilometers")
+    args = parser.parse_args()
+    main(args.sizes, args.repeat, args.radius)
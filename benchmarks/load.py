@@ -0,0 +1,260 @@
+"""Load test of every organization route at several concurrency levels, with a regression check.
+
+Usage:
+    python -m benchmarks.load --seed --organizations 100000 --activity-depth 4
+    python -m benchmarks.load --concurrency 1,8,32 --requests 500 --save-baseline baseline.json
+    python -m benchmarks.load --concurrency 1,8,32 --requests 500 --baseline baseline.json
+
+Requests go through httpx's ASGI transport straight into the application, so the numbers
+include routing, validation, SQL and serialization but no network. Parameters are drawn from
+a random sample of the catalog in the configured database; ``--seed`` first generates one with
+``src.importer``. For every route and concurrency level the run reports p50/p95/p99 latency,
+throughput and SQL statements per request (from ``X-Query-Count``, not for the streamed export).
+The response cache is off unless ``--response-cache`` is given, so that every request reaches the
+database, and single-flight coalescing is off so that every request counts its own statements.
+
+With ``--baseline`` the run exits with status 1 when a p95 latency grows or a throughput drops
+by more than ``--tolerance``, when a route issues more statements per request or fails
+more often than in the baseline.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from src.config.db import AsyncSessionLocal
+from src.config.settings import settings
+from src.importer import BulkLoader, connect, generate_catalog
+from src.main import app
+from src.utils.profiling import QUERY_COUNT_HEADER, QueryProfilingMiddleware
+
+# Method, path, query parameters and JSON body
+Request = Tuple[str, str, Dict[str, Any], Optional[Dict[str, Any]]]
+# Statement counts include the occasional catalog version lookup, hence some slack
+STATEMENTS_SLACK = 0.5
+
+
+class CatalogSample(NamedTuple):
+    organization_ids: List[int]
+    name_fragments: List[str]
+    building_ids: List[int]
+    coordinates: List[Tuple[float, float]]
+    activity_ids: List[int]
+    activity_names: List[str]
+
+
+class Scenario(NamedTuple):
+    name: str
+    request: Callable[[CatalogSample, random.Random], Request]
+    # Cap for routes that are too heavy to run as often as the others
+    max_requests: Optional[int] = None
+    # Streamed responses send X-Query-Count before their queries run
+    counts_statements: bool = True
+
+
+SCENARIOS = (
+    Scenario("organizations_by_building", lambda s, rng: (
+        "GET", f"/organizations/by_building/{rng.choice(s.building_ids)}", {}, None
+    )),
+    Scenario("organizations_by_activity", lambda s, rng: (
+        "GET", f"/organizations/by_activity/{rng.choice(s.activity_ids)}", {}, None
+    )),
+    Scenario("organizations_by_activity_name", lambda s, rng: (
+        "GET", "/organizations/by_activity_name/", {"name": rng.choice(s.activity_names)}, None
+    )),
+    Scenario("organization_detail", lambda s, rng: (
+        "GET", f"/organizations/{rng.choice(s.organization_ids)}", {}, None
+    )),
+    Scenario("organizations_batch", lambda s, rng: (
+        "POST", "/organizations/batch", {}, {"ids": rng.sample(s.organization_ids, min(50, len(s.organization_ids)))}
+    )),
+    Scenario("organization_search", lambda s, rng: (
+        "GET", "/organizations/search/by_name/", {"name": rng.choice(s.name_fragments)}, None
+    )),
+    Scenario("organization_search_ranked", lambda s, rng: (
+        "GET", "/organizations/search/by_name/", {"name": rng.choice(s.name_fragments), "ranked": "true"}, None
+    )),
+    Scenario("organizations_in_radius", lambda s, rng: (
+        "GET", "/organizations/in_radius/", {**dict(zip(("lat", "lng"), rng.choice(s.coordinates))), "radius": 1}, None
+    )),
+    Scenario("organizations_nearest", lambda s, rng: (
+        "GET", "/organizations/nearest/", {**dict(zip(("lat", "lng"), rng.choice(s.coordinates))), "limit": 10}, None
+    )),
+    Scenario("list_buildings", lambda s, rng: (
+        "GET", "/organizations/buildings/", {"after_id": rng.choice(s.building_ids)}, None
+    )),
+    Scenario(
+        "organizations_export", lambda s, rng: ("GET", "/organizations/export", {}, None),
+        max_requests=3, counts_statements=False
+    ),
+)
+
+
+async def load_sample(size: int) -> CatalogSample:
+    """Random IDs, names and coordinates from the catalog to build request parameters from"""
+    async with AsyncSessionLocal() as db:
+        async def rows(query: str) -> List[Any]:
+            return (await db.execute(text(query), {"size": size})).all()
+
+        organizations = await rows("SELECT id, name FROM organizations ORDER BY random() LIMIT :size")
+        buildings = await rows("SELECT id, latitude, longitude FROM buildings ORDER BY random() LIMIT :size")
+        activities = await rows("SELECT id, name FROM activities ORDER BY random() LIMIT :size")
+    if not (organizations and buildings and activities):
+        raise SystemExit("The catalog is empty, run with --seed first")
+    return CatalogSample(
+        [org_id for org_id, _ in organizations],
+        [name.split()[-1][:4] for _, name in organizations],
+        [building_id for building_id, _, _ in buildings],
+        [(lat, lng) for _, lat, lng in buildings],
+        [activity_id for activity_id, _ in activities],
+        [name[:4] for _, name in activities],
+    )
+
+
+async def run_scenario(
+        client: AsyncClient,
+        scenario: Scenario,
+        sample: CatalogSample,
+        concurrency: int,
+        requests: int,
+        rng: random.Random
+) -> Dict[str, float]:
+    """Sends ``requests`` requests from ``concurrency`` concurrent clients and summarizes them"""
+    requests = max(1, min(requests, scenario.max_requests or requests))
+    queue = [scenario.request(sample, rng) for _ in range(requests)]
+    latencies: List[float] = []
+    statements: List[int] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while queue:
+            method, path, params, body = queue.pop()
+            start = time.perf_counter()
+            response = await client.request(method, path, params=params, json=body)
+            await response.aread()
+            latencies.append(time.perf_counter() - start)
+            statements.append(int(response.headers.get(QUERY_COUNT_HEADER.decode(), 0)))
+            # Random parameters may well match nothing
+            if response.status_code not in (200, 404):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, (50, 95, 99))
+    return {
+        "requests": requests,
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "rps": round(requests / elapsed, 1),
+        "statements": round(sum(statements) / len(statements), 2) if scenario.counts_statements else None,
+        "errors": errors,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Describes every result that is worse than its baseline entry"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {base['rps']} -> {result['rps']} req/s")
+        if result["statements"] is not None and base["statements"] is not None \
+                and result["statements"] > base["statements"] + STATEMENTS_SLACK:
+            regressions.append(f"{key}: statements per request {base['statements']} -> {result['statements']}")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{key}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+async def seed(organizations: int, buildings: Optional[int], activity_depth: Optional[int], workers: int) -> None:
+    conn = await connect()
+    try:
+        stats = await generate_catalog(
+            BulkLoader(conn), organizations, buildings, workers, activity_depth=activity_depth
+        )
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+    print(stats.summary(), file=sys.stderr)
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.seed:
+        await seed(args.organizations, args.buildings, args.activity_depth, args.workers)
+    # Profiling only to count statements: no EXPLAIN, no per-request log lines
+    settings.SQL_PROFILING_EXPLAIN = False
+    settings.SQL_PROFILING_SLOW_MS = float("inf")
+    settings.RESPONSE_CACHE_ENABLED = args.response_cache
+    # Coalesced followers would report none of the statements their leader ran for them
+    settings.SINGLE_FLIGHT_ENABLED = False
+    logging.getLogger("app").setLevel(logging.WARNING)
+    logging.getLogger("app.sql").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.routes or scenario.name in args.routes]
+    rng = random.Random(args.random_seed)
+    results: Dict[str, Dict[str, float]] = {}
+    async with app.router.lifespan_context(app):
+        sample = await load_sample(args.sample_size)
+        transport = ASGITransport(app=QueryProfilingMiddleware(app), raise_app_exceptions=False)
+        async with AsyncClient(transport=transport, base_url="http://bench", headers={"X-API-Key": settings.API_KEY}) as client:
+            for scenario in scenarios:
+                await run_scenario(client, scenario, sample, 1, args.warmup, rng)
+                for concurrency in args.concurrency:
+                    key = f"{scenario.name}@{concurrency}"
+                    results[key] = await run_scenario(client, scenario, sample, concurrency, args.requests, rng)
+                    result = results[key]
+                    statements = "  n/a" if result["statements"] is None else f"{result['statements']:5.2f}"
+                    print(
+                        f"{key:<40} p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+                        f"p99={result['p99_ms']:8.2f}ms {result['rps']:8.1f} req/s "
+                        f"statements={statements} errors={result['errors']}"
+                    )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as source:
+            regressions = compare(results, json.load(source), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def int_list(value: str) -> Sequence[int]:
+    return [int(item) for item in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Generate a catalog with src.importer before the run")
+    parser.add_argument("--organizations", type=int, default=100_000, help="Organizations to generate with --seed")
+    parser.add_argument("--buildings", type=int, help="Buildings to generate with --seed, a quarter of the organizations by default")
+    parser.add_argument("--activity-depth", type=int, help="Activity tree levels to generate with --seed when there are no activities")
+    parser.add_argument("--workers", type=int, default=1, help="Faker worker processes for --seed")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 8, 32], help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route and concurrency level")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per route")
+    parser.add_argument("--routes", nargs="*", help="Route names to run, all by default")
+    parser.add_argument("--sample-size", type=int, default=1000, help="Catalog rows sampled for request parameters")
+    parser.add_argument("--random-seed", type=int, default=0, help="Seed of the request parameters")
+    parser.add_argument("--response-cache", action="store_true", help="Keep the response cache on")
+    parser.add_argument("--baseline", help="JSON results to compare with; regressions make the run fail")
+    parser.add_argument("--save-baseline", help="Write the results as a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative change of p95 and throughput")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,103 @@
+"""Compares the per-organization cost of the ORM + Pydantic response path with SQL-built dicts + orjson.
+
+Usage:
+    python -m benchmarks.serialization --orgs 5000
+
+``orm_pydantic`` reproduces what FastAPI does for ``response_model=List[OrganizationRead]``:
+loads ORM objects, validates them from attributes, runs ``jsonable_encoder`` and ``json.dumps``.
+``sql_dicts`` fetches ``ORGANIZATION_JSON`` documents and encodes them with orjson.
+The data is created inside a transaction that is rolled back at the end.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.config.db import Base
+from src.config.settings import settings
+from src.crud.organization import organization_crud
+from src.models import Activity, Building, Organization, Phone, organization_activity
+from src.schemas.organization import OrganizationRead
+
+ORGANIZATION_LIST = TypeAdapter(List[OrganizationRead])
+
+
+async def seed(db: AsyncSession, orgs: int) -> None:
+    """Creates organizations with a building, two activities and two phones each"""
+    activity_ids = list((await db.execute(
+        insert(Activity).returning(Activity.id), [{"name": f"bench-activity-{i}"} for i in range(20)]
+    )).scalars().all())
+    building_ids = list((await db.execute(
+        insert(Building).returning(Building.id),
+        [{"address": f"bench-address-{i}", "latitude": 55.0 + i * 1e-4, "longitude": 37.0} for i in range(orgs // 10 + 1)]
+    )).scalars().all())
+    org_ids = list((await db.execute(
+        insert(Organization).returning(Organization.id),
+        [{"name": f"bench-org-{i}", "building_id": building_ids[i // 10]} for i in range(orgs)]
+    )).scalars().all())
+    await db.execute(insert(Phone), [
+        {"number": f"+7 900 {i:07d}-{k}", "organization_id": org_id}
+        for i, org_id in enumerate(org_ids) for k in range(2)
+    ])
+    await db.execute(insert(organization_activity), [
+        {"organization_id": org_id, "activity_id": activity_ids[(i + k) % len(activity_ids)]}
+        for i, org_id in enumerate(org_ids) for k in range(2)
+    ])
+
+
+def report(label: str, count: int, query_s: float, serialize_s: float, size: int) -> None:
+    total = query_s + serialize_s
+    print(
+        f"{label:<14} query={query_s * 1000:8.1f}ms serialize={serialize_s * 1000:8.1f}ms "
+        f"per_org={total / count * 1e6:7.1f}us body={size}B"
+    )
+
+
+async def orm_pydantic(db: AsyncSession, orgs: int) -> None:
+    start = time.perf_counter()
+    result = await organization_crud.get_by_name(db, "bench-org", limit=orgs)
+    queried = time.perf_counter()
+    body = json.dumps(jsonable_encoder(ORGANIZATION_LIST.validate_python(result)), ensure_ascii=False).encode()
+    report("orm_pydantic", len(result), queried - start, time.perf_counter() - queried, len(body))
+    db.expunge_all()
+
+
+async def sql_dicts(db: AsyncSession, orgs: int) -> None:
+    start = time.perf_counter()
+    result = await organization_crud.get_by_name(db, "bench-org", limit=orgs, as_dicts=True)
+    queried = time.perf_counter()
+    body = orjson.dumps(result)
+    report("sql_dicts", len(result), queried - start, time.perf_counter() - queried, len(body))
+
+
+async def main(orgs: int, repeat: int) -> None:
+    engine = create_async_engine(settings.DB_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            await seed(db, orgs)
+            print(f"organizations: {orgs}")
+            for _ in range(repeat):
+                await orm_pydantic(db, orgs)
+                await sql_dicts(db, orgs)
+        finally:
+            await db.close()
+            await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orgs", type=int, default=5000, help="Number of organizations in the response")
+    parser.add_argument("--repeat", type=int, default=3, help="Measurement rounds")
+    args = parser.parse_args()
+    asyncio.run(main(args.orgs, args.repeat))
@@ -0,0 +1,114 @@
+"""Measures what statement building, SQL compilation and statement preparation cost per lookup.
+
+Usage:
+    python -m benchmarks.statement_cache --calls 2000
+
+Runs the organization detail lookup (dict path) repeatedly on engines with the SQLAlchemy
+compiled cache and the asyncpg prepared statement cache switched on and off, once with a
+freshly built ``select()`` per call (``select``) and once through the statement pre-built
+with bind parameters that ``OrganizationCRUD.get_by_id`` uses (``prebuilt``). Also reports
+the pure Python cost of producing an executable statement, without a database round trip,
+including ``lambda_stmt`` for comparison.
+The data is created inside a transaction that is rolled back at the end.
+"""
+import argparse
+import asyncio
+import time
+from sqlalchemy import insert, lambda_stmt
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from src.config.db import Base
+from src.config.settings import settings
+from src.crud.organization import BY_ID, ORGANIZATION_JSON, organization_crud
+from src.models import Organization
+
+VARIANTS = (
+    ("no caches", 0, 0),
+    ("compiled only", 500, 0),
+    ("prepared only", 0, 500),
+    ("both caches", 500, 500),
+)
+
+
+def build_select(org_id: int):
+    return select(Organization).where(Organization.id == org_id).with_only_columns(
+        ORGANIZATION_JSON, maintain_column_froms=True
+    )
+
+
+def build_lambda(org_id: int):
+    stmt = lambda_stmt(lambda: select(Organization).where(Organization.id == org_id))
+    stmt += lambda s: s.with_only_columns(ORGANIZATION_JSON, maintain_column_froms=True)
+    return stmt
+
+
+def build_prebuilt(org_id: int):
+    return BY_ID[1]
+
+
+def python_overhead(calls: int) -> None:
+    """Statement construction plus cache key generation, which is all a compiled-cache hit costs"""
+    dialect = postgresql.asyncpg.dialect()
+    for label, build in (("select", build_select), ("lambda", build_lambda), ("prebuilt", build_prebuilt)):
+        start = time.perf_counter()
+        for org_id in range(calls):
+            build(org_id)._generate_cache_key()
+        built = time.perf_counter()
+        for org_id in range(calls // 10):
+            build(org_id).compile(dialect=dialect)
+        compiled = time.perf_counter()
+        print(
+            f"{label:<8} build+cache_key={(built - start) / calls * 1e6:7.1f}us "
+            f"full_compile={(compiled - built) / (calls // 10) * 1e6:7.1f}us"
+        )
+
+
+async def run_variant(label: str, query_cache_size: int, prepared_cache_size: int, calls: int) -> None:
+    engine = create_async_engine(
+        settings.DB_URL,
+        query_cache_size=query_cache_size,
+        connect_args={"prepared_statement_cache_size": prepared_cache_size},
+    )
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            db = AsyncSession(bind=conn)
+            try:
+                org_ids = list((await db.execute(
+                    insert(Organization).returning(Organization.id),
+                    [{"name": f"bench-org-{i}"} for i in range(100)]
+                )).scalars().all())
+                for mode in ("select", "prebuilt"):
+                    start = time.perf_counter()
+                    for i in range(calls):
+                        org_id = org_ids[i % len(org_ids)]
+                        if mode == "select":
+                            (await db.execute(build_select(org_id))).all()
+                        else:
+                            await organization_crud.get_by_id(db, org_id, as_dicts=True)
+                    elapsed = time.perf_counter() - start
+                    print(f"{label:<14} {mode:<8} per_call={elapsed / calls * 1e6:8.1f}us")
+            finally:
+                await db.close()
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+
+async def main(calls: int) -> None:
+    setup = create_async_engine(settings.DB_URL)
+    async with setup.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await setup.dispose()
+
+    python_overhead(calls)
+    for label, query_cache_size, prepared_cache_size in VARIANTS:
+        await run_variant(label, query_cache_size, prepared_cache_size, calls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000, help="Lookups per variant")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls))
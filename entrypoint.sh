@@ -8,4 +8,4 @@ echo "Seeding test data..."
 python -m src.seed
 
 echo "Starting FastAPI app..."
-exec uvicorn src.main:app --host 0.0.0.0 --port 8000
+exec gunicorn -c python:src.config.gunicorn src.main:app
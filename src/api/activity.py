@@ -0,0 +1,34 @@
+from src.config.logger import logger
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from src.cache.response import CachedRoute
+from src.config.db import get_db
+from src.crud.activity import activity_crud
+from src.schemas.activity import ActivityRead
+from src.utils.responses import OrjsonResponse
+from src.utils.security import verify_api_key
+
+router = APIRouter(route_class=CachedRoute)
+
+
+@router.get(
+    "/{activity_id}/tree",
+    response_model=ActivityRead,
+    summary="Get activity subtree",
+    description="Returns the activity with its nested children, down to `level` levels (the whole subtree by default)",
+    dependencies=[Depends(verify_api_key)]
+)
+async def activity_tree(
+        activity_id: int,
+        level: Optional[int] = Query(None, ge=1, description="Number of levels to include, the activity itself being the first"),
+        db: AsyncSession = Depends(get_db)
+) -> OrjsonResponse:
+    tree = await activity_crud.get_tree(db, activity_id, level)
+    if not tree:
+        logger.warning(f"Activity {activity_id} not found")
+        raise HTTPException(
+            status_code=404,
+            detail="Activity not found"
+        )
+    return OrjsonResponse(tree)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from typing import Any, Dict
+from src.cache.response import response_cache
+from src.crud.organization import organization_flight
+from src.utils.security import verify_api_key
+
+router = APIRouter()
+
+
+@router.get(
+    "/stats",
+    summary="Response cache statistics",
+    description="Returns hit/miss counters of the response cache, the current catalog version and request coalescing counters",
+    dependencies=[Depends(verify_api_key)]
+)
+async def cache_stats() -> Dict[str, Any]:
+    return {**response_cache.stats(), "single_flight": organization_flight.stats()}
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from typing import List
+from src.cache.response import response_cache
+from src.config.db import engine
+from src.crud.organization import organization_flight
+from src.utils.metrics import registry, render_header, render_histogram, render_sample
+from src.utils.security import verify_api_key
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _runtime_metrics() -> List[str]:
+    """Pool, response cache and coalescing state, read at scrape time"""
+    pool = engine.pool
+    lines = render_header("db_pool_checked_out", "gauge", "Connections currently checked out of the primary pool")
+    lines.append(render_sample("db_pool_checked_out", pool.checkedout()))
+    lines += render_header("db_pool_overflow", "gauge", "Connections opened above the pool size")
+    lines.append(render_sample("db_pool_overflow", max(pool.overflow(), 0)))
+    for name, histogram, help_text in (
+        ("db_pool_wait_seconds", pool.wait_seconds, "Time to get a connection out of the pool queue"),
+        ("db_pool_checkout_seconds", pool.checkout_seconds, "Time of a pool checkout including pre-ping"),
+    ):
+        lines += render_header(name, "histogram", help_text)
+        lines += render_histogram(name, histogram, {})
+    lines += render_header("response_cache_lookups_total", "counter", "Response cache lookups by result")
+    lines.append(render_sample("response_cache_lookups_total", response_cache.hits, {"result": "hit"}))
+    lines.append(render_sample("response_cache_lookups_total", response_cache.misses, {"result": "miss"}))
+    lines += render_header("single_flight_calls_total", "counter", "Coalesced lookups by role")
+    lines.append(render_sample("single_flight_calls_total", organization_flight.leaders, {"role": "leader"}))
+    lines.append(render_sample("single_flight_calls_total", organization_flight.followers, {"role": "follower"}))
+    return lines
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="Returns per-route latency histograms with database, serialization and cache time, pool and cache metrics in the Prometheus text format",
+    dependencies=[Depends(verify_api_key)]
+)
+async def metrics() -> PlainTextResponse:
+    lines = registry.render() + _runtime_metrics()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
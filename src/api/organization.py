@@ -1,38 +1,45 @@
 from src.config.logger import logger
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from src.config.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import List, Optional
+from src.cache.response import CachedRoute
+from src.config.db import get_db, get_sessionmaker
+from src.crud.building import building_crud
 from src.crud.organization import organization_crud
-from src.models import Building
-from src.schemas.organization import OrganizationRead
+from src.schemas.organization import (
+    OrganizationRead, OrganizationNearby, OrganizationBatchRequest, OrganizationBatchRead
+)
 from src.schemas.building import BuildingBase
-from sqlalchemy import select
+from src.utils.ndjson import ndjson_chunks
+from src.utils.pagination import PageParams, json_page, page_params, paginate
+from src.utils.responses import OrjsonResponse
 from src.utils.security import verify_api_key
 from src.config.settings import settings
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get(
     "/by_building/{building_id}",
     response_model=List[OrganizationRead],
     summary="Get organizations by building ID",
-    description="Returns all organizations located in the specified building",
+    description="Returns organizations located in the specified building, paginated by ID",
     dependencies=[Depends(verify_api_key)]
 )
 async def organizations_by_building(
         building_id: int,
+        page: PageParams = Depends(page_params),
         db: AsyncSession = Depends(get_db)
-) -> List[OrganizationRead]:
-    orgs = await organization_crud.get_by_building(db, building_id)
-    if not orgs:
+) -> OrjsonResponse:
+    orgs = await organization_crud.get_by_building(db, building_id, page.after_id, page.lookahead, as_dicts=True)
+    if not orgs and page.is_first:
         logger.warning(f"No organizations found for building {building_id}")
         raise HTTPException(
             status_code=404,
             detail="No organizations found in this building or building doesn't exist"
         )
-    return orgs
+    return json_page(orgs, page)
 
 
 @router.get(
@@ -44,16 +51,17 @@ async def organizations_by_building(
 )
 async def organizations_by_activity(
         activity_id: int,
+        page: PageParams = Depends(page_params),
         db: AsyncSession = Depends(get_db)
-) -> List[OrganizationRead]:
-    orgs = await organization_crud.get_by_activity(db, activity_id)
-    if not orgs:
+) -> OrjsonResponse:
+    orgs = await organization_crud.get_by_activity(db, activity_id, page.after_id, page.lookahead, as_dicts=True)
+    if not orgs and page.is_first:
         logger.warning(f"No organizations found for activity {activity_id}")
         raise HTTPException(
             status_code=404,
             detail="No organizations found for this activity or activity doesn't exist"
         )
-    return orgs
+    return json_page(orgs, page)
 
 
 @router.get(
@@ -65,16 +73,55 @@ async def organizations_by_activity(
 )
 async def organizations_by_activity_name(
         name: str = Query(..., description="Activity name to search for"),
+        page: PageParams = Depends(page_params),
         db: AsyncSession = Depends(get_db)
-) -> List[OrganizationRead]:
-    orgs = await organization_crud.get_by_activity_name(db, name)
-    if not orgs:
+) -> OrjsonResponse:
+    orgs = await organization_crud.get_by_activity_name(db, name, page.after_id, page.lookahead, as_dicts=True)
+    if not orgs and page.is_first:
         logger.warning(f"No organizations found for activity name '{name}'")
         raise HTTPException(
             status_code=404,
             detail=f"No organizations found for activity name '{name}'"
         )
-    return orgs
+    return json_page(orgs, page)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export all organizations",
+    description="Streams every organization with its building, phones and activities as newline-delimited JSON",
+    dependencies=[Depends(verify_api_key)]
+)
+async def organizations_export(
+        session_factory: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker)
+) -> StreamingResponse:
+    async def body():
+        async with session_factory() as db:
+            records = organization_crud.stream_export(db, settings.EXPORT_BATCH_SIZE)
+            async for chunk in ndjson_chunks(records, settings.EXPORT_BATCH_SIZE):
+                yield chunk
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/batch",
+    response_model=OrganizationBatchRead,
+    summary="Get organizations by IDs",
+    description=f"Returns up to {settings.BATCH_MAX_IDS} organizations in the order of the requested IDs and lists the IDs that were not found",
+    dependencies=[Depends(verify_api_key)]
+)
+async def organizations_batch(
+        batch: OrganizationBatchRequest,
+        db: AsyncSession = Depends(get_db)
+) -> OrjsonResponse:
+    orgs = await organization_crud.get_many(db, batch.ids, as_dicts=True)
+    found = {org["id"] for org in orgs}
+    missing = [org_id for org_id in dict.fromkeys(batch.ids) if org_id not in found]
+    if missing:
+        logger.warning(f"Organizations {missing} not found")
+    return OrjsonResponse({"organizations": orgs, "missing": missing})
 
 
 @router.get(
@@ -87,36 +134,48 @@ async def organizations_by_activity_name(
 async def organization_detail(
         org_id: int,
         db: AsyncSession = Depends(get_db)
-) -> OrganizationRead:
-    org = await organization_crud.get_by_id(db, org_id)
+) -> OrjsonResponse:
+    org = await organization_crud.get_by_id(db, org_id, as_dicts=True)
     if not org:
         logger.warning(f"Organization {org_id} not found")
         raise HTTPException(
             status_code=404,
             detail="Organization not found"
         )
-    return org
+    return OrjsonResponse(org)
 
 
 @router.get(
     "/search/by_name/",
     response_model=List[OrganizationRead],
     summary="Search organizations by name",
-    description="Returns organizations with names containing the search string",
+    description="Returns organizations with names containing the search string; with `ranked` also similar names, most relevant first",
     dependencies=[Depends(verify_api_key)]
 )
 async def organization_search(
         name: str = Query(..., description="Partial organization name to search for"),
+        ranked: bool = Query(False, description="Include similar names and order results by relevance"),
+        page: PageParams = Depends(page_params),
         db: AsyncSession = Depends(get_db)
-) -> List[OrganizationRead]:
-    orgs = await organization_crud.get_by_name(db, name)
-    if not orgs:
+) -> OrjsonResponse:
+    if ranked and not page.is_first and not isinstance(page.keys.get("relevance"), (int, float)):
+        # An ID alone would silently restart the relevance order from the first page
+        raise HTTPException(
+            status_code=422,
+            detail="Ranked search continues only from the cursor of a previous ranked page"
+        )
+    orgs = await organization_crud.get_by_name(
+        db, name, ranked, page.after_id, page.lookahead, page.keys.get("relevance"), as_dicts=True
+    )
+    if not orgs and page.is_first:
         logger.warning(f"No organizations found for name '{name}'")
         raise HTTPException(
             status_code=404,
             detail=f"No organizations found matching '{name}'"
         )
-    return orgs
+    if ranked:
+        return json_page(orgs, page, lambda org: {"id": org["id"], "relevance": org["relevance"]}, drop=("relevance",))
+    return json_page(orgs, page)
 
 
 @router.get(
@@ -130,8 +189,9 @@ async def organizations_in_radius(
         lat: float = Query(..., examples=[55.751244], description="Latitude of center point"),
         lng: float = Query(..., examples=[37.618423], description="Longitude of center point"),
         radius: float = Query(..., examples=[5.0], description="Search radius in kilometers"),
+        page: PageParams = Depends(page_params),
         db: AsyncSession = Depends(get_db)
-) -> List[OrganizationRead]:
+) -> OrjsonResponse:
     if radius <= 0:
         logger.warning(f"Invalid radius value: {radius}")
         raise HTTPException(
@@ -139,29 +199,56 @@ async def organizations_in_radius(
             detail="Radius must be positive"
         )
 
-    orgs = await organization_crud.get_in_radius(db, lat, lng, radius)
-    if not orgs:
+    orgs = await organization_crud.get_in_radius(db, lat, lng, radius, page.lookahead, page.after_id, as_dicts=True)
+    if not orgs and page.is_first:
         logger.warning(f"No organizations found in {radius}km radius from {lat},{lng}")
         raise HTTPException(
             status_code=404,
             detail=f"No organizations found within {radius}km of specified location"
         )
-    return orgs
+    return json_page(orgs, page)
+
+
+@router.get(
+    "/nearest/",
+    response_model=List[OrganizationNearby],
+    summary="Get nearest organizations",
+    description="Returns up to `limit` organizations closest to the given coordinates, ordered by distance (in km)",
+    dependencies=[Depends(verify_api_key)]
+)
+async def organizations_nearest(
+        lat: float = Query(..., ge=-90, le=90, examples=[55.751244], description="Latitude of center point"),
+        lng: float = Query(..., ge=-180, le=180, examples=[37.618423], description="Longitude of center point"),
+        limit: int = Query(10, ge=1, le=100, description="Number of organizations to return"),
+        max_radius: Optional[float] = Query(None, gt=0, description="Maximum search radius in kilometers"),
+        db: AsyncSession = Depends(get_db)
+) -> OrjsonResponse:
+    orgs = await organization_crud.get_nearest(db, lat, lng, limit, max_radius, as_dicts=True)
+    if not orgs:
+        logger.warning(f"No organizations found near {lat},{lng}")
+        raise HTTPException(
+            status_code=404,
+            detail="No organizations found near specified location"
+        )
+    return OrjsonResponse(orgs)
 
 
 @router.get(
     "/buildings/",
     response_model=List[BuildingBase],
     summary="List all buildings",
-    description="Returns basic information about all buildings in the system",
+    description="Returns basic information about buildings in the system, paginated by ID",
     dependencies=[Depends(verify_api_key)]
 )
-async def list_buildings(db: AsyncSession = Depends(get_db)) -> List[BuildingBase]:
+async def list_buildings(
+        response: Response,
+        page: PageParams = Depends(page_params),
+        db: AsyncSession = Depends(get_db)
+) -> List[BuildingBase]:
     try:
-        result = await db.execute(select(Building))
-        buildings = result.scalars().all()
+        buildings = await building_crud.get_list(db, page.after_id, page.lookahead)
         logger.info(f"Retrieved {len(buildings)} buildings")
-        return buildings
+        return paginate(buildings, page, response)
     except Exception as e:
         logger.error(f"Error listing buildings: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from typing import Any, Dict
+from src.config.db import engine, replicas
+from src.config.pool import pool_stats
+from src.utils.security import verify_api_key
+
+router = APIRouter()
+
+
+@router.get(
+    "/stats",
+    summary="Connection pool statistics",
+    description="Returns pool occupancy, histograms of pool wait and checkout latency in seconds and replica health",
+    dependencies=[Depends(verify_api_key)]
+)
+async def database_pool_stats() -> Dict[str, Any]:
+    return {**pool_stats(engine.pool), "replicas": replicas.stats()}
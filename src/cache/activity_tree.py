@@ -0,0 +1,108 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.cache.versions import VersionedCache
+from src.config.logger import logger
+from src.config.settings import settings
+from src.models import Activity
+
+ActivityRow = Tuple[int, str, Optional[int]]
+
+
+class ActivityTreeIndex(VersionedCache):
+    """In-memory copy of the activity tree that answers subtree lookups without SQL.
+
+    Holds a parent -> children adjacency map and, for every activity, its descendants
+    ordered by depth for each level up to ``max_depth``. The index is stamped with the
+    ``activities`` version from ``catalog_versions`` and reloads itself once it changes.
+    """
+
+    TABLE = Activity.__tablename__
+
+    def __init__(self, max_depth: int) -> None:
+        super().__init__()
+        self.max_depth = max_depth
+        self._names: Dict[int, str] = {}
+        self._children: Dict[int, List[int]] = {}
+        self._subtrees: Dict[int, Tuple[Tuple[int, ...], ...]] = {}
+
+    async def _load(self, db: AsyncSession) -> None:
+        result = await db.execute(select(Activity.id, Activity.name, Activity.parent_id))
+        self.build(result.all())
+        logger.info(f"Activity tree index loaded: {len(self._names)} activities")
+
+    def build(self, rows: Iterable[ActivityRow]) -> None:
+        names: Dict[int, str] = {}
+        children: Dict[int, List[int]] = defaultdict(list)
+        for activity_id, name, parent_id in rows:
+            names[activity_id] = name
+            if parent_id is not None:
+                children[parent_id].append(activity_id)
+        for child_ids in children.values():
+            child_ids.sort()
+
+        self._names = names
+        self._children = dict(children)
+        self._subtrees = {activity_id: self._collect_levels(activity_id) for activity_id in names}
+
+    @property
+    def rows(self) -> List[ActivityRow]:
+        """The activities the index was built from, to be rebuilt elsewhere with ``build``"""
+        parents = {child_id: parent_id for parent_id, child_ids in self._children.items() for child_id in child_ids}
+        return [(activity_id, name, parents.get(activity_id)) for activity_id, name in self._names.items()]
+
+    def _collect_levels(self, activity_id: int) -> Tuple[Tuple[int, ...], ...]:
+        """Returns the subtree of the activity for each depth from 1 to max_depth"""
+        levels = []
+        subtree: List[int] = []
+        layer = [activity_id]
+        for _ in range(self.max_depth):
+            if not layer:
+                levels.append(levels[-1])
+                continue
+            subtree.extend(layer)
+            levels.append(tuple(subtree))
+            layer = self._next_layer(layer)
+        return tuple(levels)
+
+    def _next_layer(self, layer: List[int]) -> List[int]:
+        return sorted(
+            child_id
+            for parent_id in layer
+            for child_id in self._children.get(parent_id, ())
+        )
+
+    def subtree_ids(self, activity_id: int, level: int) -> List[int]:
+        """Returns the ID of an activity and its descendants up to the specified level"""
+        if level < 1 or activity_id not in self._names:
+            return []
+        if level <= self.max_depth:
+            return list(self._subtrees[activity_id][level - 1])
+
+        ids: List[int] = []
+        layer = [activity_id]
+        for _ in range(level):
+            if not layer:
+                break
+            ids.extend(layer)
+            layer = self._next_layer(layer)
+        return ids
+
+    def find_ids_by_name(self, name: str) -> List[int]:
+        """Returns IDs of activities whose name contains the string (case-insensitive)"""
+        needle = name.casefold()
+        return [
+            activity_id for activity_id, activity_name in self._names.items()
+            if needle in activity_name.casefold()
+        ]
+
+    def subtree_ids_by_name(self, name: str, level: int) -> List[int]:
+        """Returns IDs of activities matching the name and their descendants up to the specified level"""
+        ids: Dict[int, None] = {}
+        for activity_id in self.find_ids_by_name(name):
+            ids.update(dict.fromkeys(self.subtree_ids(activity_id, level)))
+        return list(ids)
+
+
+activity_tree_index = ActivityTreeIndex(settings.MAX_ACTIVITY_DEPTH)
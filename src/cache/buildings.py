@@ -0,0 +1,101 @@
+from math import floor
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.cache.versions import VersionedCache
+from src.config.logger import logger
+from src.config.settings import settings
+from src.models import Building
+from src.utils.geo import bounding_box, within_radius_km
+
+BuildingRow = Tuple[int, float, float]
+
+# Cell (row, column) is packed into one int64 key; offsets keep negative indexes positive
+_CELL_OFFSET = 1 << 24
+_CELL_WIDTH = 1 << 25
+
+
+class BuildingGridIndex(VersionedCache):
+    """In-memory uniform grid over building coordinates for radius lookups without SQL.
+
+    Coordinates live in contiguous float64 arrays sorted by grid cell of ``cell_size``
+    degrees, so the buildings of consecutive cells in a grid row form one slice. A radius
+    query takes the slices overlapping the bounding box of the circle and checks the exact
+    haversine distance for all of them in a single vectorized call.
+    """
+
+    TABLE = Building.__tablename__
+
+    def __init__(self, cell_size: float) -> None:
+        super().__init__()
+        self.cell_size = cell_size
+        self._keys = np.empty(0, dtype=np.int64)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lats = np.empty(0, dtype=np.float64)
+        self._lngs = np.empty(0, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def _load(self, db: AsyncSession) -> None:
+        result = await db.execute(select(Building.id, Building.latitude, Building.longitude))
+        self.build(result.all())
+        logger.info(f"Building grid index loaded: {len(self)} buildings")
+
+    def build(self, rows: Iterable[BuildingRow]) -> None:
+        data = np.array(list(rows), dtype=np.float64).reshape(-1, 3)
+        self.build_arrays(data[:, 0].astype(np.int64), data[:, 1], data[:, 2])
+
+    def build_arrays(self, ids: np.ndarray, lats: np.ndarray, lngs: np.ndarray) -> None:
+        keys = self._cell_keys(np.floor(lats / self.cell_size), np.floor(lngs / self.cell_size))
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._ids = np.ascontiguousarray(ids[order], dtype=np.int64)
+        self._lats = np.ascontiguousarray(lats[order], dtype=np.float64)
+        self._lngs = np.ascontiguousarray(lngs[order], dtype=np.float64)
+
+    @property
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The sorted index arrays, to be restored with ``adopt_arrays``"""
+        return {"keys": self._keys, "ids": self._ids, "lats": self._lats, "lngs": self._lngs}
+
+    def adopt_arrays(self, keys: np.ndarray, ids: np.ndarray, lats: np.ndarray, lngs: np.ndarray) -> None:
+        """Uses arrays already sorted by a ``build`` with the same cell size, e.g. memory-mapped, without copying"""
+        self._keys, self._ids, self._lats, self._lngs = keys, ids, lats, lngs
+
+    @staticmethod
+    def _cell_keys(rows, columns):
+        return ((np.asarray(rows, dtype=np.int64) + _CELL_OFFSET) * _CELL_WIDTH
+                + np.asarray(columns, dtype=np.int64) + _CELL_OFFSET)
+
+    def _candidate_slices(self, lat: float, lng: float, radius_km: float) -> List[slice]:
+        box = bounding_box(lat, lng, radius_km)
+        grid_rows = np.arange(floor(box.min_lat / self.cell_size), floor(box.max_lat / self.cell_size) + 1)
+        if len(grid_rows) * len(box.lng_ranges) >= len(self):
+            return [slice(0, len(self))]
+
+        slices = []
+        for min_lng, max_lng in box.lng_ranges:
+            starts = np.searchsorted(
+                self._keys, self._cell_keys(grid_rows, floor(min_lng / self.cell_size)), side="left"
+            )
+            ends = np.searchsorted(
+                self._keys, self._cell_keys(grid_rows, floor(max_lng / self.cell_size)), side="right"
+            )
+            slices.extend(slice(start, end) for start, end in zip(starts, ends) if end > start)
+        return slices
+
+    def within_radius(self, lat: float, lng: float, radius_km: float) -> List[int]:
+        """Returns IDs of buildings within the radius (in km) from the point"""
+        if radius_km <= 0 or not len(self):
+            return []
+        slices = self._candidate_slices(lat, lng, radius_km)
+        if not slices:
+            return []
+        candidates = np.concatenate([np.arange(s.start, s.stop) for s in slices])
+        mask, _ = within_radius_km(lat, lng, self._lats[candidates], self._lngs[candidates], radius_km)
+        return self._ids[candidates[mask]].tolist()
+
+
+building_index = BuildingGridIndex(settings.BUILDING_INDEX_CELL_DEG)
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from src.cache.versions import catalog_versions
+from src.config.db import get_sessionmaker
+from src.config.logger import logger
+from src.config.settings import settings
+from src.utils.instrumentation import timed
+from src.utils.security import is_valid_api_key
+
+CACHE_STATUS_HEADER = "X-Cache"
+# Response headers that are recomputed by Starlette and must not be replayed from the cache
+_SKIPPED_HEADERS = {"content-length", "content-type"}
+
+
+class CacheBackend:
+    """Storage of pre-serialized responses"""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU with per-entry TTL"""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisBackend(CacheBackend):
+    """Backend over any client with the redis.asyncio ``get``/``set``/``delete``/``scan_iter`` API"""
+
+    def __init__(self, client: Any, prefix: str = "catalog:response:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_REDIS_URL is set but the 'redis' package is not installed") from e
+        return cls(redis_asyncio.from_url(url))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+
+def make_etag(request: Request, stamp: str) -> str:
+    """Weak validator of a GET response: same URL and catalog stamp give the same body"""
+    digest = hashlib.blake2b(f"{stamp}:{request.url.path}?{request.url.query}".encode(), digest_size=8)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """Caches serialized GET responses keyed by route, query parameters and catalog stamp.
+
+    Every catalog write changes the database stamp of ``catalog_versions``, which changes
+    the keys of all routes at once; entries of older stamps are never read again and age out.
+    The stamp is shared by all processes, so a Redis backend can be shared by them too.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(request: Request, stamp: str) -> str:
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        return f"v{stamp}:{request.url.path}?{query}"
+
+    async def get(self, key: str) -> Optional[Response]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Response cache read failed: {str(e)}")
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        raw_headers, body = value.split(b"\n", 1)
+        headers = json.loads(raw_headers)
+        headers[CACHE_STATUS_HEADER] = "HIT"
+        return Response(content=body, headers=headers, media_type="application/json")
+
+    async def set(self, key: str, response: Response) -> None:
+        headers = {k: v for k, v in response.headers.items() if k not in _SKIPPED_HEADERS}
+        try:
+            await self.backend.set(key, json.dumps(headers).encode() + b"\n" + response.body, self.ttl)
+        except Exception as e:
+            logger.error(f"Response cache write failed: {str(e)}")
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "catalog_version": catalog_versions.total,
+            "catalog_stamp": catalog_versions.stamp,
+        }
+
+
+class CachedRoute(APIRoute):
+    """Route class adding conditional requests and ``response_cache`` to GET handlers.
+
+    Only authorized requests are handled here; anything else goes through the regular
+    handler so that dependencies produce the usual errors. Successful responses carry an
+    ``ETag`` derived from the catalog stamp and the route's ``Cache-Control``
+    (CACHE_CONTROL_ROUTES by endpoint name, CACHE_CONTROL_DEFAULT otherwise); a matching
+    ``If-None-Match`` is answered with 304 before the handler or any ORM query runs.
+    Only 200 responses with a complete body are stored, streaming responses are never cached.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if "GET" not in self.methods:
+            return handler
+        cache_control = settings.CACHE_CONTROL_ROUTES.get(self.name, settings.CACHE_CONTROL_DEFAULT)
+
+        async def cached_handler(request: Request) -> Response:
+            if not is_valid_api_key(request.headers.get("X-API-Key")):
+                return await handler(request)
+            session_factory = request.app.dependency_overrides.get(get_sessionmaker, get_sessionmaker)()
+            with timed("cache"):
+                stamp = await catalog_versions.current_stamp(session_factory)
+            etag = make_etag(request, stamp)
+            if etag_matches(request.headers.get("If-None-Match"), etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+            key = response_cache.make_key(request, stamp)
+            if settings.RESPONSE_CACHE_ENABLED:
+                with timed("cache"):
+                    cached = await response_cache.get(key)
+                if cached is not None:
+                    return cached
+            response = await handler(request)
+            if response.status_code != 200:
+                return response
+            replica_versions = getattr(request.state, "replica_versions", None)
+            if replica_versions is not None and catalog_versions.stamp_of(replica_versions) != stamp:
+                # Read on a replica that is not at this stamp: the body must not pass for its version
+                return response
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = cache_control
+            if settings.RESPONSE_CACHE_ENABLED and not isinstance(response, StreamingResponse):
+                with timed("cache"):
+                    await response_cache.set(key, response)
+                response.headers[CACHE_STATUS_HEADER] = "MISS"
+            return response
+
+        return cached_handler
+
+
+def _create_backend() -> CacheBackend:
+    if settings.RESPONSE_CACHE_REDIS_URL:
+        return RedisBackend.from_url(settings.RESPONSE_CACHE_REDIS_URL)
+    return MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_create_backend(), settings.RESPONSE_CACHE_TTL)
@@ -0,0 +1,76 @@
+import os
+from typing import List
+import numpy as np
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.cache.activity_tree import ActivityTreeIndex, activity_tree_index
+from src.cache.buildings import BuildingGridIndex, building_index
+from src.cache.versions import VersionedCache, catalog_versions
+from src.config.logger import logger
+from src.config.settings import settings
+
+# Set by the server master for its workers, see src/config/gunicorn.py
+SHARED_STATE_ENV = "CATALOG_SHARED_STATE"
+
+_META = "meta.json"
+_ACTIVITIES = "activities.json"
+
+
+def _building_array_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"buildings_{name}.npy")
+
+
+async def write_snapshot(db: AsyncSession, directory: str) -> None:
+    """Writes the enabled in-memory indexes to ``directory`` for ``attach_snapshot`` in other processes.
+
+    Versions are read before the tables, so a snapshot is never newer than the versions
+    it claims. The metadata file is written last: a snapshot without it is incomplete.
+    """
+    meta = {"versions": await catalog_versions.read(db)}
+    if settings.ACTIVITY_INDEX_ENABLED:
+        activities = ActivityTreeIndex(settings.MAX_ACTIVITY_DEPTH)
+        await activities.load(db)
+        with open(os.path.join(directory, _ACTIVITIES), "wb") as output:
+            output.write(orjson.dumps(activities.rows))
+        meta["activities"] = True
+    if settings.BUILDING_INDEX_ENABLED:
+        buildings = BuildingGridIndex(settings.BUILDING_INDEX_CELL_DEG)
+        await buildings.load(db)
+        for name, array in buildings.arrays.items():
+            np.save(_building_array_path(directory, name), array)
+        meta["building_cell_size"] = buildings.cell_size
+    with open(os.path.join(directory, _META), "wb") as output:
+        output.write(orjson.dumps(meta))
+
+
+def attach_snapshot(directory: str) -> List[VersionedCache]:
+    """Fills the enabled in-memory indexes from a snapshot and returns those it filled.
+
+    Building arrays are memory-mapped read-only, so every worker shares the same pages
+    instead of holding its own copy. Tables changed after the snapshot was taken are
+    reloaded from the database on first use, like after any other catalog write.
+    """
+    try:
+        with open(os.path.join(directory, _META), "rb") as source:
+            meta = orjson.loads(source.read())
+    except FileNotFoundError:
+        logger.warning(f"No complete warm state snapshot in {directory}")
+        return []
+
+    attached: List[VersionedCache] = []
+    if settings.ACTIVITY_INDEX_ENABLED and meta.get("activities"):
+        with open(os.path.join(directory, _ACTIVITIES), "rb") as source:
+            activity_tree_index.build(orjson.loads(source.read()))
+        attached.append(activity_tree_index)
+    if settings.BUILDING_INDEX_ENABLED and meta.get("building_cell_size") == building_index.cell_size:
+        building_index.adopt_arrays(**{
+            name: np.load(_building_array_path(directory, name), mmap_mode="r")
+            for name in building_index.arrays
+        })
+        attached.append(building_index)
+
+    catalog_versions.set_baseline(meta["versions"])
+    for cache in attached:
+        cache.mark_fresh()
+    logger.info(f"Warm state mapped from {directory}: {len(attached)} indexes")
+    return attached
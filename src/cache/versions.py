@@ -0,0 +1,169 @@
+import asyncio
+import time
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Dict, Optional, Set
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, ORMExecuteState
+from src.config.db import AsyncSessionLocal
+from src.config.replicas import REPLICA_SESSION
+from src.config.settings import settings
+from src.models.catalog_version import CatalogVersion
+
+
+class CatalogVersions:
+    """Per-table change counters used to invalidate in-process caches of the catalog.
+
+    Local counters are bumped on commit by this process. The ``catalog_versions`` table,
+    maintained by triggers, also sees writes of other processes: ``refresh`` reads it,
+    bumps the local counters of tables changed elsewhere and builds ``stamp``, a version
+    string that is the same in every process and changes with any catalog write.
+    """
+
+    def __init__(self) -> None:
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._db_versions: Dict[str, int] = {}
+        self._stamp: Optional[str] = None
+        self._stamp_read_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def get(self, table: str) -> int:
+        return self._versions[table]
+
+    def bump(self, *tables: str) -> None:
+        for table in tables:
+            self._versions[table] += 1
+        self.expire()
+
+    @property
+    def total(self) -> int:
+        return sum(self._versions.values())
+
+    @property
+    def stamp(self) -> Optional[str]:
+        return self._stamp
+
+    def expire(self) -> None:
+        """Forces the next ``current_stamp`` call to re-read the database versions"""
+        self._stamp = None
+
+    @staticmethod
+    def stamp_of(db_versions: Dict[str, int]) -> str:
+        return ".".join(str(db_versions[table]) for table in sorted(db_versions)) or "0"
+
+    def set_baseline(self, db_versions: Dict[str, int]) -> None:
+        """Database versions the caches were loaded or restored at: the first ``refresh`` then bumps the tables changed since"""
+        if not self._db_versions:
+            self._db_versions = dict(db_versions)
+
+    @staticmethod
+    async def read(db: AsyncSession) -> Dict[str, int]:
+        result = await db.execute(select(CatalogVersion.table_name, CatalogVersion.version))
+        return dict(result.all())
+
+    async def refresh(self, db: AsyncSession) -> str:
+        db_versions = await self.read(db)
+        # A table seen for the first time may have been written since the caches were loaded
+        changed = [table for table, version in db_versions.items() if self._db_versions.get(table) != version]
+        self._db_versions = db_versions
+        if changed:
+            self.bump(*changed)
+        self._stamp = self.stamp_of(db_versions)
+        self._stamp_read_at = time.monotonic()
+        return self._stamp
+
+    async def current_stamp(self, session_factory: Callable[[], AsyncSession]) -> str:
+        """Returns the database version stamp, re-reading it at most once per CATALOG_VERSION_TTL"""
+        if self._stamp is not None and time.monotonic() - self._stamp_read_at < settings.CATALOG_VERSION_TTL:
+            return self._stamp
+        async with self._lock:
+            if self._stamp is None or time.monotonic() - self._stamp_read_at >= settings.CATALOG_VERSION_TTL:
+                async with session_factory() as db:
+                    await self.refresh(db)
+            return self._stamp
+
+
+catalog_versions = CatalogVersions()
+
+
+class VersionedCache:
+    """Base for in-memory copies of a table that reload once the table version changes"""
+
+    TABLE: str
+
+    def __init__(self) -> None:
+        self._version: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_fresh(self) -> bool:
+        return self._version == catalog_versions.get(self.TABLE)
+
+    def invalidate(self) -> None:
+        self._version = None
+
+    def mark_fresh(self) -> None:
+        """Stamps contents that were filled without ``load`` with the current version"""
+        self._version = catalog_versions.get(self.TABLE)
+
+    async def load(self, db: AsyncSession) -> None:
+        """Reads the table and rebuilds the cache stamped with the version seen before reading"""
+        version = catalog_versions.get(self.TABLE)
+        await self._load(db)
+        self._version = version
+
+    async def _load(self, db: AsyncSession) -> None:
+        raise NotImplementedError
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Reloads the cache if its table changed; from the primary when ``db`` is on a replica,
+        which may not have replayed the version the cache gets stamped with yet"""
+        if self.is_fresh:
+            return
+        async with self._lock:
+            if self.is_fresh:
+                return
+            if db.info.get(REPLICA_SESSION):
+                async with AsyncSessionLocal() as primary:
+                    await self.load(primary)
+            else:
+                await self.load(db)
+
+
+_CHANGED_TABLES_KEY = "catalog_changed_tables"
+
+
+def _changed_tables(session: Session) -> Set[str]:
+    return session.info.setdefault(_CHANGED_TABLES_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session: Session, flush_context) -> None:
+    """Remembers the tables touched by the flush until the transaction is committed"""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            _changed_tables(session).add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_dml_tables(orm_execute_state: ORMExecuteState) -> None:
+    """Catches ORM-enabled insert/update/delete statements that bypass the unit of work"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _changed_tables(orm_execute_state.session).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session: Session) -> None:
+    """Bumps versions only after commit so that a reload never observes uncommitted data"""
+    tables = session.info.pop(_CHANGED_TABLES_KEY, None)
+    if tables:
+        catalog_versions.bump(*tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tables(session: Session) -> None:
+    session.info.pop(_CHANGED_TABLES_KEY, None)
@@ -1,18 +1,45 @@
+import os
+from fastapi import Request
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
+from src.config.pool import InstrumentedQueuePool
+from src.config.replicas import CATALOG_VERSIONS_SQL, ReplicaSet
 from src.config.settings import settings
 
 Base = declarative_base()
 
-engine = create_async_engine(
-    settings.DB_URL,
+ENGINE_OPTIONS = dict(
     future=True,
-    pool_size=20,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_pre_ping=True
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
 )
 
+engine = create_async_engine(settings.DB_URL, **ENGINE_OPTIONS)
+
+replicas = ReplicaSet(
+    settings.DB_REPLICA_URLS,
+    selection=settings.DB_REPLICA_SELECTION,
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+    **ENGINE_OPTIONS
+)
+
+
+def _dispose_inherited_pools() -> None:
+    """A forked process (a preloaded gunicorn worker) must not share the parent's connections"""
+    engine.sync_engine.dispose(close=False)
+    replicas.dispose_inherited()
+
+
+os.register_at_fork(after_in_child=_dispose_inherited_pools)
+
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -21,6 +48,23 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
-async def get_db() -> AsyncSession:
-    async with AsyncSessionLocal() as session:
+async def get_db(request: Request) -> AsyncSession:
+    """Read session: on a healthy replica when DB_REPLICA_URLS is set, otherwise on the primary.
+
+    On a replica the catalog versions it has replayed are read before anything else and kept
+    in ``request.state.replica_versions``: the response is at least that fresh, which
+    ``CachedRoute`` checks before tagging or caching it under the primary's stamp.
+    """
+    replica = await replicas.choose()
+    if replica is None:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+    async with replica.sessionmaker() as session:
+        request.state.replica_versions = dict((await session.execute(CATALOG_VERSIONS_SQL)).all())
         yield session
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """For handlers that outlive the request scope, e.g. streaming responses opening their own session"""
+    return AsyncSessionLocal
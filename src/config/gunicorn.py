@@ -0,0 +1,53 @@
+"""Gunicorn settings for the production server: ``gunicorn -c python:src.config.gunicorn src.main:app``.
+
+The application is imported once in the master and forked into the workers. Before forking,
+the master writes the warm in-memory indexes to a snapshot in shared memory; workers map it
+instead of each loading the catalog from the database on startup.
+"""
+import asyncio
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from src.cache.shared import SHARED_STATE_ENV, write_snapshot
+from src.config.settings import settings
+
+bind = settings.SERVER_BIND
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+async def _snapshot(directory: str) -> None:
+    # A throwaway engine: the application's pool must not hold connections across fork
+    engine = create_async_engine(settings.DB_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine) as db:
+            await write_snapshot(db, directory)
+    finally:
+        await engine.dispose()
+
+
+def on_starting(server) -> None:
+    if settings.SHARED_STATE_ENABLED:
+        parent = settings.SHARED_STATE_DIR if os.path.isdir(settings.SHARED_STATE_DIR) else None
+        directory = tempfile.mkdtemp(prefix="catalog-", dir=parent)
+        try:
+            asyncio.run(_snapshot(directory))
+        except Exception as e:
+            server.log.error(f"Warm state snapshot failed, workers will load from the database: {str(e)}")
+            shutil.rmtree(directory, ignore_errors=True)
+        else:
+            os.environ[SHARED_STATE_ENV] = directory
+            server.log.info(f"Warm state snapshot written to {directory}")
+    # Objects created so far stay untouched by the collector, so forked workers keep sharing their pages
+    gc.freeze()
+
+
+def on_exit(server) -> None:
+    directory = os.environ.pop(SHARED_STATE_ENV, None)
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -1,11 +1,32 @@
+import atexit
 import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 
 def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    )
+    """Log records are queued by the caller and formatted and written by a background thread"""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+    records = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    # The listener's handler does the formatting; records are only merged with their arguments here
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    if queue_handler in logging.getLogger().handlers:
+        def start_listener() -> None:
+            listener = QueueListener(queue_handler.queue, handler)
+            listener.start()
+            atexit.register(listener.stop)
+
+        def restart_in_child() -> None:
+            """The listener thread does not survive fork: a forked worker gets its own queue and thread"""
+            queue_handler.queue = queue.SimpleQueue()
+            start_listener()
+
+        start_listener()
+        os.register_at_fork(after_in_child=restart_in_child)
 
 
 logger = logging.getLogger("app")
@@ -0,0 +1,44 @@
+import time
+from typing import Any, Dict
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.utils.metrics import Histogram
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Asyncio queue pool that records how long checkouts take.
+
+    ``wait`` covers getting a connection out of the queue: blocking while the pool is
+    exhausted plus opening a new connection. ``checkout`` is the whole ``connect()``
+    as seen by the engine, including pre-ping when it is enabled.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_seconds = Histogram()
+        self.checkout_seconds = Histogram()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_seconds.observe(time.perf_counter() - start)
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.checkout_seconds.observe(time.perf_counter() - start)
+
+
+def pool_stats(pool: InstrumentedQueuePool) -> Dict[str, Any]:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "wait_seconds": pool.wait_seconds.snapshot(),
+        "checkout_seconds": pool.checkout_seconds.snapshot(),
+    }
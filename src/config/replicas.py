@@ -0,0 +1,124 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.config.logger import logger
+
+# Seconds the replica is behind the primary; zero on a primary or a fully replayed standby,
+# where the last replay timestamp only tells how long ago the primary last wrote
+REPLICATION_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# Versions of the catalog tables the replica has replayed, see CatalogVersions
+CATALOG_VERSIONS_SQL = text("SELECT table_name, version FROM catalog_versions")
+# ``AsyncSession.info`` flag of sessions on a replica
+REPLICA_SESSION = "replica"
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+
+class Replica:
+    def __init__(self, url: str, **engine_options: Any) -> None:
+        self.url = url
+        self.engine = create_async_engine(url, **engine_options)
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False,
+            info={REPLICA_SESSION: True}
+        )
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at = float("-inf")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": make_url(self.url).render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "checked_out": self.engine.pool.checkedout(),
+        }
+
+
+class ReplicaSet:
+    """Read replicas with periodic health and lag checks.
+
+    ``choose`` returns a healthy replica whose lag is within ``max_lag`` seconds, picked
+    round-robin or by the fewest checked-out connections, or None when the caller should
+    use the primary. Health is re-checked lazily, at most once per ``check_interval``.
+    """
+
+    def __init__(
+            self,
+            urls: Sequence[str],
+            selection: str = ROUND_ROBIN,
+            max_lag: float = 10.0,
+            check_interval: float = 5.0,
+            check_timeout: float = 2.0,
+            **engine_options: Any
+    ) -> None:
+        if selection not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica selection strategy: {selection}")
+        self.replicas: List[Replica] = [Replica(url, **engine_options) for url in urls]
+        self.selection = selection
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._counter = 0
+        self._lock = asyncio.Lock()
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with replica.engine.connect() as conn:
+                    replica.lag = float((await conn.execute(REPLICATION_LAG_SQL)).scalar())
+            replica.healthy = replica.lag <= self.max_lag
+            if not replica.healthy:
+                logger.warning(f"Replica {replica.stats()['url']} lags {replica.lag:.1f}s behind, skipping it")
+        except Exception as e:
+            replica.healthy = False
+            replica.lag = None
+            logger.warning(f"Replica {replica.stats()['url']} is unavailable: {str(e)}")
+        finally:
+            replica.checked_at = time.monotonic()
+
+    def _stale(self) -> List[Replica]:
+        now = time.monotonic()
+        return [replica for replica in self.replicas if now - replica.checked_at >= self.check_interval]
+
+    async def refresh(self) -> None:
+        if not self._stale():
+            return
+        async with self._lock:
+            stale = self._stale()
+            if stale:
+                await asyncio.gather(*(self._check(replica) for replica in stale))
+
+    async def choose(self) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        await self.refresh()
+        candidates = [replica for replica in self.replicas if replica.healthy]
+        if not candidates:
+            return None
+        if self.selection == LEAST_CONNECTIONS:
+            return min(candidates, key=lambda replica: replica.engine.pool.checkedout())
+        self._counter += 1
+        return candidates[self._counter % len(candidates)]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [replica.stats() for replica in self.replicas]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def dispose_inherited(self) -> None:
+        """Forgets pooled connections inherited from the parent process without closing them"""
+        for replica in self.replicas:
+            replica.engine.sync_engine.dispose(close=False)
@@ -1,3 +1,4 @@
+from typing import Dict, List, Literal, Optional
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
@@ -7,6 +8,48 @@ class Settings(BaseSettings):
 
     API_KEY: str
     MAX_ACTIVITY_DEPTH: int = 3
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
+    BATCH_MAX_IDS: int = 500
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: int = 60
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_REDIS_URL: Optional[str] = None
+    CATALOG_VERSION_TTL: float = 1.0
+    CACHE_CONTROL_DEFAULT: str = "no-cache"
+    CACHE_CONTROL_ROUTES: Dict[str, str] = {
+        "list_buildings": "public, max-age=60",
+        "organization_detail": "public, max-age=30",
+    }
+    # Per-route latency histograms at /metrics; the access log only gets a sample of requests
+    # plus the slow and failed ones
+    METRICS_ENABLED: bool = True
+    METRICS_LOG_SAMPLE_RATE: float = 0.01
+    METRICS_LOG_SLOW_MS: float = 500.0
+    # Development aid: per-request statement counts, slow statements with EXPLAIN and repeated
+    # statement shapes (N+1) in the "app.sql" log
+    SQL_PROFILING_ENABLED: bool = False
+    SQL_PROFILING_SLOW_MS: float = 100.0
+    SQL_PROFILING_EXPLAIN: bool = True
+    SQL_PROFILING_REPEAT_THRESHOLD: int = 5
+    # Documents (as_dicts) are read from the trigger-maintained organization_search table
+    ORGANIZATION_SEARCH_ENABLED: bool = True
+    ACTIVITY_INDEX_ENABLED: bool = True
+    USE_POSTGIS: bool = False
+    BUILDING_INDEX_ENABLED: bool = True
+    BUILDING_INDEX_CELL_DEG: float = 0.01
+    NEAREST_INITIAL_RADIUS_KM: float = 1.0
+    NEAREST_MAX_RADIUS_KM: float = 20038.0
+    # Production server: gunicorn with uvicorn workers (src/config/gunicorn.py), 0 workers meaning one per CPU.
+    # The master snapshots the activity tree and building coordinates into SHARED_STATE_DIR once and the
+    # workers map the snapshot instead of each reading the tables
+    SERVER_BIND: str = "0.0.0.0:8000"
+    SERVER_WORKERS: int = 0
+    SHARED_STATE_ENABLED: bool = True
+    SHARED_STATE_DIR: str = "/dev/shm"
 
     DB_HOST: str
     DB_PORT: int
@@ -14,6 +57,24 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
 
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    # Pre-ping costs a round trip per checkout; alternatively disable it and set
+    # DB_POOL_RECYCLE below the server/proxy idle timeout (seconds, -1 never recycles)
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = -1
+    # SQLAlchemy compiled statements per engine and asyncpg prepared statements per
+    # connection; set the latter to 0 behind pgbouncer in transaction pooling mode
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    # Read-only routes go to these (JSON list of SQLAlchemy URLs); replicas lagging more than
+    # DB_REPLICA_MAX_LAG seconds or failing the health check are skipped in favour of the primary
+    DB_REPLICA_URLS: List[str] = []
+    DB_REPLICA_SELECTION: Literal["round_robin", "least_connections"] = "round_robin"
+    DB_REPLICA_MAX_LAG: float = 10.0
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+
     @property
     def DB_URL(self):
         return (
@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.config.logger import logger
+from src.models import Activity, ActivityClosure
+
+
+class ActivityCRUD:
+
+    async def get_tree(
+            self,
+            db: AsyncSession,
+            activity_id: int,
+            level: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the activity with its nested children (up to ``level`` levels, all by default) as an ``ActivityRead`` dict.
+
+        The whole subtree comes from ``activity_closure`` in one query ordered by depth,
+        so every parent is built before its children, which are attached in ID order.
+        """
+        try:
+            query = (
+                select(Activity.id, Activity.name, Activity.parent_id)
+                .join(ActivityClosure, ActivityClosure.descendant_id == Activity.id)
+                .where(ActivityClosure.ancestor_id == activity_id)
+                .order_by(ActivityClosure.depth, Activity.id)
+            )
+            if level is not None:
+                query = query.where(ActivityClosure.depth < level)
+            result = await db.execute(query)
+
+            nodes: Dict[int, Dict[str, Any]] = {}
+            for node_id, name, parent_id in result.all():
+                node = nodes[node_id] = {"id": node_id, "name": name, "parent_id": parent_id, "children": []}
+                if node_id != activity_id:
+                    nodes[parent_id]["children"].append(node)
+            return nodes.get(activity_id)
+        except Exception as e:
+            logger.error(f"Error getting activity tree: {str(e)}", exc_info=True)
+            raise
+
+
+activity_crud = ActivityCRUD()
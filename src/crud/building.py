@@ -0,0 +1,30 @@
+from typing import Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.config.logger import logger
+from src.models import Building
+
+
+class BuildingCRUD:
+
+    async def get_list(
+            self,
+            db: AsyncSession,
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None
+    ) -> Sequence[Building]:
+        """Returns buildings ordered by ID, starting after the given ID"""
+        try:
+            query = select(Building).order_by(Building.id)
+            if after_id is not None:
+                query = query.where(Building.id > after_id)
+            if limit:
+                query = query.limit(limit)
+            result = await db.execute(query)
+            return result.scalars().all()
+        except Exception as e:
+            logger.error(f"Error listing buildings: {str(e)}", exc_info=True)
+            raise
+
+
+building_crud = BuildingCRUD()
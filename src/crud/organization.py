@@ -1,14 +1,185 @@
-from typing import List, Optional, Sequence
+import functools
+import inspect
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
+from geoalchemy2 import Geography
+from sqlalchemy import JSON, ColumnElement, Integer, Select, and_, any_, bindparam, cast, func, literal_column, or_, text
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.orm import contains_eager, selectinload, joinedload, with_expression
+from src.cache.activity_tree import activity_tree_index
+from src.cache.buildings import building_index
+from src.cache.versions import catalog_versions
+from src.config.replicas import REPLICA_SESSION
 from src.config.settings import settings
 from src.config.logger import logger
-from src.models import Organization, Activity
-from src.utils.geo import calculate_distance_km
+from src.models import Organization, OrganizationSearch, Activity, ActivityClosure, Building, Phone, organization_activity
+from src.utils.geo import bounding_box, haversine_distance_sql
+from src.utils.singleflight import SingleFlight, freeze
+
+
+BUILDING_GEOG = literal_column("buildings.geog")
+
+
+def _geography_point(lat: float, lng: float) -> ColumnElement:
+    return cast(
+        func.ST_SetSRID(func.ST_MakePoint(float(lng), float(lat)), 4326),
+        Geography(geometry_type="POINT", srid=4326)
+    )
+
+
+def _json_list(item: ColumnElement, order_by: ColumnElement) -> ColumnElement:
+    return func.coalesce(func.json_agg(aggregate_order_by(item, order_by)), literal_column("'[]'::json"))
+
+
+# The whole OrganizationRead document built by Postgres, so that response rows arrive as
+# ready dicts instead of ORM objects that Pydantic has to walk attribute by attribute
+ORGANIZATION_JSON = func.json_build_object(
+    "id", Organization.id,
+    "name", Organization.name,
+    "building", (
+        select(func.json_build_object(
+            "id", Building.id, "address", Building.address,
+            "latitude", Building.latitude, "longitude", Building.longitude
+        ))
+        .where(Building.id == Organization.building_id)
+        .correlate_except(Building)
+        .scalar_subquery()
+    ),
+    "activities", (
+        select(_json_list(
+            func.json_build_object("id", Activity.id, "name", Activity.name, "parent_id", Activity.parent_id),
+            Activity.id
+        ))
+        .select_from(organization_activity.join(Activity, Activity.id == organization_activity.c.activity_id))
+        .where(organization_activity.c.organization_id == Organization.id)
+        .correlate_except(Activity, organization_activity)
+        .scalar_subquery()
+    ),
+    "phones", (
+        select(_json_list(func.json_build_object("id", Phone.id, "number", Phone.number), Phone.id))
+        .where(Phone.organization_id == Organization.id)
+        .correlate_except(Phone)
+        .scalar_subquery()
+    ),
+    type_=JSON
+)
+
+OrganizationRows = Union[Sequence[Organization], List[Dict[str, Any]]]
+
+ORGANIZATION_LOADERS = (
+    selectinload(Organization.activities),
+    selectinload(Organization.phones),
+    joinedload(Organization.building),
+)
+
+
+def _keyset_page(source: type, criterion: ColumnElement[bool]) -> Select:
+    return (
+        select(source)
+        .where(criterion, source.id > bindparam("after_id", type_=Integer))
+        .order_by(source.id)
+        .limit(bindparam("limit", type_=Integer))
+    )
+
+
+def _hot_lookup(criterion: ColumnElement[bool], search_criterion: ColumnElement[bool]) -> Tuple[Select, Select, Select]:
+    """Builds the (ORM, dicts, documents) statements of a frequent lookup once, at import time.
+
+    ``search_criterion`` is the same filter on ``organization_search``. Values are passed as
+    bind parameters at execution: the criterion's own plus ``after_id`` and ``limit`` (NULL
+    means no limit). Calls then skip building the statement and its cache key, and the SQL
+    text never changes, so asyncpg reuses one prepared statement per connection.
+    """
+    query = _keyset_page(Organization, criterion)
+    return (
+        query.options(*ORGANIZATION_LOADERS),
+        query.with_only_columns(ORGANIZATION_JSON, maintain_column_froms=True),
+        _keyset_page(OrganizationSearch, search_criterion).with_only_columns(
+            OrganizationSearch.document, maintain_column_froms=True
+        ),
+    )
+
+
+BY_ID = _hot_lookup(
+    Organization.id == bindparam("org_id", type_=Integer),
+    OrganizationSearch.id == bindparam("org_id", type_=Integer)
+)
+BY_BUILDING = _hot_lookup(
+    Organization.building_id == bindparam("building_id", type_=Integer),
+    OrganizationSearch.building_id == bindparam("building_id", type_=Integer)
+)
+# = ANY(array) instead of an expanding IN keeps one SQL text whatever the number of activities;
+# on organization_search the overlap operator is served by the GIN index on activity_ids
+BY_ACTIVITY_IDS = _hot_lookup(
+    Organization.activities.any(Activity.id == any_(bindparam("activity_ids", type_=ARRAY(Integer)))),
+    OrganizationSearch.activity_ids.overlap(bindparam("activity_ids", type_=ARRAY(Integer)))
+)
+# Buildings found by the grid index: one array parameter, however many buildings the radius covers
+BY_BUILDING_IDS = _hot_lookup(
+    Organization.building_id == any_(bindparam("building_ids", type_=ARRAY(Integer))),
+    OrganizationSearch.building_id == any_(bindparam("building_ids", type_=ARRAY(Integer)))
+)
+BY_NAME = _hot_lookup(
+    Organization.name.ilike(bindparam("pattern")),
+    OrganizationSearch.name.ilike(bindparam("pattern"))
+)
+
+PG_TRGM_INSTALLED_SQL = text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+
+organization_flight = SingleFlight()
+
+
+def coalesced(method: Callable) -> Callable:
+    """Shares one in-flight ``as_dicts`` lookup among concurrent callers with the same arguments.
+
+    ORM results belong to the caller's session and are never shared; the shared call runs on
+    a session of its own on the caller's engine. The engine and the local catalog version are
+    part of the key, so callers on another replica or arriving after a commit start a new query.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    async def wrapper(self, db: AsyncSession, *args, **kwargs):
+        bound = signature.bind(self, db, *args, **kwargs)
+        bound.apply_defaults()
+        if not settings.SINGLE_FLIGHT_ENABLED or not bound.arguments["as_dicts"]:
+            return await method(self, db, *args, **kwargs)
+        # Callers on different engines (the primary, replicas at different lags) see different data
+        key = (method.__name__, catalog_versions.total, db.bind) + tuple(
+            freeze(value) for name, value in bound.arguments.items() if name not in ("self", "db")
+        )
+
+        async def shared_call():
+            # On its own session: the leader's one is closed if the leader is cancelled, while
+            # the call goes on for the followers. Same engine, so replica reads stay on the replica
+            async with AsyncSession(
+                    db.bind, expire_on_commit=False, autoflush=False,
+                    info={REPLICA_SESSION: db.info.get(REPLICA_SESSION, False)}
+            ) as own_db:
+                return await method(self, own_db, *args, **kwargs)
+
+        return await organization_flight.do(key, shared_call)
+
+    return wrapper
 
 
 class OrganizationCRUD:
+    # Whether pg_trgm is installed, see check_trigram
+    trigram_available: Optional[bool] = None
+
+    async def check_trigram(self, db: AsyncSession) -> bool:
+        """Looks up pg_trgm once: the migrations skip it where the server does not ship it"""
+        if self.trigram_available is None:
+            self.trigram_available = bool((await db.execute(PG_TRGM_INSTALLED_SQL)).scalar())
+            if not self.trigram_available:
+                logger.warning("pg_trgm is not installed: ranked name search only matches substrings")
+        return self.trigram_available
+
+    @staticmethod
+    def _activity_subtree(anchor: ColumnElement[bool], level: int) -> Select:
+        """Selects the IDs of the activities matching ``anchor`` (on ``ActivityClosure.ancestor_id``) and their descendants up to the specified level"""
+        return select(ActivityClosure.descendant_id).where(anchor, ActivityClosure.depth < level)
 
     async def _get_activity_tree_ids(
             self,
@@ -16,202 +187,442 @@ class OrganizationCRUD:
             activity_id: int,
             level: int
     ) -> List[int]:
-        """Recursively retrieves the ID of an activity and all its descendants up to the specified level"""
+        """Retrieves the ID of an activity and all its descendants up to the specified level in one query"""
         if level < 1:
             return []
 
         try:
             result = await db.execute(
-                select(Activity)
-                .where(Activity.id == activity_id)
-                .options(selectinload(Activity.children))
+                self._activity_subtree(ActivityClosure.ancestor_id == activity_id, level)
+                .order_by(ActivityClosure.depth, ActivityClosure.descendant_id)
             )
-            activity = result.scalars().first()
-
-            if not activity:
-                return []
-
-            ids = [activity.id]
-            if level > 1 and activity.children:
-                for child in activity.children:
-                    ids.extend(await self._get_activity_tree_ids(db, child.id, level - 1))
-            return ids
+            return list(result.scalars().all())
         except Exception as e:
             logger.error(f"Error getting activity tree: {str(e)}", exc_info=True)
             raise
 
+    @staticmethod
+    def _source(as_dicts: bool) -> type:
+        """Queries for documents read ``organization_search`` rows instead of joining the catalog tables"""
+        return OrganizationSearch if as_dicts and settings.ORGANIZATION_SEARCH_ENABLED else Organization
+
+    async def _fetch_hot(
+            self,
+            db: AsyncSession,
+            lookup: Tuple[Select, Select, Select],
+            as_dicts: bool = False,
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None,
+            **params: Any
+    ) -> OrganizationRows:
+        """Executes a ``_hot_lookup`` statement, ordered by ID and keyset paginated"""
+        orm_query, dict_query, search_query = lookup
+        # IDs are positive, so 0 pages from the start
+        params.update(after_id=0 if after_id is None else after_id, limit=limit)
+        if as_dicts:
+            query = search_query if self._source(as_dicts) is OrganizationSearch else dict_query
+            return [document for document, in (await db.execute(query, params)).all()]
+        return (await db.execute(orm_query, params)).scalars().all()
+
+    @staticmethod
+    async def _fetch(
+            db: AsyncSession,
+            query: Select,
+            as_dicts: bool = False,
+            building_joined: bool = False,
+            **expressions: ColumnElement
+    ) -> OrganizationRows:
+        """Executes a ``select(Organization)`` or ``select(OrganizationSearch)`` query.
+
+        By default returns ORM objects with building, activities and phones; with ``as_dicts``
+        the same rows are projected onto the stored ``organization_search`` document or, for
+        ``Organization`` queries, onto ``ORGANIZATION_JSON``, and returned as plain dicts ready
+        for JSON encoding. Each of ``expressions`` fills the query expression attribute (ORM)
+        or key (dicts) of that name.
+        """
+        if as_dicts:
+            searched = query.column_descriptions[0]["entity"] is OrganizationSearch
+            document = OrganizationSearch.document if searched else ORGANIZATION_JSON
+            columns = [expression.label(name) for name, expression in expressions.items()]
+            result = await db.execute(query.with_only_columns(document, *columns, maintain_column_froms=True))
+            return [{**row[0], **dict(zip(expressions, row[1:]))} for row in result.all()]
+
+        result = await db.execute(query.options(
+            *ORGANIZATION_LOADERS[:2],
+            contains_eager(Organization.building) if building_joined else ORGANIZATION_LOADERS[2],
+            *(with_expression(getattr(Organization, name), expression) for name, expression in expressions.items())
+        ))
+        return result.scalars().all()
+
+    @staticmethod
+    def _keyset(query: Select, after_id: Optional[int], limit: Optional[int], key: ColumnElement = Organization.id) -> Select:
+        """Applies keyset pagination ordered by organization ID"""
+        if after_id is not None:
+            query = query.where(key > after_id)
+        query = query.order_by(key)
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    @coalesced
     async def get_by_building(
             self,
             db: AsyncSession,
-            building_id: int
-    ) -> Sequence[Organization]:
-        """Returns all the organizations in the specified building"""
+            building_id: int,
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None,
+            as_dicts: bool = False
+    ) -> OrganizationRows:
+        """Returns the organizations in the specified building, ordered by ID"""
         try:
-            result = await db.execute(
-                select(Organization)
-                .where(Organization.building_id == building_id)
-                .options(
-                    selectinload(Organization.activities),
-                    selectinload(Organization.phones),
-                    joinedload(Organization.building)
-                )
-            )
-            return result.scalars().all()
+            return await self._fetch_hot(db, BY_BUILDING, as_dicts, after_id, limit, building_id=building_id)
         except Exception as e:
             logger.error(f"Error getting by building: {str(e)}", exc_info=True)
             raise
 
+    async def _get_by_activities(
+            self,
+            db: AsyncSession,
+            activities: Union[List[int], Select],
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None,
+            as_dicts: bool = False
+    ) -> OrganizationRows:
+        """Returns organizations having at least one of the activities, given by IDs or as an ``_activity_subtree``"""
+        if not isinstance(activities, Select):
+            return await self._fetch_hot(db, BY_ACTIVITY_IDS, as_dicts, after_id, limit, activity_ids=activities)
+        source = self._source(as_dicts)
+        if source is OrganizationSearch:
+            subtree = activities.subquery()
+            query = select(source).where(
+                source.activity_ids.overlap(select(func.array_agg(subtree.c.descendant_id)).scalar_subquery())
+            )
+        else:
+            query = select(source).where(source.id.in_(
+                select(organization_activity.c.organization_id)
+                .where(organization_activity.c.activity_id.in_(activities))
+            ))
+        return await self._fetch(db, self._keyset(query, after_id, limit, source.id), as_dicts)
+
+    @coalesced
     async def get_by_activity(
             self,
             db: AsyncSession,
-            activity_id: int
-    ) -> Sequence[Organization]:
+            activity_id: int,
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None,
+            as_dicts: bool = False
+    ) -> OrganizationRows:
         """Returns organizations by activity ID (including subsidiaries)"""
         try:
-            activity_ids = await self._get_activity_tree_ids(
-                db, activity_id, settings.MAX_ACTIVITY_DEPTH
-            )
-            if not activity_ids:
-                logger.warning(f"No activities found for id {activity_id}")
-                return []
+            if settings.ACTIVITY_INDEX_ENABLED:
+                await activity_tree_index.ensure_fresh(db)
+                activities = activity_tree_index.subtree_ids(activity_id, settings.MAX_ACTIVITY_DEPTH)
+                if not activities:
+                    logger.warning(f"No activities found for id {activity_id}")
+                    return []
+            else:
+                activities = self._activity_subtree(ActivityClosure.ancestor_id == activity_id, settings.MAX_ACTIVITY_DEPTH)
 
-            result = await db.execute(
-                select(Organization)
-                .join(Organization.activities)
-                .where(Activity.id.in_(activity_ids))
-                .options(
-                    selectinload(Organization.activities),
-                    selectinload(Organization.phones),
-                    joinedload(Organization.building)
-                )
-                .distinct()
-            )
-            return result.scalars().all()
+            return await self._get_by_activities(db, activities, after_id, limit, as_dicts)
         except Exception as e:
             logger.error(f"Error getting by activity: {str(e)}", exc_info=True)
             raise
 
+    @coalesced
     async def get_by_activity_name(
             self,
             db: AsyncSession,
-            activity_name: str
-    ) -> Sequence[Organization]:
+            activity_name: str,
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None,
+            as_dicts: bool = False
+    ) -> OrganizationRows:
         """Searches for organizations by type of activity (including subsidiaries)"""
         try:
-            result = await db.execute(
-                select(Activity)
-                .where(Activity.name.ilike(f"%{activity_name}%"))
-            )
-            activities = result.scalars().all()
-
-            activity_ids = []
-            for activity in activities:
-                activity_ids.extend(
-                    await self._get_activity_tree_ids(
-                        db, activity.id, settings.MAX_ACTIVITY_DEPTH
-                    )
+            if settings.ACTIVITY_INDEX_ENABLED:
+                await activity_tree_index.ensure_fresh(db)
+                activities = activity_tree_index.subtree_ids_by_name(
+                    activity_name, settings.MAX_ACTIVITY_DEPTH
                 )
-
-            if not activity_ids:
-                return []
-
-            result = await db.execute(
-                select(Organization)
-                .join(Organization.activities)
-                .where(Activity.id.in_(activity_ids))
-                .options(
-                    selectinload(Organization.activities),
-                    selectinload(Organization.phones),
-                    joinedload(Organization.building)
+                if not activities:
+                    return []
+            else:
+                activities = self._activity_subtree(
+                    ActivityClosure.ancestor_id.in_(select(Activity.id).where(Activity.name.ilike(f"%{activity_name}%"))),
+                    settings.MAX_ACTIVITY_DEPTH
                 )
-                .distinct()
-            )
-            return result.scalars().all()
+
+            return await self._get_by_activities(db, activities, after_id, limit, as_dicts)
         except Exception as e:
             logger.error(f"Error getting by activity name: {str(e)}", exc_info=True)
             raise
 
+    @coalesced
     async def get_by_name(
             self,
             db: AsyncSession,
-            name: str
-    ) -> Sequence[Organization]:
-        """Searches for organizations by name (case-insensitive)"""
+            name: str,
+            ranked: bool = False,
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None,
+            after_relevance: Optional[float] = None,
+            as_dicts: bool = False
+    ) -> OrganizationRows:
+        """Searches for organizations by name (case-insensitive).
+
+        Substring matching is served by the pg_trgm GIN index on organizations.name. In
+        ranked mode names similar to the query (pg_trgm ``%`` operator) also match, the
+        result is ordered by trigram similarity, most relevant first, and each organization
+        has ``relevance`` populated; pages continue after (``after_relevance``, ``after_id``),
+        which must be given together. Without pg_trgm ranked mode matches substrings only and
+        ranks them by the share of the name the query covers.
+        """
+        if ranked and (after_id is None) != (after_relevance is None):
+            raise ValueError("Ranked search pages continue after both after_id and after_relevance")
         try:
-            result = await db.execute(
-                select(Organization)
-                .where(Organization.name.ilike(f"%{name}%"))
-                .options(
-                    selectinload(Organization.activities),
-                    selectinload(Organization.phones),
-                    joinedload(Organization.building)
-                )
-            )
-            return result.scalars().all()
+            if not ranked:
+                return await self._fetch_hot(db, BY_NAME, as_dicts, after_id, limit, pattern=f"%{name}%")
+
+            source = self._source(as_dicts)
+            matches = source.name.ilike(f"%{name}%")
+            if await self.check_trigram(db):
+                relevance = func.similarity(source.name, name)
+                matches = or_(matches, source.name.op("%")(name))
+            else:
+                relevance = float(len(name)) / func.char_length(source.name)
+            query = select(source).where(matches).order_by(relevance.desc(), source.id)
+            if after_id is not None:
+                query = query.where(or_(
+                    relevance < after_relevance,
+                    and_(relevance == after_relevance, source.id > after_id)
+                ))
+            if limit:
+                query = query.limit(limit)
+            return await self._fetch(db, query, as_dicts, relevance=relevance)
         except Exception as e:
             logger.error(f"Error searching by name: {str(e)}", exc_info=True)
             raise
 
+    @coalesced
     async def get_by_id(
             self,
             db: AsyncSession,
-            org_id: int
-    ) -> Optional[Organization]:
+            org_id: int,
+            as_dicts: bool = False
+    ) -> Union[Organization, Dict[str, Any], None]:
         """Returns an organization by ID with all related data"""
         try:
-            result = await db.execute(
-                select(Organization)
-                .where(Organization.id == org_id)
-                .options(
-                    selectinload(Organization.activities),
-                    selectinload(Organization.phones),
-                    joinedload(Organization.building)
-                )
-            )
-            return result.scalars().first()
+            orgs = await self._fetch_hot(db, BY_ID, as_dicts, org_id=org_id)
+            return orgs[0] if orgs else None
         except Exception as e:
             logger.error(f"Error getting organization: {str(e)}", exc_info=True)
             raise
 
+    @coalesced
+    async def get_many(
+            self,
+            db: AsyncSession,
+            org_ids: Sequence[int],
+            as_dicts: bool = False
+    ) -> OrganizationRows:
+        """Returns the organizations with the given IDs in the order of ``org_ids``, skipping unknown IDs.
+
+        Everything is loaded by one query plus one per relationship, however many IDs are requested.
+        """
+        unique_ids = list(dict.fromkeys(org_ids))
+        if not unique_ids:
+            return []
+        try:
+            source = self._source(as_dicts)
+            orgs = await self._fetch(db, select(source).where(source.id.in_(unique_ids)), as_dicts)
+            by_id = {(org["id"] if as_dicts else org.id): org for org in orgs}
+            return [by_id[org_id] for org_id in unique_ids if org_id in by_id]
+        except Exception as e:
+            logger.error(f"Error getting organizations by IDs: {str(e)}", exc_info=True)
+            raise
+
+    @staticmethod
+    def _coordinates(source: type) -> Tuple[ColumnElement, ColumnElement]:
+        if source is OrganizationSearch:
+            return OrganizationSearch.latitude, OrganizationSearch.longitude
+        return Building.latitude, Building.longitude
+
+    def _geo_source(self, as_dicts: bool) -> type:
+        """``organization_search`` has no geography column, so PostGIS lookups join the buildings"""
+        return Organization if settings.USE_POSTGIS else self._source(as_dicts)
+
+    def _radius_filter(self, lat: float, lng: float, radius_km: float, source: type = Organization) -> ColumnElement[bool]:
+        """Builds a filter on the coordinates of ``source`` matching points within the radius.
+
+        With PostGIS uses ST_DWithin on the indexed ``buildings.geog`` column, otherwise
+        prefilters by a bounding box on ``ix_building_coords`` (``ix_organization_search_coords``)
+        and checks the exact haversine distance in SQL.
+        """
+        if settings.USE_POSTGIS:
+            return func.ST_DWithin(BUILDING_GEOG, _geography_point(lat, lng), float(radius_km) * 1000)
+
+        latitude, longitude = self._coordinates(source)
+        box = bounding_box(lat, lng, radius_km)
+        return and_(
+            latitude.between(box.min_lat, box.max_lat),
+            or_(*(longitude.between(min_lng, max_lng) for min_lng, max_lng in box.lng_ranges)),
+            haversine_distance_sql(lat, lng, latitude, longitude) <= float(radius_km)
+        )
+
+    @coalesced
     async def get_in_radius(
             self,
             db: AsyncSession,
             lat: float,
             lng: float,
             radius_km: float,
-            limit: Optional[int] = None
-    ) -> Sequence[Organization]:
+            limit: Optional[int] = None,
+            after_id: Optional[int] = None,
+            as_dicts: bool = False
+    ) -> OrganizationRows:
+        """Searches for organizations within the specified coordinates, ordered by ID"""
         if radius_km <= 0:
             return []
-        """Searches for organizations within the specified coordinates"""
         try:
-            result = await db.execute(
-                select(Organization)
-                .join(Organization.building)
-                .options(
-                    selectinload(Organization.activities),
-                    selectinload(Organization.phones),
-                    joinedload(Organization.building)
+            if settings.BUILDING_INDEX_ENABLED:
+                await building_index.ensure_fresh(db)
+                building_ids = building_index.within_radius(lat, lng, radius_km)
+                if not building_ids:
+                    return []
+                return await self._fetch_hot(
+                    db, BY_BUILDING_IDS, as_dicts, after_id, limit, building_ids=building_ids
                 )
-            )
 
-            orgs_in_radius = []
-            for org in result.scalars().all():
-                if org.building:
-                    distance = calculate_distance_km(
-                        lat, lng,
-                        org.building.latitude,
-                        org.building.longitude
-                    )
-                    if distance <= radius_km:
-                        orgs_in_radius.append(org)
-                        if limit and len(orgs_in_radius) >= limit:
-                            break
-
-            return orgs_in_radius
+            source = self._geo_source(as_dicts)
+            query = self._located(source).where(self._radius_filter(lat, lng, radius_km, source))
+            return await self._fetch(
+                db, self._keyset(query, after_id, limit, source.id), as_dicts, building_joined=True
+            )
         except Exception as e:
             logger.error(f"Error getting in radius: {str(e)}", exc_info=True)
             raise
 
+    @coalesced
+    async def get_nearest(
+            self,
+            db: AsyncSession,
+            lat: float,
+            lng: float,
+            limit: int,
+            max_radius_km: Optional[float] = None,
+            as_dicts: bool = False
+    ) -> OrganizationRows:
+        """Returns up to ``limit`` organizations closest to the point, ordered by distance.
+
+        Each organization has ``distance_km`` populated. With PostGIS the ordering uses the
+        index-assisted KNN operator ``<->`` on ``buildings.geog``; otherwise the search radius
+        grows geometrically from NEAREST_INITIAL_RADIUS_KM until enough organizations are
+        found, so only the bounding boxes around the point are scanned.
+        """
+        if limit < 1:
+            return []
+        max_radius_km = min(max_radius_km or settings.NEAREST_MAX_RADIUS_KM, settings.NEAREST_MAX_RADIUS_KM)
+        try:
+            if settings.USE_POSTGIS:
+                point = _geography_point(lat, lng)
+                distance = func.ST_Distance(BUILDING_GEOG, point) / 1000.0
+                query = (
+                    self._located(Organization)
+                    .where(func.ST_DWithin(BUILDING_GEOG, point, max_radius_km * 1000))
+                    .order_by(BUILDING_GEOG.op("<->")(point), Organization.id)
+                    .limit(limit)
+                )
+                return await self._fetch(db, query, as_dicts, building_joined=True, distance_km=distance)
+
+            source = self._geo_source(as_dicts)
+            distance = haversine_distance_sql(lat, lng, *self._coordinates(source))
+            radius_km = min(settings.NEAREST_INITIAL_RADIUS_KM, max_radius_km)
+            while True:
+                query = (
+                    self._located(source)
+                    .where(self._radius_filter(lat, lng, radius_km, source))
+                    .order_by(distance, source.id)
+                    .limit(limit)
+                )
+                orgs = await self._fetch(db, query, as_dicts, building_joined=True, distance_km=distance)
+                if len(orgs) >= limit or radius_km >= max_radius_km:
+                    return orgs
+                radius_km = min(radius_km * 4, max_radius_km)
+        except Exception as e:
+            logger.error(f"Error getting nearest: {str(e)}", exc_info=True)
+            raise
+
+    @staticmethod
+    def _located(source: type) -> Select:
+        """Organizations with coordinates: joined to their building unless read from ``organization_search``"""
+        if source is OrganizationSearch:
+            return select(source)
+        return select(source).join(Organization.building)
+
+    async def stream_export(
+            self,
+            db: AsyncSession,
+            batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams every organization with its building, phones and activities as plain dicts.
+
+        Reads stored ``organization_search`` documents or, when it is disabled, flat joined
+        rows that are assembled into one record per organization; either way ordered by
+        organization ID through a server-side cursor, so memory does not depend on catalog size.
+        """
+        if settings.ORGANIZATION_SEARCH_ENABLED:
+            try:
+                result = await db.stream(
+                    select(OrganizationSearch.document)
+                    .order_by(OrganizationSearch.id)
+                    .execution_options(yield_per=batch_size)
+                )
+                async for document, in result:
+                    yield document
+                return
+            except Exception as e:
+                logger.error(f"Error exporting organizations: {str(e)}", exc_info=True)
+                raise
+
+        query = (
+            select(
+                Organization.id, Organization.name,
+                Building.id, Building.address, Building.latitude, Building.longitude,
+                Phone.id, Phone.number,
+                Activity.id, Activity.name, Activity.parent_id
+            )
+            .outerjoin(Building, Organization.building_id == Building.id)
+            .outerjoin(Phone, Phone.organization_id == Organization.id)
+            .outerjoin(organization_activity, organization_activity.c.organization_id == Organization.id)
+            .outerjoin(Activity, Activity.id == organization_activity.c.activity_id)
+            .order_by(Organization.id)
+            .execution_options(yield_per=batch_size)
+        )
+        record: Optional[Dict[str, Any]] = None
+        phones: Dict[int, Dict[str, Any]] = {}
+        activities: Dict[int, Dict[str, Any]] = {}
+        try:
+            result = await db.stream(query)
+            async for (org_id, org_name, building_id, address, latitude, longitude,
+                       phone_id, number, activity_id, activity_name, parent_id) in result:
+                if record is None or record["id"] != org_id:
+                    if record is not None:
+                        yield {**record, "activities": list(activities.values()), "phones": list(phones.values())}
+                    building = None
+                    if building_id is not None:
+                        building = {"id": building_id, "address": address, "latitude": latitude, "longitude": longitude}
+                    record = {"id": org_id, "name": org_name, "building": building}
+                    phones, activities = {}, {}
+                if phone_id is not None:
+                    phones[phone_id] = {"id": phone_id, "number": number}
+                if activity_id is not None:
+                    activities[activity_id] = {"id": activity_id, "name": activity_name, "parent_id": parent_id}
+            if record is not None:
+                yield {**record, "activities": list(activities.values()), "phones": list(phones.values())}
+        except Exception as e:
+            logger.error(f"Error exporting organizations: {str(e)}", exc_info=True)
+            raise
+
 
 organization_crud = OrganizationCRUD()
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import sys
+from typing import BinaryIO
+from src.config.db import AsyncSessionLocal
+from src.config.settings import settings
+from src.crud.organization import organization_crud
+from src.utils.ndjson import ndjson_chunks
+
+
+async def export_catalog(output: BinaryIO) -> int:
+    """Writes every organization to the output as NDJSON and returns the number of records"""
+    count = 0
+    async with AsyncSessionLocal() as session:
+        records = organization_crud.stream_export(session, settings.EXPORT_BATCH_SIZE)
+        async for chunk in ndjson_chunks(records, settings.EXPORT_BATCH_SIZE):
+            output.write(chunk)
+            count += chunk.count(b"\n")
+    return count
+
+
+async def main(path: str) -> None:
+    if path == "-":
+        count = await export_catalog(sys.stdout.buffer)
+    else:
+        with open(path, "wb") as output:
+            count = await export_catalog(output)
+    print(f"Exported {count} organizations", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the organization catalog as NDJSON")
+    parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout")
+    args = parser.parse_args()
+    asyncio.run(main(args.output))
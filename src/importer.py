@@ -0,0 +1,372 @@
+"""Bulk import of organizations with their buildings, phones and activity links through COPY.
+
+Usage:
+    python -m src.importer generate --organizations 1000000 --workers 8
+    python -m src.importer load catalog.ndjson
+    python -m src.importer load catalog.csv
+
+``load`` reads NDJSON, either the documents written by ``src.export`` or flat records, and CSV
+with the header ``name,address,latitude,longitude,phones,activity_ids``, the lists being separated
+by ``;``. Buildings are created once per distinct address and coordinates; activities must already
+exist, links to unknown ones are skipped. ``generate`` creates Faker data in worker processes,
+including an activity tree when the table is empty.
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+import asyncpg
+import orjson
+from faker import Faker
+from sqlalchemy.engine import make_url
+from src.config.settings import settings
+
+BuildingKey = Tuple[str, float, float]
+
+TABLES = ("activities", "buildings", "organizations", "phones", "organization_activity")
+# Statement-level triggers that would refresh organization_search once per COPY of each table
+SEARCH_TRIGGERS = (
+    ("organizations", "organizations_sync_search_insert"),
+    ("phones", "phones_sync_search_insert"),
+    ("organization_activity", "organization_activity_sync_search_insert"),
+)
+
+
+class OrganizationRecord(NamedTuple):
+    name: str
+    # Address and coordinates, or the ID of a building that already exists
+    building: Union[BuildingKey, int, None]
+    phones: List[str]
+    activity_ids: List[int]
+
+
+class ImportStats:
+    """Rows written per table and the resulting throughput"""
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, int] = dict.fromkeys(TABLES, 0)
+        self.skipped_links = 0
+        self.started = time.perf_counter()
+
+    @property
+    def total(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def progress(self) -> str:
+        return f"{self.rows['organizations']} organizations, {self.total} rows, {self.rows_per_second():.0f} rows/s"
+
+    def summary(self) -> str:
+        lines = [f"{table}: {count}" for table, count in self.rows.items() if count]
+        if self.skipped_links:
+            lines.append(f"skipped links to unknown activities: {self.skipped_links}")
+        lines.append(f"{self.total} rows in {self.elapsed:.1f}s ({self.rows_per_second():.0f} rows/s)")
+        return "\n".join(lines)
+
+
+async def connect() -> asyncpg.Connection:
+    """Plain asyncpg connection to the configured database, COPY is not available through the ORM"""
+    url = make_url(settings.DB_URL).set(drivername="postgresql")
+    return await asyncpg.connect(url.render_as_string(hide_password=False))
+
+
+class BulkLoader:
+    """Writes organization records through COPY, one transaction per batch.
+
+    IDs are reserved from the table sequences beforehand, so that phones and activity links
+    are copied in the same batch as their organizations. The organization_search triggers
+    are disabled for the duration of each batch transaction, which then refreshes its
+    organizations with a single call instead of once per COPY; being transactional, the
+    ALTER TABLE is never visible to other sessions.
+    """
+
+    def __init__(self, conn: asyncpg.Connection, stats: Optional[ImportStats] = None) -> None:
+        self.conn = conn
+        self.stats = stats or ImportStats()
+        self._buildings: Dict[BuildingKey, int] = {}
+        self.activity_ids: Set[int] = set()
+
+    async def prepare(self) -> None:
+        """Loads the IDs of existing activities, links are only written for these"""
+        self.activity_ids = {row["id"] for row in await self.conn.fetch("SELECT id FROM activities")}
+
+    async def reserve_ids(self, table: str, count: int) -> List[int]:
+        if not count:
+            return []
+        rows = await self.conn.fetch(
+            "SELECT nextval(pg_get_serial_sequence($1, 'id')) AS id FROM generate_series(1, $2)", table, count
+        )
+        return [row["id"] for row in rows]
+
+    async def copy(self, table: str, columns: Sequence[str], rows: List[Tuple[Any, ...]]) -> None:
+        if rows:
+            await self.conn.copy_records_to_table(table, records=rows, columns=columns)
+            self.stats.rows[table] += len(rows)
+
+    async def write_activities(self, activities: Sequence[Tuple[str, Optional[int]]]) -> List[int]:
+        """Copies (name, index of the parent in the sequence or None) pairs as one statement and returns their IDs"""
+        ids = await self.reserve_ids("activities", len(activities))
+        rows = [
+            (activity_id, name, None if parent is None else ids[parent])
+            for activity_id, (name, parent) in zip(ids, activities)
+        ]
+        async with self.conn.transaction():
+            await self.copy("activities", ("id", "name", "parent_id"), rows)
+        self.activity_ids.update(ids)
+        return ids
+
+    async def write_buildings(self, buildings: Sequence[BuildingKey]) -> List[int]:
+        ids = await self.reserve_ids("buildings", len(buildings))
+        async with self.conn.transaction():
+            await self.copy(
+                "buildings", ("id", "address", "latitude", "longitude"),
+                [(building_id, *building) for building_id, building in zip(ids, buildings)]
+            )
+        self._buildings.update(zip(buildings, ids))
+        return ids
+
+    async def _set_search_triggers(self, enabled: bool) -> None:
+        action = "ENABLE" if enabled else "DISABLE"
+        for table, trigger in SEARCH_TRIGGERS:
+            await self.conn.execute(f"ALTER TABLE {table} {action} TRIGGER {trigger}")
+
+    async def write_batch(self, records: Sequence[OrganizationRecord]) -> None:
+        new_buildings = list(dict.fromkeys(
+            record.building for record in records
+            if isinstance(record.building, tuple) and record.building not in self._buildings
+        ))
+        if new_buildings:
+            await self.write_buildings(new_buildings)
+
+        org_ids = await self.reserve_ids("organizations", len(records))
+        organizations, phones, links = [], [], []
+        for org_id, record in zip(org_ids, records):
+            building = record.building
+            building_id = self._buildings[building] if isinstance(building, tuple) else building
+            organizations.append((org_id, record.name, building_id))
+            phones.extend((number, org_id) for number in record.phones)
+            for activity_id in dict.fromkeys(record.activity_ids):
+                if activity_id in self.activity_ids:
+                    links.append((org_id, activity_id))
+                else:
+                    self.stats.skipped_links += 1
+
+        async with self.conn.transaction():
+            await self._set_search_triggers(False)
+            await self.copy("organizations", ("id", "name", "building_id"), organizations)
+            await self.copy("phones", ("number", "organization_id"), phones)
+            await self.copy("organization_activity", ("organization_id", "activity_id"), links)
+            await self.conn.execute("SELECT refresh_organization_search($1::integer[])", org_ids)
+            await self._set_search_triggers(True)
+
+    async def load(self, records: Iterable[OrganizationRecord], batch_size: int) -> ImportStats:
+        for batch in batched(records, batch_size):
+            await self.write_batch(batch)
+            print(self.stats.progress(), file=sys.stderr)
+        return self.stats
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(";") if item.strip()]
+
+
+def record_from_row(row: Dict[str, str]) -> OrganizationRecord:
+    """Builds a record from a CSV row, buildings are given by address and coordinates"""
+    building = None
+    if row.get("address"):
+        building = (row["address"], float(row["latitude"]), float(row["longitude"]))
+    return OrganizationRecord(
+        row["name"], building, _split(row.get("phones")), [int(item) for item in _split(row.get("activity_ids"))]
+    )
+
+
+def record_from_document(document: Dict[str, Any]) -> OrganizationRecord:
+    """Builds a record from an exported OrganizationRead document or a flat record with the CSV fields"""
+    if "building" not in document and "activities" not in document:
+        return record_from_row({
+            key: ";".join(map(str, value)) if isinstance(value, list) else value
+            for key, value in document.items()
+        })
+    building = document.get("building")
+    return OrganizationRecord(
+        document["name"],
+        (building["address"], building["latitude"], building["longitude"]) if building else None,
+        [phone["number"] if isinstance(phone, dict) else phone for phone in document.get("phones", ())],
+        [activity["id"] if isinstance(activity, dict) else activity for activity in document.get("activities", ())],
+    )
+
+
+def read_records(path: str, file_format: Optional[str] = None) -> Iterator[OrganizationRecord]:
+    """Streams records from a CSV or NDJSON file, the format being taken from the extension by default"""
+    file_format = file_format or ("csv" if path.endswith(".csv") else "ndjson")
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        if file_format == "csv":
+            yield from map(record_from_row, csv.DictReader(source))
+        else:
+            yield from (record_from_document(orjson.loads(line)) for line in source if line.strip())
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+_fake: Optional[Faker] = None
+
+
+def _seeded_faker(seed: int) -> Faker:
+    """One Faker per worker process, reseeded per chunk so that a dataset is reproducible"""
+    global _fake
+    if _fake is None:
+        _fake = Faker("ru_RU")
+    _fake.seed_instance(seed)
+    return _fake
+
+
+def fake_buildings(seed: int, count: int) -> List[BuildingKey]:
+    fake, rng = _seeded_faker(seed), random.Random(seed)
+    return [
+        (f"{fake.city()}, {fake.street_address()}", rng.uniform(55.55, 55.90), rng.uniform(37.35, 37.85))
+        for _ in range(count)
+    ]
+
+
+def fake_organizations(seed: int, count: int, building_count: int, activity_ids: Sequence[int]) -> List[OrganizationRecord]:
+    """Records referencing buildings by their index among ``building_count`` generated ones"""
+    fake, rng = _seeded_faker(seed), random.Random(seed)
+    return [
+        OrganizationRecord(
+            f"ООО {fake.company()}",
+            rng.randrange(building_count),
+            [fake.phone_number() for _ in range(rng.randint(1, 3))],
+            rng.sample(activity_ids, min(len(activity_ids), rng.randint(1, 3))),
+        )
+        for _ in range(count)
+    ]
+
+
+def fake_activity_tree(seed: int, roots: int, fanout: int, depth: int) -> List[Tuple[str, Optional[int]]]:
+    """(name, parent index) pairs of a complete tree, parents first"""
+    fake = _seeded_faker(seed)
+    activities: List[Tuple[str, Optional[int]]] = [(fake.word().capitalize(), None) for _ in range(roots)]
+    level = list(range(roots))
+    for _ in range(depth - 1):
+        next_level = []
+        for parent in level:
+            for _ in range(fanout):
+                next_level.append(len(activities))
+                activities.append((fake.word().capitalize(), parent))
+        level = next_level
+    return activities
+
+
+async def _pipelined(
+        executor: ProcessPoolExecutor,
+        tasks: Iterable[Tuple[Any, ...]],
+        depth: int
+) -> AsyncIterator[Any]:
+    """Runs ``(function, *args)`` tasks in the executor, keeping ``depth`` of them in flight, and yields results in order"""
+    loop = asyncio.get_running_loop()
+    pending: Deque[asyncio.Future] = deque()
+    for function, *args in tasks:
+        pending.append(loop.run_in_executor(executor, function, *args))
+        if len(pending) >= depth:
+            yield await pending.popleft()
+    while pending:
+        yield await pending.popleft()
+
+
+async def generate_catalog(
+        loader: BulkLoader,
+        organizations: int,
+        buildings: Optional[int] = None,
+        workers: int = 1,
+        batch_size: int = 10_000,
+        seed: int = 0,
+        activity_roots: int = 10,
+        activity_fanout: int = 4,
+        activity_depth: Optional[int] = None
+) -> ImportStats:
+    """Generates organizations with Faker in worker processes while the previous batches are being copied"""
+    buildings = buildings or max(1, organizations // 4)
+    await loader.prepare()
+    if not loader.activity_ids:
+        await loader.write_activities(fake_activity_tree(
+            seed, activity_roots, activity_fanout, activity_depth or settings.MAX_ACTIVITY_DEPTH
+        ))
+    activity_ids = sorted(loader.activity_ids)
+
+    def chunks(total: int) -> Iterator[Tuple[int, int]]:
+        for index, start in enumerate(range(0, total, batch_size)):
+            yield seed + index + 1, min(batch_size, total - start)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        building_ids: List[int] = []
+        building_tasks = ((fake_buildings, chunk_seed, count) for chunk_seed, count in chunks(buildings))
+        async for generated in _pipelined(executor, building_tasks, workers * 2):
+            building_ids.extend(await loader.write_buildings(generated))
+
+        organization_tasks = (
+            (fake_organizations, chunk_seed + buildings, count, buildings, activity_ids)
+            for chunk_seed, count in chunks(organizations)
+        )
+        async for records in _pipelined(executor, organization_tasks, workers * 2):
+            await loader.write_batch([record._replace(building=building_ids[record.building]) for record in records])
+            print(loader.stats.progress(), file=sys.stderr)
+    return loader.stats
+
+
+async def main(args: argparse.Namespace) -> None:
+    conn = await connect()
+    try:
+        loader = BulkLoader(conn)
+        if args.command == "generate":
+            stats = await generate_catalog(
+                loader, args.organizations, args.buildings, args.workers, args.batch_size, args.seed,
+                args.activity_roots, args.activity_fanout, args.activity_depth
+            )
+        else:
+            await loader.prepare()
+            stats = await loader.load(read_records(args.path, args.format), args.batch_size)
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+    print(stats.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Organizations per COPY transaction")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("load", help="Import organizations from a CSV or NDJSON file")
+    load.add_argument("path", help="Input file, '-' for stdin")
+    load.add_argument("--format", choices=("csv", "ndjson"), help="Input format, by default from the file extension")
+
+    generate = commands.add_parser("generate", help="Generate organizations with Faker")
+    generate.add_argument("--organizations", type=int, required=True, help="Number of organizations")
+    generate.add_argument("--buildings", type=int, help="Number of buildings, a quarter of the organizations by default")
+    generate.add_argument("--workers", type=int, default=1, help="Faker worker processes")
+    generate.add_argument("--seed", type=int, default=0, help="Seed of the generated dataset")
+    generate.add_argument("--activity-roots", type=int, default=10, help="Root activities when the table is empty")
+    generate.add_argument("--activity-fanout", type=int, default=4, help="Children per activity when the table is empty")
+    generate.add_argument("--activity-depth", type=int, help="Levels of the activity tree, MAX_ACTIVITY_DEPTH by default")
+
+    asyncio.run(main(parser.parse_args()))
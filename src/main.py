@@ -1,22 +1,57 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from src.api import organization
+from src.api import activity, cache, metrics, organization, pool
+from src.cache.activity_tree import activity_tree_index
+from src.cache.buildings import building_index
+from src.cache.shared import SHARED_STATE_ENV, attach_snapshot
+from src.cache.versions import catalog_versions
+from src.config.db import AsyncSessionLocal, replicas
 from src.config.logger import setup_logging, logger
-import time
+from src.config.settings import settings
+from src.crud.organization import organization_crud
+from src.utils.instrumentation import InstrumentationMiddleware
+from src.utils.profiling import QueryProfilingMiddleware
+from src.utils.responses import OrjsonResponse
 
-app = FastAPI(title="Catalog")
 
-setup_logging()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    caches = [
+        cache for cache, enabled in (
+            (activity_tree_index, settings.ACTIVITY_INDEX_ENABLED),
+            (building_index, settings.BUILDING_INDEX_ENABLED),
+        ) if enabled
+    ]
+    try:
+        shared_state = os.environ.get(SHARED_STATE_ENV)
+        if shared_state:
+            attached = attach_snapshot(shared_state)
+            caches = [cache for cache in caches if cache not in attached]
+        async with AsyncSessionLocal() as db:
+            # Read before loading: the first refresh then bumps the tables written since
+            catalog_versions.set_baseline(await catalog_versions.read(db))
+            await organization_crud.check_trigram(db)
+            for cache in caches:
+                await cache.load(db)
+    except Exception as e:
+        logger.error(f"Failed to warm up in-memory indexes: {str(e)}", exc_info=True)
+    yield
+    await replicas.dispose()
+
 
+app = FastAPI(title="Catalog", lifespan=lifespan, default_response_class=OrjsonResponse)
 
-@app.middleware("http")
-async def log_requests(request, call_next):
-    logger.info(f"Started {request.method} {request.url}")
-    start_time = time.time()
-    response = await call_next(request)
-    duration = (time.time() - start_time) * 1000
-    logger.info(f"Completed {request.method} {request.url} with status {response.status_code} in {duration:.2f}ms")
-    return response
+setup_logging()
 
+if settings.SQL_PROFILING_ENABLED:
+    app.add_middleware(QueryProfilingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(InstrumentationMiddleware)
 
 app.include_router(organization.router, prefix="/organizations", tags=["Organizations"])
+app.include_router(activity.router, prefix="/activities", tags=["Activities"])
+app.include_router(cache.router, prefix="/cache", tags=["Cache"])
+app.include_router(pool.router, prefix="/pool", tags=["Pool"])
+app.include_router(metrics.router, tags=["Metrics"])
 
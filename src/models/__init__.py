@@ -1,13 +1,19 @@
 from src.models.activity import Activity
+from src.models.activity_closure import ActivityClosure
 from src.models.building import Building
 from src.models.organization import Organization
 from src.models.phone import Phone
 from src.models.associations import organization_activity
+from src.models.catalog_version import CatalogVersion
+from src.models.organization_search import OrganizationSearch
 
 __all__ = [
     'Activity',
+    'ActivityClosure',
     'Building',
+    'CatalogVersion',
     'Organization',
+    'OrganizationSearch',
     'Phone',
     'organization_activity',
 ]
@@ -11,17 +11,18 @@ class Activity(Base):
     name = Column(String(255), nullable=False, index=True)
     parent_id = Column(Integer, ForeignKey('activities.id', ondelete="CASCADE"), nullable=True, index=True)
 
-    parent = relationship('Activity', remote_side=[id], back_populates='children')
+    parent = relationship('Activity', remote_side=[id], back_populates='children', lazy='raise')
     children = relationship(
         'Activity',
         back_populates='parent',
         remote_side=[parent_id],
         cascade='all, delete-orphan',
-        lazy='selectin'
+        passive_deletes=True,
+        lazy='raise'
     )
     organizations = relationship(
         'Organization',
         secondary=organization_activity,
         back_populates='activities',
-        lazy='selectin'
+        lazy='raise'
     )
@@ -0,0 +1,92 @@
+from sqlalchemy import Column, Integer, ForeignKey, DDL, event
+from src.config.db import Base
+
+
+class ActivityClosure(Base):
+    """Every (ancestor, descendant) pair of the activity tree with the distance between them.
+
+    Each activity is its own ancestor at depth 0, so the subtree of an activity down to
+    ``level`` levels is ``ancestor_id = id AND depth < level``. Maintained by statement-level
+    triggers on ``activities``; do not write to it directly.
+    """
+    __tablename__ = 'activity_closure'
+
+    ancestor_id = Column(Integer, ForeignKey('activities.id', ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey('activities.id', ondelete="CASCADE"), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False)
+
+
+# Recomputes the ancestors of the given activities and of everything below them (all activities
+# for NULL). The subtrees are taken from the closure itself: pairs are only stale below a moved
+# activity, and every activity whose path changed lies in the old subtree of one of them.
+# Deleted activities need nothing, their pairs go with them through the foreign keys. A cycle
+# the update check misses stops the recursion and ends in a primary key violation.
+REFRESH_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION refresh_activity_closure(ids integer[]) RETURNS void AS $$
+BEGIN
+    IF ids IS NULL THEN
+        DELETE FROM activity_closure;
+        ids := ARRAY(SELECT id FROM activities);
+    ELSE
+        ids := ARRAY(
+            SELECT unnest(ids)
+            UNION SELECT descendant_id FROM activity_closure WHERE ancestor_id = ANY(ids)
+        );
+        DELETE FROM activity_closure WHERE descendant_id = ANY(ids);
+    END IF;
+
+    INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE paths AS (
+        SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth, parent_id
+        FROM activities WHERE id = ANY(ids)
+        UNION ALL
+        SELECT a.id, p.descendant_id, p.depth + 1, a.parent_id
+        FROM paths p JOIN activities a ON a.id = p.parent_id
+    ) CYCLE ancestor_id SET is_cycle USING path
+    SELECT ancestor_id, descendant_id, depth FROM paths;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SYNC_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION sync_activity_closure() RETURNS trigger AS $$
+DECLARE
+    moved integer;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_activity_closure(ARRAY(SELECT id FROM new_rows));
+        RETURN NULL;
+    END IF;
+
+    SELECT n.id INTO moved
+    FROM new_rows n JOIN activity_closure c ON c.ancestor_id = n.id AND c.descendant_id = n.parent_id
+    LIMIT 1;
+    IF moved IS NOT NULL THEN
+        RAISE EXCEPTION USING MESSAGE = 'Activity ' || moved || ' cannot be moved under its own descendant';
+    END IF;
+    PERFORM refresh_activity_closure(ARRAY(
+        SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+        WHERE n.parent_id IS DISTINCT FROM o.parent_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Transition tables allow one event per trigger, and UPDATE OF parent_id cannot have them at all
+SYNC_TRIGGERS_SQL = (
+    "CREATE OR REPLACE TRIGGER activities_sync_closure_insert AFTER INSERT ON activities "
+    "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION sync_activity_closure()",
+    "CREATE OR REPLACE TRIGGER activities_sync_closure_update AFTER UPDATE ON activities "
+    "REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION sync_activity_closure()",
+)
+
+
+event.listen(Base.metadata, 'after_create', DDL(REFRESH_FUNCTION_SQL))
+event.listen(Base.metadata, 'after_create', DDL(SYNC_FUNCTION_SQL))
+for _statement in SYNC_TRIGGERS_SQL:
+    event.listen(Base.metadata, 'after_create', DDL(_statement))
+# A schema created over existing data starts consistent
+event.listen(Base.metadata, 'after_create', DDL("SELECT refresh_activity_closure(NULL)"))
+event.listen(Base.metadata, 'after_drop', DDL("DROP FUNCTION IF EXISTS sync_activity_closure() CASCADE"))
+event.listen(Base.metadata, 'after_drop', DDL("DROP FUNCTION IF EXISTS refresh_activity_closure(integer[])"))
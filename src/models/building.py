@@ -11,7 +11,7 @@ class Building(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
 
-    organizations = relationship('Organization', back_populates='building', cascade='all, delete')
+    organizations = relationship('Organization', back_populates='building', cascade='all, delete', lazy='raise')
 
     __table_args__ = (
         Index('ix_building_coords', 'latitude', 'longitude'),
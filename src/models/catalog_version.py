@@ -0,0 +1,39 @@
+from sqlalchemy import Column, String, BigInteger, DDL, event
+from src.config.db import Base
+
+VERSIONED_TABLES = ('activities', 'buildings', 'organizations', 'organization_activity', 'phones')
+
+
+class CatalogVersion(Base):
+    """Change counter per catalog table, bumped by statement-level triggers on every write"""
+    __tablename__ = 'catalog_versions'
+
+    table_name = Column(String(63), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+BUMP_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO catalog_versions (table_name, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = catalog_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def bump_trigger_sql(table: str) -> str:
+    return (
+        f"CREATE OR REPLACE TRIGGER {table}_bump_catalog_version "
+        f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()"
+    )
+
+
+# create_all/drop_all (used by the tests and benchmarks) get the same triggers as the migration;
+# the metadata event fires even when the tables already exist, hence OR REPLACE
+event.listen(Base.metadata, 'after_create', DDL(BUMP_FUNCTION_SQL))
+for _table in VERSIONED_TABLES:
+    event.listen(Base.metadata, 'after_create', DDL(bump_trigger_sql(_table)))
+event.listen(Base.metadata, 'after_drop', DDL("DROP FUNCTION IF EXISTS bump_catalog_version() CASCADE"))
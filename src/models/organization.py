@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from src.config.db import Base
 from src.models.associations import organization_activity
 
@@ -11,11 +11,18 @@ class Organization(Base):
     name = Column(String, nullable=False, index=True)
     building_id = Column(Integer, ForeignKey('buildings.id', ondelete="SET NULL"), nullable=True)
 
-    building = relationship('Building', back_populates='organizations', lazy='joined')
-    phones = relationship('Phone', back_populates='organization', cascade='all, delete', lazy='selectin')
+    building = relationship('Building', back_populates='organizations', lazy='raise')
+    phones = relationship(
+        'Phone', back_populates='organization', cascade='all, delete', passive_deletes=True, lazy='raise'
+    )
     activities = relationship(
         'Activity',
         secondary=organization_activity,
         back_populates='organizations',
-        lazy='selectin'
+        lazy='raise'
     )
+
+    # Filled per query via with_expression(): distance to the search point in nearest lookups
+    # and trigram similarity to the query in ranked name search
+    distance_km = query_expression()
+    relevance = query_expression()
@@ -0,0 +1,165 @@
+from typing import List
+from sqlalchemy import Column, Integer, String, Float, Index, JSON, DDL, event
+from sqlalchemy.dialects.postgresql import ARRAY
+from src.config.db import Base
+
+
+class OrganizationSearch(Base):
+    """Denormalized read model: one row per organization with its ready OrganizationRead document.
+
+    Maintained by statement-level triggers on the catalog tables within the writing
+    transaction; concurrent writers of one organization refresh its row one after the
+    other, the last from a snapshot that includes the others. Do not write to it directly.
+    """
+    __tablename__ = 'organization_search'
+
+    # Named like Organization's attributes so that queries can be built against either
+    id = Column('organization_id', Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    building_id = Column(Integer, nullable=True, index=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    phones = Column(ARRAY(String), nullable=False)
+    activity_ids = Column(ARRAY(Integer), nullable=False)
+    document = Column(JSON, nullable=False)
+
+    __table_args__ = (
+        Index('ix_organization_search_activity_ids', 'activity_ids', postgresql_using='gin'),
+        Index('ix_organization_search_phones', 'phones', postgresql_using='gin'),
+        Index('ix_organization_search_coords', 'latitude', 'longitude'),
+    )
+
+
+# Upserts the rows of the given organizations (all of them for NULL) and drops rows of deleted ones.
+# Rows written earlier in the same transaction (bulk loads) have no statistics yet, and the planner
+# would scan whole tables per organization; without seq scans the lookups stay on the indexes.
+REFRESH_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION refresh_organization_search(ids integer[]) RETURNS void AS $$
+BEGIN
+    IF ids IS NULL THEN
+        DELETE FROM organization_search s
+        WHERE NOT EXISTS (SELECT 1 FROM organizations o WHERE o.id = s.organization_id);
+        ids := ARRAY(SELECT id FROM organizations);
+    ELSE
+        DELETE FROM organization_search WHERE organization_id = ANY(
+            ARRAY(SELECT unnest(ids) EXCEPT SELECT id FROM organizations WHERE id = ANY(ids))
+        );
+    END IF;
+    IF cardinality(ids) = 0 THEN
+        RETURN;
+    END IF;
+    -- Held until commit: a concurrent writer of these organizations, to whichever source table,
+    -- refreshes them only once this transaction has committed, from a snapshot that includes it.
+    -- NO KEY UPDATE conflicts with itself but not with the key share locks of foreign key checks
+    PERFORM 1 FROM organizations WHERE id = ANY(ids) ORDER BY id FOR NO KEY UPDATE;
+
+    INSERT INTO organization_search (
+        organization_id, name, building_id, latitude, longitude, phones, activity_ids, document
+    )
+    SELECT o.id, o.name, o.building_id, b.latitude, b.longitude,
+           ARRAY(SELECT p.number FROM phones p WHERE p.organization_id = o.id ORDER BY p.id),
+           ARRAY(SELECT oa.activity_id FROM organization_activity oa
+                 WHERE oa.organization_id = o.id ORDER BY oa.activity_id),
+           json_build_object(
+               'id', o.id,
+               'name', o.name,
+               'building', CASE WHEN b.id IS NOT NULL THEN json_build_object(
+                   'id', b.id, 'address', b.address, 'latitude', b.latitude, 'longitude', b.longitude
+               ) END,
+               'activities', COALESCE((
+                   SELECT json_agg(json_build_object('id', a.id, 'name', a.name, 'parent_id', a.parent_id) ORDER BY a.id)
+                   FROM organization_activity oa JOIN activities a ON a.id = oa.activity_id
+                   WHERE oa.organization_id = o.id
+               ), '[]'::json),
+               'phones', COALESCE((
+                   SELECT json_agg(json_build_object('id', p.id, 'number', p.number) ORDER BY p.id)
+                   FROM phones p WHERE p.organization_id = o.id
+               ), '[]'::json)
+           )
+    FROM organizations o
+    LEFT JOIN buildings b ON b.id = o.building_id
+    WHERE o.id = ANY(ids)
+    ON CONFLICT (organization_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        building_id = EXCLUDED.building_id,
+        latitude = EXCLUDED.latitude,
+        longitude = EXCLUDED.longitude,
+        phones = EXCLUDED.phones,
+        activity_ids = EXCLUDED.activity_ids,
+        document = EXCLUDED.document;
+END;
+$$ LANGUAGE plpgsql
+SET enable_seqscan = off
+"""
+
+REBUILD_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION rebuild_organization_search() RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_organization_search(NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Organizations affected by the changed rows of each source table, {rows} being a transition table
+SEARCH_SOURCES = {
+    'organizations': "SELECT id FROM {rows}",
+    'phones': "SELECT organization_id FROM {rows}",
+    'organization_activity': "SELECT organization_id FROM {rows}",
+    'buildings': "SELECT organization_id FROM organization_search WHERE building_id IN (SELECT id FROM {rows})",
+    'activities': "SELECT organization_id FROM organization_search WHERE activity_ids && ARRAY(SELECT id FROM {rows})",
+}
+
+
+def sync_function_sql(table: str) -> str:
+    source = SEARCH_SOURCES[table]
+    return f"""
+CREATE OR REPLACE FUNCTION sync_organization_search_{table}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_organization_search(ARRAY({source.format(rows='new_rows')}));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_organization_search(ARRAY({source.format(rows='old_rows')}));
+    ELSE
+        PERFORM refresh_organization_search(ARRAY(
+            {source.format(rows='new_rows')} UNION {source.format(rows='old_rows')}
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def sync_trigger_sql(table: str) -> List[str]:
+    """Transition tables allow one event per trigger, hence a trigger per operation"""
+    referencing = {
+        'INSERT': "NEW TABLE AS new_rows",
+        'UPDATE': "NEW TABLE AS new_rows OLD TABLE AS old_rows",
+        'DELETE': "OLD TABLE AS old_rows",
+    }
+    statements = [
+        f"CREATE OR REPLACE TRIGGER {table}_sync_search_{operation.lower()} "
+        f"AFTER {operation} ON {table} REFERENCING {rows} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION sync_organization_search_{table}()"
+        for operation, rows in referencing.items()
+    ]
+    statements.append(
+        f"CREATE OR REPLACE TRIGGER {table}_sync_search_truncate AFTER TRUNCATE ON {table} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION rebuild_organization_search()"
+    )
+    return statements
+
+
+event.listen(Base.metadata, 'after_create', DDL(REFRESH_FUNCTION_SQL))
+event.listen(Base.metadata, 'after_create', DDL(REBUILD_FUNCTION_SQL))
+for _table in SEARCH_SOURCES:
+    event.listen(Base.metadata, 'after_create', DDL(sync_function_sql(_table)))
+    for _statement in sync_trigger_sql(_table):
+        event.listen(Base.metadata, 'after_create', DDL(_statement))
+# A schema created over existing data starts consistent
+event.listen(Base.metadata, 'after_create', DDL("SELECT refresh_organization_search(NULL)"))
+event.listen(Base.metadata, 'after_drop', DDL("DROP FUNCTION IF EXISTS rebuild_organization_search() CASCADE"))
+for _table in SEARCH_SOURCES:
+    event.listen(Base.metadata, 'after_drop', DDL(f"DROP FUNCTION IF EXISTS sync_organization_search_{_table}() CASCADE"))
+event.listen(Base.metadata, 'after_drop', DDL("DROP FUNCTION IF EXISTS refresh_organization_search(integer[])"))
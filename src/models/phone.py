@@ -10,4 +10,4 @@ class Phone(Base):
     number = Column(String(50), nullable=False, index=True)
     organization_id = Column(Integer, ForeignKey('organizations.id', ondelete="CASCADE"), nullable=False, index=True)
 
-    organization = relationship('Organization', back_populates='phones')
+    organization = relationship('Organization', back_populates='phones', lazy='raise')
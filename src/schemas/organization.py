@@ -3,6 +3,7 @@ from typing import List, Optional
 from src.schemas.activity import ActivityBase, ActivityRead
 from src.schemas.building import BuildingBase
 from src.schemas.phone import PhoneBase
+from src.config.settings import settings
 
 
 class OrganizationBase(BaseModel):
@@ -17,4 +18,17 @@ class OrganizationRead(OrganizationBase):
     phones: List[PhoneBase] = Field(default_factory=list)
 
 
+class OrganizationNearby(OrganizationRead):
+    distance_km: float
+
+
+class OrganizationBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=settings.BATCH_MAX_IDS)
+
+
+class OrganizationBatchRead(BaseModel):
+    organizations: List[OrganizationRead]
+    missing: List[int]
+
+
 ActivityRead.model_rebuild()
@@ -1,4 +1,9 @@
-from math import radians, cos, sin, sqrt, atan2
+from math import radians, degrees, cos, sin, sqrt, atan2, asin, pi
+from typing import List, NamedTuple, Tuple
+import numpy as np
+from sqlalchemy import ColumnElement, func, literal
+
+EARTH_RADIUS_KM = 6371.0
 
 
 def calculate_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -17,3 +22,69 @@ def calculate_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) ->
     c = 2 * atan2(sqrt(a), sqrt(1 - a))
 
     return R * c
+
+
+def calculate_distances_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Vectorized haversine: distances in km from one point to arrays of float64 coordinates"""
+    lat_rad = radians(lat)
+    lats_rad = np.radians(lats)
+    dlat = lats_rad - lat_rad
+    dlon = np.radians(lons) - radians(lon)
+
+    a = np.sin(dlat * 0.5) ** 2 + cos(lat_rad) * np.cos(lats_rad) * np.sin(dlon * 0.5) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def within_radius_km(
+        lat: float,
+        lon: float,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        radius_km: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns a boolean mask of points within the radius and the distance array"""
+    distances = calculate_distances_km(lat, lon, lats, lons)
+    return distances <= radius_km, distances
+
+
+class BoundingBox(NamedTuple):
+    min_lat: float
+    max_lat: float
+    lng_ranges: List[Tuple[float, float]]
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> BoundingBox:
+    """Returns a lat/lng box enclosing the circle; longitude is split in two ranges across the antimeridian"""
+    angular_radius = radius_km / EARTH_RADIUS_KM
+    min_lat = lat - degrees(angular_radius)
+    max_lat = lat + degrees(angular_radius)
+
+    if min_lat <= -90 or max_lat >= 90 or angular_radius >= pi / 2:
+        return BoundingBox(max(min_lat, -90.0), min(max_lat, 90.0), [(-180.0, 180.0)])
+
+    delta_lng = degrees(asin(min(1.0, sin(angular_radius) / cos(radians(lat)))))
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180:
+        lng_ranges = [(min_lng + 360, 180.0), (-180.0, max_lng)]
+    elif max_lng > 180:
+        lng_ranges = [(min_lng, 180.0), (-180.0, max_lng - 360)]
+    else:
+        lng_ranges = [(min_lng, max_lng)]
+    return BoundingBox(min_lat, max_lat, lng_ranges)
+
+
+def haversine_distance_sql(
+        lat: float,
+        lng: float,
+        lat_column: ColumnElement[float],
+        lng_column: ColumnElement[float]
+) -> ColumnElement[float]:
+    """SQL expression of the great-circle distance in km from the point to the coordinate columns"""
+    lat_rad = radians(lat)
+    dlat = func.radians(lat_column) - lat_rad
+    dlng = func.radians(lng_column) - radians(lng)
+    a = (
+        func.power(func.sin(dlat * 0.5), 2)
+        + cos(lat_rad) * func.cos(func.radians(lat_column)) * func.power(func.sin(dlng * 0.5), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(literal(1.0), a)))
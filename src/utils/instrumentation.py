@@ -0,0 +1,117 @@
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.config.settings import settings
+from src.utils.metrics import registry
+
+STAGES = ("db", "serialize", "cache")
+
+access_logger = logging.getLogger("app.access")
+
+request_seconds = registry.histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last body chunk", ("method", "route")
+)
+stage_seconds = registry.histogram(
+    "http_request_stage_duration_seconds", "Time spent per request in the database, serialization and the response cache", ("route", "stage")
+)
+requests_total = registry.counter("http_requests_total", "Requests by route and status code", ("method", "route", "status"))
+statements_total = registry.counter("db_statements_total", "SQL statements executed while handling requests", ("route",))
+
+
+class RequestTimings:
+    """Per-request stage accumulators in nanoseconds"""
+
+    __slots__ = ("db", "serialize", "cache", "statements")
+
+    def __init__(self) -> None:
+        self.db = self.serialize = self.cache = 0
+        self.statements = 0
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Adds the duration of the block to ``stage`` of the current request, if there is one"""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = perf_counter_ns()
+    try:
+        yield
+    finally:
+        setattr(timings, stage, getattr(timings, stage) + perf_counter_ns() - start)
+
+
+# Listening on the Engine class covers the primary, the replicas and engines created by the tests
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._started_ns = perf_counter_ns()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = current_timings.get()
+    if timings is not None and context is not None:
+        timings.db += perf_counter_ns() - context._started_ns
+        timings.statements += 1
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware recording per-route latency histograms and sampled access logs.
+
+    Requests are labelled by route name (as in CACHE_CONTROL_ROUTES) rather than URL,
+    so path parameters do not multiply the series. Only a METRICS_LOG_SAMPLE_RATE share of requests is logged,
+    plus every request slower than METRICS_LOG_SLOW_MS or failing with a 5xx.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter_ns()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter_ns() - start
+            current_timings.reset(token)
+            route = scope.get("route")
+            self.record(scope, route.name if route is not None else "<unmatched>", status, elapsed, timings)
+
+    @staticmethod
+    def record(scope, route: str, status: int, elapsed: int, timings: RequestTimings) -> None:
+        method = scope["method"]
+        request_seconds.labels(method, route).observe(elapsed / 1e9)
+        for stage in STAGES:
+            stage_seconds.labels(route, stage).observe(getattr(timings, stage) / 1e9)
+        requests_total.inc(method, route, status)
+        statements_total.inc(route, amount=timings.statements)
+
+        elapsed_ms = elapsed / 1e6
+        if status >= 500 or elapsed_ms >= settings.METRICS_LOG_SLOW_MS or random.random() < settings.METRICS_LOG_SAMPLE_RATE:
+            access_logger.info(
+                "%s %s %d in %.2fms (db %.2fms in %d statements, serialize %.2fms, cache %.2fms)",
+                method, scope["path"], status, elapsed_ms, timings.db / 1e6, timings.statements,
+                timings.serialize / 1e6, timings.cache / 1e6
+            )
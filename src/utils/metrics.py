@@ -0,0 +1,126 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds, from sub-millisecond pool checkouts to slow requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus semantics: each bucket counts values <= its bound"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Dict[str, int]:
+        result, total = {}, 0
+        for bound, count in zip(self.buckets, self._counts):
+            total += count
+            result[repr(bound)] = total
+        result["+Inf"] = self.count
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": self.sum, "buckets": self.cumulative()}
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render_header(name: str, kind: str, help_text: str) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def render_histogram(name: str, histogram: Histogram, labels: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"{name}_bucket{_labels({**labels, 'le': bound})} {count}"
+        for bound, count in histogram.cumulative().items()
+    ]
+    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum!r}")
+    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+def render_sample(name: str, value: float, labels: Dict[str, Any] = None) -> str:
+    return f"{name}{_labels(labels or {})} {value!r}"
+
+
+class HistogramFamily:
+    """Histograms sharing a name, one per combination of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._children: Dict[Tuple, Histogram] = {}
+
+    def labels(self, *values: Any) -> Histogram:
+        histogram = self._children.get(values)
+        if histogram is None:
+            histogram = self._children[values] = Histogram(self.buckets)
+        return histogram
+
+    def render(self) -> List[str]:
+        lines = render_header(self.name, "histogram", self.help_text)
+        for values, histogram in sorted(self._children.items()):
+            lines.extend(render_histogram(self.name, histogram, dict(zip(self.label_names, values))))
+        return lines
+
+
+class CounterFamily:
+    """Monotonic counters sharing a name, one per combination of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple, int] = {}
+
+    def inc(self, *values: Any, amount: int = 1) -> None:
+        self._children[values] = self._children.get(values, 0) + amount
+
+    def value(self, *values: Any) -> int:
+        return self._children.get(values, 0)
+
+    def render(self) -> List[str]:
+        lines = render_header(self.name, "counter", self.help_text)
+        for values, count in sorted(self._children.items()):
+            lines.append(render_sample(self.name, count, dict(zip(self.label_names, values))))
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.families: List[Any] = []
+
+    def histogram(self, name: str, help_text: str, label_names: Iterable[str]) -> HistogramFamily:
+        family = HistogramFamily(name, help_text, list(label_names))
+        self.families.append(family)
+        return family
+
+    def counter(self, name: str, help_text: str, label_names: Iterable[str]) -> CounterFamily:
+        family = CounterFamily(name, help_text, list(label_names))
+        self.families.append(family)
+        return family
+
+    def render(self) -> List[str]:
+        return [line for family in self.families for line in family.render()]
+
+
+registry = MetricsRegistry()
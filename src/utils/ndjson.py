@@ -0,0 +1,14 @@
+from typing import Any, AsyncIterator, Dict
+import orjson
+
+
+async def ndjson_chunks(records: AsyncIterator[Dict[str, Any]], chunk_size: int) -> AsyncIterator[bytes]:
+    """Encodes records as newline-delimited JSON, grouping ``chunk_size`` lines per chunk"""
+    lines = []
+    async for record in records:
+        lines.append(orjson.dumps(record))
+        if len(lines) >= chunk_size:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
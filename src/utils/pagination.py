@@ -0,0 +1,93 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+from fastapi import HTTPException, Query, Response
+from src.config.settings import settings
+from src.utils.responses import OrjsonResponse
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+def encode_cursor(**keys: Any) -> str:
+    """Packs the keyset of the last returned row into an opaque URL-safe token"""
+    raw = json.dumps(keys, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        keys = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Malformed cursor: {cursor}") from e
+    if not isinstance(keys, dict) or not isinstance(keys.get("id"), int):
+        raise ValueError(f"Malformed cursor: {cursor}")
+    return keys
+
+
+@dataclass
+class PageParams:
+    limit: int
+    after_id: Optional[int] = None
+    keys: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_first(self) -> bool:
+        return self.after_id is None
+
+    @property
+    def lookahead(self) -> int:
+        """Rows to fetch: one extra row tells whether a next page exists"""
+        return self.limit + 1
+
+
+def page_params(
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+        after_id: Optional[int] = Query(None, ge=0, description="Return items with ID greater than this one"),
+        limit: int = Query(
+            settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Maximum number of items"
+        )
+) -> PageParams:
+    if cursor is None:
+        return PageParams(limit=limit, after_id=after_id)
+    try:
+        keys = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return PageParams(limit=limit, after_id=keys["id"], keys=keys)
+
+
+def paginate(
+        items: Sequence[T],
+        page: PageParams,
+        response: Response,
+        cursor_keys: Callable[[T], Dict[str, Any]] = lambda item: {"id": item.id}
+) -> Sequence[T]:
+    """Trims the lookahead row and exposes the cursor of the next page in the response header"""
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(**cursor_keys(items[-1]))
+    return items
+
+
+def json_page(
+        items: List[Dict[str, Any]],
+        page: PageParams,
+        cursor_keys: Callable[[Dict[str, Any]], Dict[str, Any]] = lambda item: {"id": item["id"]},
+        drop: Sequence[str] = ()
+) -> OrjsonResponse:
+    """``paginate`` for rows fetched as dicts: returns the page already rendered by orjson.
+
+    Keys listed in ``drop`` are only needed for the cursor and are removed from the items.
+    """
+    headers = {}
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(**cursor_keys(items[-1]))
+    if drop:
+        items = [{key: value for key, value in item.items() if key not in drop} for item in items]
+    return OrjsonResponse(items, headers=headers)
@@ -0,0 +1,153 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Any, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.config.settings import settings
+
+QUERY_COUNT_HEADER = b"x-query-count"
+
+profile_logger = logging.getLogger("app.sql")
+
+# Expanded IN lists and VALUES rows differ in their number of placeholders, not in shape
+_PLACEHOLDER_LISTS = re.compile(r"\$\d+(?:\s*(?:::\w+(?:\[\])?)?\s*,\s*\$\d+)*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace and bind placeholder lists normalized"""
+    return _PLACEHOLDER_LISTS.sub("$n", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryProfile:
+    """Statements issued within one request or ``profile_queries`` block"""
+
+    def __init__(self, slow_ms: float, repeat_threshold: int) -> None:
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.statements = 0
+        self.total_ns = 0
+        self.shapes: Counter[str] = Counter()
+        self.slow: List[Tuple[str, float]] = []
+
+    def record(self, statement: str, elapsed_ns: int) -> bool:
+        """Returns whether the statement was slow"""
+        self.statements += 1
+        self.total_ns += elapsed_ns
+        self.shapes[statement_shape(statement)] += 1
+        elapsed_ms = elapsed_ns / 1e6
+        if elapsed_ms < self.slow_ms:
+            return False
+        self.slow.append((statement, elapsed_ms))
+        return True
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least ``repeat_threshold`` times: likely N+1 lookups"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= self.repeat_threshold]
+
+    def report(self, label: str) -> None:
+        profile_logger.info(
+            "%s: %d statements in %.2fms, %d slow", label, self.statements, self.total_ns / 1e6, len(self.slow)
+        )
+        for shape, count in self.repeated():
+            profile_logger.warning("%s: possible N+1, statement executed %d times: %s", label, count, shape)
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_profile", default=None)
+
+
+@contextmanager
+def profile_queries(slow_ms: Optional[float] = None, repeat_threshold: Optional[int] = None) -> Iterator[QueryProfile]:
+    """Profiles statements issued by the current task within the block"""
+    profile = QueryProfile(
+        settings.SQL_PROFILING_SLOW_MS if slow_ms is None else slow_ms,
+        settings.SQL_PROFILING_REPEAT_THRESHOLD if repeat_threshold is None else repeat_threshold
+    )
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+
+
+def _explain(conn, statement: str, parameters: Any) -> str:
+    """Plans the statement on the same connection; a failed EXPLAIN is rolled back to a savepoint
+    so that it does not abort the transaction the request goes on with"""
+    dbapi_connection = conn.connection.dbapi_connection
+    savepoint = not dbapi_connection.autocommit
+    cursor = dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT profiling_explain")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT profiling_explain")
+            raise
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT profiling_explain")
+        return plan
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and current_profile.get() is not None:
+        context._profile_started_ns = perf_counter_ns()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = current_profile.get()
+    if profile is None or context is None:
+        return
+    elapsed = perf_counter_ns() - context._profile_started_ns
+    if not profile.record(statement, elapsed):
+        return
+    plan = None
+    # EXPLAIN without ANALYZE plans the statement without running it again
+    if settings.SQL_PROFILING_EXPLAIN and not executemany:
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {str(e)}"
+    profile_logger.warning(
+        "Slow statement (%.2fms): %s\nParameters: %r\n%s", elapsed / 1e6, statement, parameters, plan or ""
+    )
+
+
+class QueryProfilingMiddleware:
+    """ASGI middleware profiling the SQL of every request; enabled by SQL_PROFILING_ENABLED.
+
+    Logs statement counts per request, slow statements with their parameters and plan,
+    and statement shapes repeated within a request. The count is also returned in the
+    ``X-Query-Count`` header. For development and load tests: EXPLAIN costs a round trip.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with profile_queries() as profile:
+            async def send_with_count(message) -> None:
+                if message["type"] == "http.response.start":
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), (QUERY_COUNT_HEADER, str(profile.statements).encode())]
+                    }
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_count)
+            finally:
+                profile.report(f"{scope['method']} {scope['path']}")
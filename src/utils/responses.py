@@ -0,0 +1,12 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+from src.utils.instrumentation import timed
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered by orjson; handlers may return plain dicts and lists through it"""
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
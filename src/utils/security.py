@@ -1,10 +1,16 @@
+import hmac
+from typing import Optional
 from src.config.settings import settings
 from src.config.logger import logger
 from fastapi import HTTPException, Header
 
 
+def is_valid_api_key(api_key: Optional[str]) -> bool:
+    return api_key is not None and hmac.compare_digest(api_key.encode(), settings.API_KEY.encode())
+
+
 async def verify_api_key(api_key: str = Header(..., alias="X-API-Key")) -> None:
-    if api_key != settings.API_KEY:
+    if not is_valid_api_key(api_key):
         logger.warning(f"Invalid API key provided")
         raise HTTPException(
             status_code=403,
@@ -1,7 +1,14 @@
+from contextlib import contextmanager
+from typing import List
 import pytest
 import pytest_asyncio
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from src.config.db import Base, get_db
+from src.cache.activity_tree import activity_tree_index
+from src.cache.buildings import building_index
+from src.cache.response import response_cache
+from src.cache.versions import catalog_versions
+from src.config.db import Base, get_db, get_sessionmaker
 from src.config.settings import settings
 from httpx import AsyncClient, ASGITransport
 from src.main import app
@@ -21,6 +28,10 @@ async def test_engine():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    activity_tree_index.invalidate()
+    building_index.invalidate()
+    await response_cache.clear()
+    catalog_versions.expire()
     yield engine
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -35,14 +46,44 @@ async def test_session(test_engine):
         yield session
 
 
+class QueryCounter:
+    """Records the SQL statements sent through an engine"""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    def __call__(self, conn, cursor, statement, *args) -> None:
+        self.statements.append(statement)
+
+    @contextmanager
+    def expect(self, count: int):
+        """Asserts that the block issues exactly ``count`` statements"""
+        start = len(self.statements)
+        yield
+        issued = self.statements[start:]
+        assert len(issued) == count, f"expected {count} statements, got {len(issued)}:\n" + "\n\n".join(issued)
+
+
+@pytest.fixture(scope="function")
+def query_counter(test_engine):
+    """Counts statements issued through the test engine."""
+    counter = QueryCounter()
+    event.listen(test_engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(test_engine.sync_engine, "before_cursor_execute", counter)
+
+
 @pytest_asyncio.fixture(scope="function")
-async def test_client(test_session):
-    """Override get_db dependency and provide an async test client."""
+async def test_client(test_engine, test_session):
+    """Override database dependencies and provide an async test client."""
 
     async def override_get_db():
         yield test_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_sessionmaker] = lambda: async_sessionmaker(
+        test_engine, expire_on_commit=False, class_=AsyncSession
+    )
 
     transport = ASGITransport(app=app)
 
@@ -0,0 +1,25 @@
+import pytest
+
+API_KEY_HEADER = {"X-API-Key": "test-key"}
+
+
+@pytest.mark.asyncio
+class TestActivitiesAPI:
+
+    async def test_tree(self, test_client, seed_test_data):
+        food = seed_test_data["activities"]["root_food"]
+        response = await test_client.get(f"/activities/{food.id}/tree", headers=API_KEY_HEADER)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["name"] == "Еда"
+        assert [child["name"] for child in data["children"]] == ["Мясная продукция", "Молочная продукция"]
+
+    async def test_tree_level(self, test_client, seed_test_data):
+        food = seed_test_data["activities"]["root_food"]
+        response = await test_client.get(f"/activities/{food.id}/tree?level=1", headers=API_KEY_HEADER)
+        assert response.status_code == 200
+        assert response.json()["children"] == []
+
+    async def test_tree_not_found(self, test_client):
+        response = await test_client.get("/activities/9999/tree", headers=API_KEY_HEADER)
+        assert response.status_code == 404
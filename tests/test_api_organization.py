@@ -1,4 +1,6 @@
+import json
 import pytest
+from src.config.settings import settings
 
 API_KEY_HEADER = {"X-API-Key": "test-key"}
 
@@ -39,6 +41,15 @@ class TestOrganizationsAPI:
         names = {o["name"] for o in response.json()}
         assert "ООО Мясоед" in names
 
+    async def test_nearest(self, test_client, seed_test_data):
+        response = await test_client.get("/organizations/nearest/?lat=55.75&lng=37.59&limit=2",
+                                         headers=API_KEY_HEADER)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 2
+        assert data[0]["name"] == "ООО Грузовик"
+        assert data[0]["distance_km"] <= data[1]["distance_km"]
+
     async def test_organization_detail(self, test_client, seed_test_data):
         org = seed_test_data["orgs"][0]
         response = await test_client.get(f"/organizations/{org.id}", headers=API_KEY_HEADER)
@@ -46,6 +57,35 @@ class TestOrganizationsAPI:
         data = response.json()
         assert data["name"] == org.name
 
+    async def test_batch(self, test_client, seed_test_data):
+        o1, o2, o3 = seed_test_data["orgs"]
+        response = await test_client.post(
+            "/organizations/batch", json={"ids": [o3.id, 9999, o1.id, o3.id]}, headers=API_KEY_HEADER
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [org["name"] for org in data["organizations"]] == [o3.name, o1.name]
+        assert data["organizations"][0]["phones"] == [{"id": o3.phones[0].id, "number": "+7 999 777-88-99"}]
+        assert data["missing"] == [9999]
+
+    async def test_batch_limits(self, test_client):
+        empty = await test_client.post("/organizations/batch", json={"ids": []}, headers=API_KEY_HEADER)
+        too_many = await test_client.post(
+            "/organizations/batch", json={"ids": list(range(settings.BATCH_MAX_IDS + 1))}, headers=API_KEY_HEADER
+        )
+        assert empty.status_code == 422
+        assert too_many.status_code == 422
+
+    async def test_export(self, test_client, seed_test_data):
+        response = await test_client.get("/organizations/export", headers=API_KEY_HEADER)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["id"] for r in records] == [o.id for o in seed_test_data["orgs"]]
+        assert records[0]["building"]["address"] == "Москва, Тверская 1"
+        assert records[0]["phones"] == [{"id": seed_test_data["orgs"][0].phones[0].id, "number": "+7 999 111-22-33"}]
+        assert [a["name"] for a in records[0]["activities"]] == ["Мясная продукция"]
+
 
 @pytest.mark.asyncio
 class TestOrganizationsAPIErrors:
@@ -71,6 +111,14 @@ class TestOrganizationsAPIErrors:
                                          headers=API_KEY_HEADER)
         assert response.status_code == 400
 
+    async def test_nearest_not_found(self, test_client):
+        response = await test_client.get("/organizations/nearest/?lat=0&lng=0", headers=API_KEY_HEADER)
+        assert response.status_code == 404
+
+    async def test_nearest_invalid_limit(self, test_client):
+        response = await test_client.get("/organizations/nearest/?lat=0&lng=0&limit=0", headers=API_KEY_HEADER)
+        assert response.status_code == 422
+
     async def test_without_api_key(self, test_client):
         response = await test_client.get("/organizations/by_building/1")
         assert response.status_code == 422
@@ -81,6 +129,66 @@ class TestOrganizationsAPIErrors:
         assert response.status_code == 403
 
 
+@pytest.mark.asyncio
+class TestPagination:
+
+    async def test_cursor_walks_all_pages(self, test_client, seed_test_data):
+        b1 = seed_test_data["buildings"][0]
+        url = f"/organizations/by_building/{b1.id}?limit=1"
+        first = await test_client.get(url, headers=API_KEY_HEADER)
+        assert first.status_code == 200
+        assert len(first.json()) == 1
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = await test_client.get(f"{url}&cursor={cursor}", headers=API_KEY_HEADER)
+        assert second.status_code == 200
+        assert second.json()[0]["id"] > first.json()[0]["id"]
+        assert "X-Next-Cursor" not in second.headers
+
+    async def test_after_id(self, test_client, seed_test_data):
+        o1 = seed_test_data["orgs"][0]
+        response = await test_client.get(f"/organizations/search/by_name/?name=ООО&after_id={o1.id}",
+                                         headers=API_KEY_HEADER)
+        assert response.status_code == 200
+        assert [o["id"] for o in response.json()] == sorted(o.id for o in seed_test_data["orgs"][1:])
+
+    async def test_ranked_search_pages(self, test_client, seed_test_data):
+        url = "/organizations/search/by_name/?name=ООО&ranked=true&limit=2"
+        first = await test_client.get(url, headers=API_KEY_HEADER)
+        second = await test_client.get(f"{url}&cursor={first.headers['X-Next-Cursor']}", headers=API_KEY_HEADER)
+
+        assert first.status_code == second.status_code == 200
+        ids = [o["id"] for o in first.json() + second.json()]
+        assert sorted(ids) == sorted(o.id for o in seed_test_data["orgs"])
+
+    async def test_ranked_search_rejects_after_id_alone(self, test_client, seed_test_data):
+        o1 = seed_test_data["orgs"][0]
+        response = await test_client.get(f"/organizations/search/by_name/?name=ООО&ranked=true&after_id={o1.id}",
+                                         headers=API_KEY_HEADER)
+        assert response.status_code == 422
+
+    async def test_empty_next_page(self, test_client, seed_test_data):
+        response = await test_client.get("/organizations/by_activity_name/?name=Еда&after_id=9999",
+                                         headers=API_KEY_HEADER)
+        assert response.status_code == 200
+        assert response.json() == []
+
+    async def test_invalid_cursor(self, test_client, seed_test_data):
+        response = await test_client.get("/organizations/buildings/?cursor=bm90LWpzb24", headers=API_KEY_HEADER)
+        assert response.status_code == 400
+
+    async def test_limit_too_large(self, test_client):
+        response = await test_client.get("/organizations/buildings/?limit=100000", headers=API_KEY_HEADER)
+        assert response.status_code == 422
+
+    async def test_buildings_pages(self, test_client, seed_test_data):
+        first = await test_client.get("/organizations/buildings/?limit=1", headers=API_KEY_HEADER)
+        cursor = first.headers["X-Next-Cursor"]
+        second = await test_client.get(f"/organizations/buildings/?limit=1&cursor={cursor}", headers=API_KEY_HEADER)
+        ids = [b["id"] for b in first.json() + second.json()]
+        assert ids == sorted(b.id for b in seed_test_data["buildings"])
+
+
 @pytest.mark.asyncio
 class TestBuildingsAPI:
 
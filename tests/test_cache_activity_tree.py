@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import event
+from src.cache.activity_tree import ActivityTreeIndex, activity_tree_index
+from src.crud.organization import organization_crud
+from src.models import Activity, Organization
+
+
+class TestActivityTreeIndexBuild:
+
+    def setup_method(self):
+        self.index = ActivityTreeIndex(max_depth=3)
+        self.index.build([
+            (1, "Еда", None),
+            (2, "Мясная продукция", 1),
+            (3, "Молочная продукция", 1),
+            (4, "Сыры", 3),
+            (5, "Твёрдые сыры", 4),
+            (6, "Автомобили", None),
+        ])
+
+    def test_subtree_ids_per_depth(self):
+        assert self.index.subtree_ids(1, 1) == [1]
+        assert self.index.subtree_ids(1, 2) == [1, 2, 3]
+        assert self.index.subtree_ids(1, 3) == [1, 2, 3, 4]
+
+    def test_subtree_ids_beyond_precomputed_depth(self):
+        assert self.index.subtree_ids(1, 4) == [1, 2, 3, 4, 5]
+
+    def test_subtree_ids_unknown_activity(self):
+        assert self.index.subtree_ids(999, 3) == []
+
+    def test_subtree_ids_by_name_is_case_insensitive(self):
+        assert self.index.subtree_ids_by_name("сыры", 2) == [4, 5]
+        assert self.index.subtree_ids_by_name("МОЛОЧ", 2) == [3, 4]
+
+
+@pytest.mark.asyncio
+class TestActivityTreeIndexQueries:
+
+    async def test_get_by_activity_skips_tree_queries_when_fresh(self, test_engine, test_session, seed_test_data):
+        root_food = seed_test_data["activities"]["root_food"]
+        await activity_tree_index.ensure_fresh(test_session)
+
+        statements = []
+        event.listen(test_engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        result = await organization_crud.get_by_activity(test_session, root_food.id)
+
+        assert {o.name for o in result} == {"ООО Мясоед", "ООО Молочник"}
+        assert not any("FROM activities" in s and "organization" not in s for s in statements)
+
+    async def test_index_reloads_after_activity_change(self, test_session, seed_test_data):
+        milk = seed_test_data["activities"]["milk"]
+        await activity_tree_index.ensure_fresh(test_session)
+
+        cheese = Activity(name="Сыры", parent_id=milk.id)
+        test_session.add(cheese)
+        await test_session.commit()
+        test_session.add(Organization(name="ООО Сыровар", activities=[cheese]))
+        await test_session.commit()
+
+        assert not activity_tree_index.is_fresh
+        result = await organization_crud.get_by_activity_name(test_session, "Молоч")
+        assert {o.name for o in result} == {"ООО Молочник", "ООО Сыровар"}
+
+    async def test_closure_fallback_matches_index(self, test_session, seed_test_data, monkeypatch):
+        root_food = seed_test_data["activities"]["root_food"]
+        by_id = await organization_crud.get_by_activity(test_session, root_food.id)
+        by_name = await organization_crud.get_by_activity_name(test_session, "Еда")
+
+        monkeypatch.setattr("src.crud.organization.settings.ACTIVITY_INDEX_ENABLED", False)
+        assert [o.id for o in await organization_crud.get_by_activity(test_session, root_food.id)] == [o.id for o in by_id]
+        assert [o.id for o in await organization_crud.get_by_activity_name(test_session, "Еда")] == [o.id for o in by_name]
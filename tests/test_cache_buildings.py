@@ -0,0 +1,63 @@
+import random
+import pytest
+from src.cache.buildings import BuildingGridIndex, building_index
+from src.crud.organization import organization_crud
+from src.models import Building
+from src.utils.geo import calculate_distance_km
+
+
+class TestBuildingGridIndex:
+
+    def setup_method(self):
+        rng = random.Random(42)
+        self.rows = [
+            (i, rng.uniform(55.55, 55.90), rng.uniform(37.35, 37.85))
+            for i in range(2000)
+        ]
+        self.index = BuildingGridIndex(cell_size=0.01)
+        self.index.build(self.rows)
+
+    def brute_force(self, lat, lng, radius_km):
+        return sorted(
+            building_id for building_id, b_lat, b_lng in self.rows
+            if calculate_distance_km(lat, lng, b_lat, b_lng) <= radius_km
+        )
+
+    @pytest.mark.parametrize("radius_km", [0.5, 2.0, 10.0, 100.0])
+    def test_within_radius_matches_full_scan(self, radius_km):
+        assert sorted(self.index.within_radius(55.75, 37.6, radius_km)) == self.brute_force(55.75, 37.6, radius_km)
+
+    def test_within_radius_across_antimeridian(self):
+        index = BuildingGridIndex(cell_size=0.01)
+        index.build([(1, 0.0, 179.999), (2, 0.0, -179.999), (3, 0.0, 170.0)])
+        assert sorted(index.within_radius(0.0, 180.0, 1.0)) == [1, 2]
+
+    def test_within_radius_non_positive(self):
+        assert self.index.within_radius(55.75, 37.6, 0) == []
+
+
+@pytest.mark.asyncio
+class TestBuildingGridIndexQueries:
+
+    async def test_index_reloads_after_building_change(self, test_session, seed_test_data):
+        await building_index.ensure_fresh(test_session)
+        assert len(building_index) == 2
+
+        test_session.add(Building(address="Москва, Ленинский 5", latitude=55.70, longitude=37.58))
+        await test_session.commit()
+
+        assert not building_index.is_fresh
+        await building_index.ensure_fresh(test_session)
+        assert len(building_index) == 3
+
+    async def test_get_in_radius_without_index(self, test_session, seed_test_data, monkeypatch):
+        monkeypatch.setattr("src.crud.organization.settings.BUILDING_INDEX_ENABLED", False)
+        result = await organization_crud.get_in_radius(test_session, 55.76, 37.61, 1.0)
+        assert {o.name for o in result} == {"ООО Мясоед", "ООО Молочник"}
+
+    async def test_get_in_radius_binds_building_ids_as_one_array(self, test_session, seed_test_data, monkeypatch):
+        b1, _ = seed_test_data["buildings"]
+        # More IDs than asyncpg accepts as separate placeholders
+        monkeypatch.setattr(building_index, "within_radius", lambda *args: [b1.id, *range(100_000, 140_000)])
+        result = await organization_crud.get_in_radius(test_session, 55.76, 37.61, 1.0)
+        assert {o.name for o in result} == {"ООО Мясоед", "ООО Молочник"}
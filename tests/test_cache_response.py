@@ -0,0 +1,225 @@
+import pytest
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.cache import response as response_module
+from src.cache import versions as versions_module
+from src.cache.buildings import building_index
+from src.cache.response import MemoryBackend, RedisBackend, etag_matches, response_cache
+from src.cache.versions import catalog_versions
+from src.config.db import get_db
+from src.config.replicas import CATALOG_VERSIONS_SQL, REPLICA_SESSION
+from src.config.settings import settings
+from src.main import app
+from src.models import Organization
+
+API_KEY_HEADER = {"X-API-Key": "test-key"}
+
+
+class FakeRedis:
+    """Local stand-in for redis.asyncio.Redis"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+
+@pytest.mark.asyncio
+class TestBackends:
+
+    async def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryBackend(max_entries=2)
+        await backend.set("a", b"1", ttl=60)
+        await backend.set("b", b"2", ttl=60)
+        await backend.get("a")
+        await backend.set("c", b"3", ttl=60)
+        assert await backend.get("b") is None
+        assert await backend.get("a") == b"1"
+        assert len(backend) == 2
+
+    async def test_memory_backend_expires_entries(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(response_module.time, "monotonic", lambda: now[0])
+        backend = MemoryBackend(max_entries=10)
+        await backend.set("a", b"1", ttl=5)
+        now[0] += 6
+        assert await backend.get("a") is None
+
+    async def test_redis_backend(self):
+        client = FakeRedis()
+        backend = RedisBackend(client)
+        await backend.set("a", b"1", ttl=5)
+        assert client.data == {"catalog:response:a": b"1"}
+        assert await backend.get("a") == b"1"
+        await backend.clear()
+        assert client.data == {}
+
+
+@pytest.mark.asyncio
+class TestCachedRoutes:
+
+    async def test_repeated_request_served_from_cache(self, test_client, seed_test_data):
+        b1 = seed_test_data["buildings"][0]
+        url = f"/organizations/by_building/{b1.id}?limit=1"
+        first = await test_client.get(url, headers=API_KEY_HEADER)
+        second = await test_client.get(url, headers=API_KEY_HEADER)
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.content == first.content
+        assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+    async def test_write_invalidates_cache(self, test_client, test_session, seed_test_data):
+        url = "/organizations/search/by_name/?name=ООО"
+        before = await test_client.get(url, headers=API_KEY_HEADER)
+
+        test_session.add(Organization(name="ООО Новая"))
+        await test_session.commit()
+
+        after = await test_client.get(url, headers=API_KEY_HEADER)
+        assert after.headers["X-Cache"] == "MISS"
+        assert len(after.json()) == len(before.json()) + 1
+
+    async def test_unauthorized_request_bypasses_cache(self, test_client, seed_test_data):
+        await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+        response = await test_client.get("/organizations/buildings/", headers={"X-API-Key": "wrong-key"})
+        assert response.status_code == 403
+
+    async def test_stats(self, test_client, seed_test_data):
+        await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+        await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+        response = await test_client.get("/cache/stats", headers=API_KEY_HEADER)
+        assert response.json()["hits"] == 1
+        assert response.json()["misses"] == 1
+
+
+@pytest.mark.asyncio
+class TestReplicaReads:
+
+    @staticmethod
+    def serve_from_replica(test_session, replica_versions):
+        async def replica_db(request: Request):
+            request.state.replica_versions = replica_versions
+            yield test_session
+
+        return replica_db
+
+    async def test_lagging_replica_response_is_not_tagged_or_cached(self, test_client, test_session, seed_test_data):
+        app.dependency_overrides[get_db] = self.serve_from_replica(test_session, {})
+        first = await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+        second = await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+
+        assert first.status_code == 200
+        assert "ETag" not in first.headers and "X-Cache" not in first.headers
+        assert "X-Cache" not in second.headers
+
+    async def test_caught_up_replica_response_is_cached(self, test_client, test_session, seed_test_data):
+        replica_versions = dict((await test_session.execute(CATALOG_VERSIONS_SQL)).all())
+        app.dependency_overrides[get_db] = self.serve_from_replica(test_session, replica_versions)
+        await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+        second = await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+
+        assert second.headers["X-Cache"] == "HIT"
+        assert "ETag" in second.headers
+
+    async def test_indexes_load_from_primary(self, test_engine, seed_test_data, monkeypatch):
+        primary_sessions = []
+
+        def primary():
+            session = AsyncSession(test_engine)
+            primary_sessions.append(session)
+            return session
+
+        monkeypatch.setattr(versions_module, "AsyncSessionLocal", primary)
+        replica = async_sessionmaker(test_engine, info={REPLICA_SESSION: True})
+        async with replica() as db:
+            await building_index.ensure_fresh(db)
+
+        assert len(primary_sessions) == 1
+        assert len(building_index) == 2
+
+
+@pytest.mark.asyncio
+class TestConditionalRequests:
+
+    async def test_triggers_bump_database_versions(self, test_session, seed_test_data):
+        before = await catalog_versions.refresh(test_session)
+        local_before = catalog_versions.get("buildings")
+
+        await test_session.execute(text("UPDATE buildings SET address = address || ' '"))
+        await test_session.commit()
+
+        assert await catalog_versions.refresh(test_session) != before
+        assert catalog_versions.get("buildings") > local_before
+
+    async def test_matching_etag_returns_not_modified(self, test_client, seed_test_data):
+        first = await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+        etag = first.headers["ETag"]
+
+        second = await test_client.get(
+            "/organizations/buildings/", headers={**API_KEY_HEADER, "If-None-Match": etag}
+        )
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == etag
+        assert response_cache.stats()["hits"] == 0
+
+    async def test_write_changes_etag(self, test_client, test_session, seed_test_data):
+        o1 = seed_test_data["orgs"][0]
+        url = f"/organizations/{o1.id}"
+        etag = (await test_client.get(url, headers=API_KEY_HEADER)).headers["ETag"]
+
+        o1.name = "ООО Мясоед и сыновья"
+        await test_session.commit()
+
+        response = await test_client.get(url, headers={**API_KEY_HEADER, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()["name"] == "ООО Мясоед и сыновья"
+
+    async def test_cache_control_per_route(self, test_client, seed_test_data):
+        b1 = seed_test_data["buildings"][0]
+        buildings = await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+        by_building = await test_client.get(f"/organizations/by_building/{b1.id}", headers=API_KEY_HEADER)
+
+        assert buildings.headers["Cache-Control"] == settings.CACHE_CONTROL_ROUTES["list_buildings"]
+        assert by_building.headers["Cache-Control"] == settings.CACHE_CONTROL_DEFAULT
+
+    async def test_etag_matches(self):
+        assert etag_matches('W/"abc", W/"def"', 'W/"def"')
+        assert etag_matches('"abc"', 'W/"abc"')
+        assert etag_matches("*", 'W/"abc"')
+        assert not etag_matches(None, 'W/"abc"')
+        assert not etag_matches('W/"abd"', 'W/"abc"')
+
+    async def test_first_refresh_bumps_tables_written_since_load(self, test_session, seed_test_data, monkeypatch):
+        monkeypatch.setattr(catalog_versions, "_db_versions", {})
+        async with app.router.lifespan_context(app):
+            assert building_index.is_fresh
+            # A write of another process: no local bump
+            await test_session.execute(text("UPDATE buildings SET address = address || ' '"))
+            await test_session.commit()
+            await catalog_versions.refresh(test_session)
+            assert not building_index.is_fresh
+
+    async def test_tables_new_to_refresh_count_as_changed(self, test_session, monkeypatch):
+        monkeypatch.setattr(catalog_versions, "_db_versions", {})
+        before = catalog_versions.get("buildings")
+        await test_session.execute(text("INSERT INTO buildings (address, latitude, longitude) VALUES ('Москва', 55.7, 37.6)"))
+        await test_session.commit()
+
+        await catalog_versions.refresh(test_session)
+        assert catalog_versions.get("buildings") > before
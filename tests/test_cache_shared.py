@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from src.cache.activity_tree import activity_tree_index
+from src.cache.buildings import building_index
+from src.cache.shared import attach_snapshot, write_snapshot
+from src.cache.versions import catalog_versions
+from src.models import Building
+
+
+@pytest.mark.asyncio
+class TestSharedSnapshot:
+
+    async def test_attached_indexes_match_database(self, test_session, seed_test_data, tmp_path, monkeypatch):
+        monkeypatch.setattr(catalog_versions, "_db_versions", {})
+        await write_snapshot(test_session, str(tmp_path))
+
+        attached = attach_snapshot(str(tmp_path))
+
+        assert set(attached) == {activity_tree_index, building_index}
+        assert activity_tree_index.is_fresh and building_index.is_fresh
+        food = seed_test_data["activities"]["root_food"]
+        meat = seed_test_data["activities"]["meat"]
+        milk = seed_test_data["activities"]["milk"]
+        assert sorted(activity_tree_index.subtree_ids(food.id, 3)) == sorted([food.id, meat.id, milk.id])
+        b1, b2 = seed_test_data["buildings"]
+        assert sorted(building_index.within_radius(55.755, 37.60, 5.0)) == sorted([b1.id, b2.id])
+        assert isinstance(building_index.arrays["ids"], np.memmap)
+
+    async def test_tables_changed_after_snapshot_reload(self, test_session, seed_test_data, tmp_path, monkeypatch):
+        monkeypatch.setattr(catalog_versions, "_db_versions", {})
+        await write_snapshot(test_session, str(tmp_path))
+        test_session.add(Building(address="Москва, Ленинский 5", latitude=55.70, longitude=37.58))
+        await test_session.commit()
+
+        attach_snapshot(str(tmp_path))
+        await catalog_versions.refresh(test_session)
+
+        assert activity_tree_index.is_fresh
+        assert not building_index.is_fresh
+        await building_index.ensure_fresh(test_session)
+        assert len(building_index) == 3
+
+    async def test_incomplete_snapshot_is_ignored(self, tmp_path):
+        (tmp_path / "activities.json").write_bytes(b"[]")
+        assert attach_snapshot(str(tmp_path)) == []
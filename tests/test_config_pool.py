@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.config.pool import InstrumentedQueuePool, pool_stats
+from src.config.settings import settings
+from src.utils.metrics import Histogram
+
+API_KEY_HEADER = {"X-API-Key": "test-key"}
+
+
+class TestHistogram:
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert histogram.cumulative() == {"0.1": 2, "1.0": 3, "+Inf": 4}
+        assert histogram.snapshot()["sum"] == pytest.approx(3.65)
+
+
+@pytest.mark.asyncio
+class TestInstrumentedPool:
+
+    async def test_checkouts_are_recorded(self, test_engine):
+        engine = create_async_engine(settings.DB_URL, poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1)
+        try:
+            for _ in range(3):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            stats = pool_stats(engine.pool)
+            assert stats["checkout_seconds"]["count"] == 3
+            assert stats["wait_seconds"]["count"] == 3
+            assert stats["checked_out"] == 0
+            assert stats["checked_in"] == 1
+        finally:
+            await engine.dispose()
+
+    async def test_exhausted_pool_wait_is_measured(self, test_engine):
+        engine = create_async_engine(settings.DB_URL, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0)
+        try:
+            holder = await engine.connect()
+            assert pool_stats(engine.pool)["checked_out"] == 1
+
+            async def release():
+                await asyncio.sleep(0.05)
+                await holder.close()
+
+            releaser = asyncio.ensure_future(release())
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            await releaser
+            assert engine.pool.wait_seconds.snapshot()["sum"] >= 0.04
+        finally:
+            await engine.dispose()
+
+    async def test_stats_endpoint(self, test_client):
+        response = await test_client.get("/pool/stats", headers=API_KEY_HEADER)
+        assert response.status_code == 200
+        assert response.json()["size"] == settings.DB_POOL_SIZE
@@ -0,0 +1,68 @@
+import pytest
+from src.config.replicas import LEAST_CONNECTIONS, ReplicaSet
+from src.config.settings import settings
+
+UNREACHABLE_URL = "postgresql+asyncpg://postgres:x@127.0.0.1:1/catalog"
+
+
+@pytest.mark.asyncio
+class TestReplicaSet:
+
+    async def test_no_replicas_means_primary(self):
+        assert await ReplicaSet([]).choose() is None
+
+    async def test_round_robin(self, test_engine):
+        replicas = ReplicaSet([settings.DB_URL, settings.DB_URL])
+        try:
+            chosen = [await replicas.choose() for _ in range(4)]
+            assert chosen[0] is chosen[2] and chosen[1] is chosen[3]
+            assert chosen[0] is not chosen[1]
+            assert all(stats["healthy"] and stats["lag_seconds"] == 0 for stats in replicas.stats())
+        finally:
+            await replicas.dispose()
+
+    async def test_least_connections(self, test_engine):
+        replicas = ReplicaSet([settings.DB_URL, settings.DB_URL], selection=LEAST_CONNECTIONS)
+        try:
+            busy = await replicas.choose()
+            async with busy.engine.connect():
+                assert await replicas.choose() is not busy
+        finally:
+            await replicas.dispose()
+
+    async def test_unreachable_replica_is_skipped(self, test_engine):
+        replicas = ReplicaSet([UNREACHABLE_URL, settings.DB_URL])
+        try:
+            healthy = replicas.replicas[1]
+            assert [await replicas.choose() for _ in range(3)] == [healthy] * 3
+            assert "x@" not in replicas.stats()[0]["url"]
+        finally:
+            await replicas.dispose()
+
+    async def test_all_unhealthy_falls_back_to_primary(self):
+        replicas = ReplicaSet([UNREACHABLE_URL])
+        try:
+            assert await replicas.choose() is None
+        finally:
+            await replicas.dispose()
+
+    async def test_lagging_replica_is_skipped(self, test_engine):
+        replicas = ReplicaSet([settings.DB_URL], max_lag=-1)
+        try:
+            assert await replicas.choose() is None
+            assert replicas.stats()[0]["lag_seconds"] == 0
+        finally:
+            await replicas.dispose()
+
+    async def test_health_is_rechecked_after_interval(self, test_engine):
+        replicas = ReplicaSet([settings.DB_URL], check_interval=0)
+        try:
+            replica = await replicas.choose()
+            replica.healthy = False
+            assert await replicas.choose() is replica
+        finally:
+            await replicas.dispose()
+
+    async def test_unknown_selection(self):
+        with pytest.raises(ValueError):
+            ReplicaSet([], selection="random")
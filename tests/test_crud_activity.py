@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.future import select
+from src.crud.activity import activity_crud
+from src.models import Activity, ActivityClosure
+
+
+async def closure_pairs(session):
+    result = await session.execute(select(ActivityClosure.ancestor_id, ActivityClosure.descendant_id, ActivityClosure.depth))
+    return set(result.all())
+
+
+@pytest.mark.asyncio
+class TestActivityClosureSync:
+    """activity_closure is kept in step with activities by triggers"""
+
+    async def test_inserts(self, test_session, seed_test_data):
+        activities = seed_test_data["activities"]
+        food, meat = activities["root_food"], activities["meat"]
+        sausage = Activity(name="Колбасы", parent_id=meat.id)
+        test_session.add(sausage)
+        await test_session.commit()
+
+        pairs = await closure_pairs(test_session)
+        assert {(food.id, meat.id, 1), (meat.id, sausage.id, 1), (food.id, sausage.id, 2), (sausage.id, sausage.id, 0)} <= pairs
+        assert len(pairs) == 2 * 1 + 3 * 2 + 3
+
+    async def test_reparent_moves_subtree(self, test_session, seed_test_data):
+        activities = seed_test_data["activities"]
+        food, auto, meat = activities["root_food"], activities["root_auto"], activities["meat"]
+        sausage = Activity(name="Колбасы", parent_id=meat.id)
+        test_session.add(sausage)
+        await test_session.commit()
+
+        await test_session.execute(update(Activity).where(Activity.id == meat.id).values(parent_id=auto.id))
+        await test_session.commit()
+        pairs = await closure_pairs(test_session)
+        assert (auto.id, sausage.id, 2) in pairs
+        assert not {pair for pair in pairs if pair[0] == food.id and pair[1] in (meat.id, sausage.id)}
+
+    async def test_deletes_cascade(self, test_session, seed_test_data):
+        food = seed_test_data["activities"]["root_food"]
+        await test_session.execute(delete(Activity).where(Activity.id == food.id))
+        await test_session.commit()
+        auto, cargo = seed_test_data["activities"]["root_auto"], seed_test_data["activities"]["cargo"]
+        assert await closure_pairs(test_session) == {(auto.id, auto.id, 0), (cargo.id, cargo.id, 0), (auto.id, cargo.id, 1)}
+
+    async def test_cycle_rejected(self, test_session, seed_test_data):
+        food, meat = seed_test_data["activities"]["root_food"], seed_test_data["activities"]["meat"]
+        with pytest.raises(DBAPIError, match="cannot be moved under its own descendant"):
+            await test_session.execute(update(Activity).where(Activity.id == food.id).values(parent_id=meat.id))
+
+
+@pytest.mark.asyncio
+class TestActivityTree:
+
+    async def test_nested_children(self, test_session, seed_test_data, query_counter):
+        activities = seed_test_data["activities"]
+        food, meat, milk = activities["root_food"], activities["meat"], activities["milk"]
+        with query_counter.expect(1):
+            tree = await activity_crud.get_tree(test_session, food.id)
+        assert tree == {
+            "id": food.id, "name": "Еда", "parent_id": None, "children": [
+                {"id": meat.id, "name": "Мясная продукция", "parent_id": food.id, "children": []},
+                {"id": milk.id, "name": "Молочная продукция", "parent_id": food.id, "children": []},
+            ]
+        }
+
+    async def test_level_limit(self, test_session, seed_test_data):
+        food = seed_test_data["activities"]["root_food"]
+        tree = await activity_crud.get_tree(test_session, food.id, level=1)
+        assert tree["children"] == []
+
+    async def test_unknown_activity(self, test_session):
+        assert await activity_crud.get_tree(test_session, 9999) is None
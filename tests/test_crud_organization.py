@@ -1,5 +1,22 @@
 import pytest
+import pytest_asyncio
+from sqlalchemy import text
 from src.crud.organization import organization_crud
+from src.models import Activity, Organization, Phone
+from src.schemas.organization import OrganizationNearby, OrganizationRead
+
+
+@pytest_asyncio.fixture(scope="function")
+async def pg_trgm(test_session, monkeypatch):
+    """Enables pg_trgm in the test database or skips the test when the extension is unavailable"""
+    available = (await test_session.execute(
+        text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    )).scalar()
+    if not available:
+        pytest.skip("pg_trgm extension is not available")
+    await test_session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await test_session.commit()
+    monkeypatch.setattr(organization_crud, "trigram_available", True)
 
 
 @pytest.mark.asyncio
@@ -11,6 +28,12 @@ class TestOrganizationByBuilding:
         assert len(result) == 2
         assert {o.name for o in result} == {"ООО Мясоед", "ООО Молочник"}
 
+    async def test_get_by_building_keyset(self, test_session, seed_test_data):
+        b1 = seed_test_data["buildings"][0]
+        first = await organization_crud.get_by_building(test_session, b1.id, limit=1)
+        rest = await organization_crud.get_by_building(test_session, b1.id, after_id=first[0].id, limit=10)
+        assert [o.name for o in first + rest] == ["ООО Мясоед", "ООО Молочник"]
+
     async def test_get_by_building_empty(self, test_session):
         result = await organization_crud.get_by_building(test_session, 9999)
         assert result == []
@@ -56,11 +79,43 @@ class TestOrganizationByNameAndID:
         result = await organization_crud.get_by_id(test_session, org.id)
         assert result.name == org.name
 
+    async def test_get_many_preserves_order(self, test_session, seed_test_data):
+        o1, o2, o3 = seed_test_data["orgs"]
+        result = await organization_crud.get_many(test_session, [o2.id, 9999, o1.id, o2.id])
+        assert [o.id for o in result] == [o2.id, o1.id]
+        assert await organization_crud.get_many(test_session, []) == []
+
     async def test_get_by_id_not_found(self, test_session):
         result = await organization_crud.get_by_id(test_session, 9999)
         assert result is None
 
 
+@pytest.mark.asyncio
+class TestOrganizationRankedSearch:
+
+    async def test_ranked_search_matches_similar_names(self, test_session, seed_test_data, pg_trgm):
+        result = await organization_crud.get_by_name(test_session, "Молочнек", ranked=True)
+        assert [o.name for o in result] == ["ООО Молочник"]
+
+    async def test_ranked_search_orders_by_similarity(self, test_session, seed_test_data, pg_trgm):
+        test_session.add(Organization(name="ООО Грузовик и партнёры по перевозкам"))
+        await test_session.commit()
+        result = await organization_crud.get_by_name(test_session, "Грузовик", ranked=True)
+        assert [o.name for o in result] == ["ООО Грузовик", "ООО Грузовик и партнёры по перевозкам"]
+
+    async def test_ranked_search_without_pg_trgm_ranks_substrings(self, test_session, seed_test_data, monkeypatch):
+        monkeypatch.setattr(organization_crud, "trigram_available", False)
+        test_session.add(Organization(name="ООО Грузовик и партнёры по перевозкам"))
+        await test_session.commit()
+        result = await organization_crud.get_by_name(test_session, "Грузовик", ranked=True, as_dicts=True)
+        assert [o["name"] for o in result] == ["ООО Грузовик", "ООО Грузовик и партнёры по перевозкам"]
+        assert result[0]["relevance"] == pytest.approx(8 / 12)
+
+    async def test_ranked_search_needs_both_page_keys(self, test_session):
+        with pytest.raises(ValueError):
+            await organization_crud.get_by_name(test_session, "ООО", ranked=True, after_id=1)
+
+
 @pytest.mark.asyncio
 class TestOrganizationInRadius:
 
@@ -71,6 +126,10 @@ class TestOrganizationInRadius:
         assert "ООО Мясоед" in names
         assert "ООО Молочник" in names
 
+    async def test_get_in_radius_excludes_distant(self, test_session, seed_test_data):
+        result = await organization_crud.get_in_radius(test_session, 55.76, 37.61, 1.0)
+        assert "ООО Грузовик" not in {o.name for o in result}
+
     async def test_get_in_radius_zero_radius(self, test_session, seed_test_data):
         lat, lng = 55.76, 37.61
         result = await organization_crud.get_in_radius(test_session, lat, lng, 0)
@@ -82,6 +141,84 @@ class TestOrganizationInRadius:
         assert len(result) == 1
 
 
+@pytest.mark.asyncio
+class TestOrganizationNearest:
+
+    async def test_get_nearest_ordered_by_distance(self, test_session, seed_test_data):
+        result = await organization_crud.get_nearest(test_session, 55.75, 37.59, 3)
+        assert [o.name for o in result][0] == "ООО Грузовик"
+        assert result[0].distance_km == pytest.approx(0, abs=1e-6)
+        assert [o.distance_km for o in result] == sorted(o.distance_km for o in result)
+        assert len(result) == 3
+
+    async def test_get_nearest_limit(self, test_session, seed_test_data):
+        result = await organization_crud.get_nearest(test_session, 55.76, 37.61, 1)
+        assert len(result) == 1
+        assert result[0].building_id == seed_test_data["buildings"][0].id
+
+    async def test_get_nearest_max_radius(self, test_session, seed_test_data):
+        result = await organization_crud.get_nearest(test_session, 0, 0, 5, max_radius_km=100)
+        assert result == []
+
+
+@pytest.mark.asyncio
+class TestOrganizationDicts:
+    """The dict path must produce exactly what OrganizationRead makes of the ORM objects"""
+
+    async def test_list_methods_match_orm(self, test_session, seed_test_data):
+        b1 = seed_test_data["buildings"][0]
+        food = seed_test_data["activities"]["root_food"]
+        calls = [
+            (organization_crud.get_by_building, (b1.id,)),
+            (organization_crud.get_by_activity, (food.id,)),
+            (organization_crud.get_by_activity_name, ("Еда",)),
+            (organization_crud.get_by_name, ("ООО",)),
+            (organization_crud.get_in_radius, (55.76, 37.61, 10)),
+        ]
+        for method, args in calls:
+            orgs = await method(test_session, *args)
+            dicts = await method(test_session, *args, as_dicts=True)
+            assert dicts == [OrganizationRead.model_validate(org).model_dump() for org in orgs]
+
+    async def test_get_by_id(self, test_session, seed_test_data):
+        o1 = seed_test_data["orgs"][0]
+        org = await organization_crud.get_by_id(test_session, o1.id)
+        assert await organization_crud.get_by_id(test_session, o1.id, as_dicts=True) == (
+            OrganizationRead.model_validate(org).model_dump()
+        )
+        assert await organization_crud.get_by_id(test_session, 9999, as_dicts=True) is None
+
+    async def test_get_nearest_includes_distance(self, test_session, seed_test_data):
+        orgs = await organization_crud.get_nearest(test_session, 55.75, 37.59, 3)
+        dicts = await organization_crud.get_nearest(test_session, 55.75, 37.59, 3, as_dicts=True)
+        assert dicts == [OrganizationNearby.model_validate(org).model_dump() for org in orgs]
+
+    async def test_organization_without_relations(self, test_session):
+        test_session.add(Organization(name="ООО Пустышка"))
+        await test_session.commit()
+        assert await organization_crud.get_by_name(test_session, "Пустышка", as_dicts=True) == [
+            {"id": 1, "name": "ООО Пустышка", "building": None, "activities": [], "phones": []}
+        ]
+
+
+@pytest.mark.asyncio
+class TestOrganizationExport:
+
+    async def test_stream_export_assembles_records(self, test_session, seed_test_data):
+        o1 = seed_test_data["orgs"][0]
+        o1.phones.append(Phone(number="+7 999 000-00-00"))
+        o1.activities.append(seed_test_data["activities"]["milk"])
+        test_session.add(Organization(name="ООО Без здания"))
+        await test_session.commit()
+
+        records = [r async for r in organization_crud.stream_export(test_session, batch_size=2)]
+        assert len(records) == 4
+        assert len(records[0]["phones"]) == 2
+        assert {a["name"] for a in records[0]["activities"]} == {"Мясная продукция", "Молочная продукция"}
+        assert records[-1] == {"id": records[-1]["id"], "name": "ООО Без здания", "building": None,
+                               "activities": [], "phones": []}
+
+
 @pytest.mark.asyncio
 class TestActivityTreeIDs:
 
@@ -97,3 +234,24 @@ class TestActivityTreeIDs:
         root_food = seed_test_data["activities"]["root_food"]
         ids = await organization_crud._get_activity_tree_ids(test_session, root_food.id, 1)
         assert ids == [root_food.id]
+
+    async def test_get_activity_tree_ids_depth_bound(self, test_session):
+        chain = [Activity(name="Уровень 0")]
+        test_session.add(chain[0])
+        await test_session.commit()
+        for depth in range(1, 5):
+            chain.append(Activity(name=f"Уровень {depth}", parent_id=chain[-1].id))
+            test_session.add(chain[-1])
+            await test_session.commit()
+
+        ids = await organization_crud._get_activity_tree_ids(test_session, chain[0].id, 3)
+        assert ids == [a.id for a in chain[:3]]
+
+    async def test_get_by_activity_includes_descendants(self, test_session, seed_test_data):
+        root_food = seed_test_data["activities"]["root_food"]
+        result = await organization_crud.get_by_activity(test_session, root_food.id)
+        assert {o.name for o in result} == {"ООО Мясоед", "ООО Молочник"}
+
+    async def test_get_by_activity_name_includes_descendants(self, test_session, seed_test_data):
+        result = await organization_crud.get_by_activity_name(test_session, "Автомоб")
+        assert [o.name for o in result] == ["ООО Грузовик"]
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from sqlalchemy import delete, text, update
+from sqlalchemy.future import select
+from src.cache.activity_tree import activity_tree_index
+from src.crud.organization import organization_crud
+from src.config.settings import settings
+from src.models import Activity, Building, Organization, OrganizationSearch, Phone
+
+
+async def search_document(session, org_id):
+    return (await session.execute(
+        select(OrganizationSearch.document).where(OrganizationSearch.id == org_id)
+    )).scalar_one_or_none()
+
+
+@pytest.mark.asyncio
+class TestOrganizationSearchSync:
+    """organization_search is kept in step with the catalog tables by triggers"""
+
+    async def test_rows_follow_writes(self, test_session, seed_test_data):
+        o1 = seed_test_data["orgs"][0]
+        meat = seed_test_data["activities"]["meat"]
+        row = (await test_session.execute(select(OrganizationSearch).where(OrganizationSearch.id == o1.id))).scalar_one()
+        assert row.activity_ids == [meat.id]
+        assert row.phones == ["+7 999 111-22-33"]
+        assert (row.latitude, row.longitude) == (55.76, 37.61)
+
+        await test_session.execute(update(Activity).where(Activity.id == meat.id).values(name="Мясо"))
+        test_session.add(Phone(number="+7 000", organization_id=o1.id))
+        await test_session.commit()
+        document = await search_document(test_session, o1.id)
+        assert document["activities"][0]["name"] == "Мясо"
+        assert [phone["number"] for phone in document["phones"]] == ["+7 999 111-22-33", "+7 000"]
+
+    async def test_deletes_propagate(self, test_session, seed_test_data):
+        o1, o2, o3 = seed_test_data["orgs"]
+        await test_session.execute(delete(Building).where(Building.id == seed_test_data["buildings"][0].id))
+        await test_session.execute(delete(Activity).where(Activity.id == seed_test_data["activities"]["cargo"].id))
+        await test_session.execute(delete(Organization).where(Organization.id == o2.id))
+        await test_session.commit()
+
+        assert (await search_document(test_session, o1.id))["building"] is None
+        assert (await search_document(test_session, o2.id)) is None
+        assert (await search_document(test_session, o3.id))["activities"] == []
+
+    async def test_truncate_rebuilds(self, test_session, seed_test_data):
+        await test_session.execute(text("TRUNCATE phones"))
+        await test_session.commit()
+        counts = (await test_session.execute(select(OrganizationSearch.phones))).scalars().all()
+        assert counts == [[], [], []]
+
+    @pytest.mark.parametrize("first", ["phone", "rename"])
+    async def test_concurrent_writes_to_different_tables(self, test_engine, test_session, seed_test_data, first):
+        o1 = seed_test_data["orgs"][0]
+        writes = {
+            "phone": text(f"INSERT INTO phones (number, organization_id) VALUES ('A', {o1.id})"),
+            "rename": text(f"UPDATE organizations SET name = 'renamed' WHERE id = {o1.id}"),
+        }
+        second = "rename" if first == "phone" else "phone"
+        async with test_engine.connect() as early, test_engine.connect() as late:
+            await early.execute(writes[first])
+            blocked = asyncio.ensure_future(late.execute(writes[second]))
+            await asyncio.sleep(0.2)
+            # The later writer refreshes only once the earlier one has committed
+            assert not blocked.done()
+            await early.commit()
+            await asyncio.wait_for(blocked, timeout=5)
+            await late.commit()
+
+        document = await search_document(test_session, o1.id)
+        assert document["name"] == "renamed"
+        assert [phone["number"] for phone in document["phones"]] == ["+7 999 111-22-33", "A"]
+
+
+@pytest.mark.asyncio
+class TestOrganizationSearchReads:
+
+    async def test_documents_match_joined_projection(self, test_session, seed_test_data, monkeypatch):
+        b1 = seed_test_data["buildings"][0]
+        food = seed_test_data["activities"]["root_food"]
+        calls = [
+            (organization_crud.get_by_building, (b1.id,)),
+            (organization_crud.get_by_activity, (food.id,)),
+            (organization_crud.get_by_activity_name, ("Еда",)),
+            (organization_crud.get_by_name, ("ООО",)),
+            (organization_crud.get_in_radius, (55.76, 37.61, 10)),
+            (organization_crud.get_nearest, (55.76, 37.61, 2)),
+            (organization_crud.get_many, ([org.id for org in seed_test_data["orgs"]],)),
+        ]
+        for method, args in calls:
+            searched = await method(test_session, *args, as_dicts=True)
+            monkeypatch.setattr(settings, "ORGANIZATION_SEARCH_ENABLED", False)
+            joined = await method(test_session, *args, as_dicts=True)
+            monkeypatch.setattr(settings, "ORGANIZATION_SEARCH_ENABLED", True)
+            assert searched == joined
+
+    async def test_lookups_do_not_join(self, test_session, seed_test_data, query_counter, monkeypatch):
+        monkeypatch.setattr(settings, "BUILDING_INDEX_ENABLED", False)
+        food = seed_test_data["activities"]["root_food"]
+        await activity_tree_index.ensure_fresh(test_session)
+        with query_counter.expect(3):
+            assert await organization_crud.get_by_building(test_session, seed_test_data["buildings"][0].id, as_dicts=True)
+            assert len(await organization_crud.get_by_activity(test_session, food.id, as_dicts=True)) == 2
+            assert await organization_crud.get_in_radius(test_session, 55.76, 37.61, 10, as_dicts=True)
+        for statement in query_counter.statements[-3:]:
+            assert "FROM organization_search" in statement
+            assert "JOIN" not in statement and "organizations" not in statement
+
+    async def test_export_reads_documents(self, test_session, seed_test_data):
+        records = [record async for record in organization_crud.stream_export(test_session, batch_size=2)]
+        assert records == [await search_document(test_session, org.id) for org in seed_test_data["orgs"]]
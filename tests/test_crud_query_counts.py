@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.future import select
+from src.cache.activity_tree import activity_tree_index
+from src.cache.buildings import building_index
+from src.crud.organization import organization_crud
+from src.models import Activity, Organization
+
+# Main query plus one selectinload each for activities and phones; the building is joined
+ORM_STATEMENTS = 3
+DICT_STATEMENTS = 1
+
+
+@pytest.mark.asyncio
+class TestLazyLoadingIsExplicit:
+
+    async def test_relationships_raise_unless_loaded(self, test_session, seed_test_data):
+        test_session.expunge_all()
+        org = (await test_session.execute(select(Organization).limit(1))).scalars().one()
+        activity = (await test_session.execute(select(Activity).limit(1))).scalars().one()
+        for obj, attr in ((org, "activities"), (org, "phones"), (org, "building"),
+                          (activity, "children"), (activity, "organizations"), (activity, "parent")):
+            with pytest.raises(InvalidRequestError):
+                getattr(obj, attr)
+
+
+@pytest.mark.asyncio
+class TestOrganizationCRUDQueryCounts:
+
+    @pytest.fixture(autouse=True)
+    async def warm_indexes(self, test_session, seed_test_data):
+        await activity_tree_index.ensure_fresh(test_session)
+        await building_index.ensure_fresh(test_session)
+        test_session.expunge_all()
+
+    @pytest.mark.parametrize("as_dicts, expected", [(False, ORM_STATEMENTS), (True, DICT_STATEMENTS)])
+    async def test_list_methods(self, test_session, seed_test_data, query_counter, as_dicts, expected):
+        b1 = seed_test_data["buildings"][0]
+        food = seed_test_data["activities"]["root_food"]
+        calls = [
+            (organization_crud.get_by_building, (b1.id,)),
+            (organization_crud.get_by_activity, (food.id,)),
+            (organization_crud.get_by_activity_name, ("Еда",)),
+            (organization_crud.get_by_name, ("ООО",)),
+            (organization_crud.get_in_radius, (55.76, 37.61, 10)),
+            (organization_crud.get_nearest, (55.76, 37.61, 1)),
+        ]
+        for method, args in calls:
+            with query_counter.expect(expected):
+                assert await method(test_session, *args, as_dicts=as_dicts)
+            test_session.expunge_all()
+
+    async def test_get_by_id(self, test_session, seed_test_data, query_counter):
+        o1 = seed_test_data["orgs"][0]
+        with query_counter.expect(ORM_STATEMENTS):
+            await organization_crud.get_by_id(test_session, o1.id)
+        with query_counter.expect(DICT_STATEMENTS):
+            await organization_crud.get_by_id(test_session, o1.id, as_dicts=True)
+
+    async def test_get_many(self, test_session, seed_test_data, query_counter):
+        ids = [org.id for org in seed_test_data["orgs"]]
+        test_session.expunge_all()
+        with query_counter.expect(ORM_STATEMENTS):
+            assert len(await organization_crud.get_many(test_session, ids)) == len(ids)
+        with query_counter.expect(DICT_STATEMENTS):
+            assert len(await organization_crud.get_many(test_session, ids, as_dicts=True)) == len(ids)
+
+    async def test_hot_lookups_bind_fresh_parameters(self, test_session, seed_test_data):
+        """Hot lookups share one pre-built statement; the values must still come from each call"""
+        for org in seed_test_data["orgs"]:
+            assert (await organization_crud.get_by_id(test_session, org.id, as_dicts=True))["name"] == org.name
+        for building in seed_test_data["buildings"]:
+            orgs = await organization_crud.get_by_building(test_session, building.id, as_dicts=True)
+            assert {org["building"]["id"] for org in orgs} == {building.id}
+
+    async def test_empty_result_skips_related_loads(self, test_session, query_counter):
+        with query_counter.expect(1):
+            assert await organization_crud.get_by_building(test_session, 9999) == []
+
+    async def test_unknown_activity_needs_no_query(self, test_session, query_counter):
+        with query_counter.expect(0):
+            assert await organization_crud.get_by_activity(test_session, 9999) == []
+
+    async def test_activity_tree_ids(self, test_session, seed_test_data, query_counter):
+        food = seed_test_data["activities"]["root_food"]
+        with query_counter.expect(1):
+            await organization_crud._get_activity_tree_ids(test_session, food.id, 3)
+
+    async def test_stream_export(self, test_session, seed_test_data, query_counter):
+        with query_counter.expect(1):
+            records = [record async for record in organization_crud.stream_export(test_session)]
+        assert len(records) == 3
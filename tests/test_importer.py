@@ -0,0 +1,89 @@
+import orjson
+import pytest
+import pytest_asyncio
+from sqlalchemy import func
+from sqlalchemy.future import select
+from src.crud.organization import organization_crud
+from src.importer import BulkLoader, OrganizationRecord, connect, generate_catalog, read_records, record_from_document
+from src.models import ActivityClosure, Building, Organization, OrganizationSearch, Phone, organization_activity
+
+
+@pytest_asyncio.fixture(scope="function")
+async def loader(test_engine):
+    conn = await connect()
+    loader = BulkLoader(conn)
+    await loader.prepare()
+    yield loader
+    await conn.close()
+
+
+async def count(session, table):
+    return (await session.execute(select(func.count()).select_from(table))).scalar_one()
+
+
+class TestRecords:
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / "catalog.csv"
+        path.write_text(
+            "name,address,latitude,longitude,phones,activity_ids\n"
+            "ООО Мясоед,\"Москва, Тверская 1\",55.76,37.61,+7 1; +7 2,3;4\n"
+            "ООО Без здания,,,,,\n",
+            encoding="utf-8"
+        )
+        assert list(read_records(str(path))) == [
+            OrganizationRecord("ООО Мясоед", ("Москва, Тверская 1", 55.76, 37.61), ["+7 1", "+7 2"], [3, 4]),
+            OrganizationRecord("ООО Без здания", None, [], []),
+        ]
+
+    def test_documents(self):
+        exported = {
+            "id": 7, "name": "ООО Мясоед",
+            "building": {"id": 1, "address": "Москва, Тверская 1", "latitude": 55.76, "longitude": 37.61},
+            "activities": [{"id": 3, "name": "Мясо", "parent_id": None}],
+            "phones": [{"id": 1, "number": "+7 1"}],
+        }
+        flat = {"name": "ООО Мясоед", "address": "Москва, Тверская 1", "latitude": 55.76, "longitude": 37.61,
+                "phones": ["+7 1"], "activity_ids": [3]}
+        assert record_from_document(exported) == record_from_document(flat)
+
+
+@pytest.mark.asyncio
+class TestBulkLoader:
+
+    async def test_export_round_trip(self, test_session, seed_test_data, loader, tmp_path):
+        exported = [record async for record in organization_crud.stream_export(test_session)]
+        path = tmp_path / "catalog.ndjson"
+        path.write_bytes(b"".join(orjson.dumps(record) + b"\n" for record in exported))
+
+        stats = await loader.load(read_records(str(path)), batch_size=2)
+        assert stats.rows["organizations"] == 3
+        assert stats.rows["buildings"] == 2
+        assert await count(test_session, Organization) == 6
+        assert await count(test_session, Phone) == 6
+        assert await count(test_session, organization_activity) == 6
+
+        documents = (await test_session.execute(
+            select(OrganizationSearch.document).order_by(OrganizationSearch.id)
+        )).scalars().all()
+        strip = lambda document: {key: value for key, value in document.items() if key not in ("id", "building", "phones")}
+        assert [strip(document) for document in documents[3:]] == [strip(document) for document in exported]
+
+    async def test_unknown_activities_skipped(self, test_session, loader):
+        await loader.write_batch([OrganizationRecord("ООО Новое", ("Москва", 55.7, 37.6), ["+7 1"], [9999])])
+        assert loader.stats.skipped_links == 1
+        assert (await test_session.execute(select(OrganizationSearch.activity_ids))).scalar_one() == []
+
+    async def test_search_triggers_enabled_after_batch(self, test_session, loader):
+        await loader.write_batch([OrganizationRecord("ООО Новое", None, [], [])])
+        disabled = await loader.conn.fetchval(
+            "SELECT count(*) FROM pg_trigger WHERE tgname LIKE '%_sync_search_%' AND tgenabled = 'D'"
+        )
+        assert disabled == 0
+
+    async def test_generate(self, test_session, loader):
+        stats = await generate_catalog(loader, organizations=30, buildings=5, batch_size=10, activity_roots=2, activity_fanout=2)
+        assert stats.rows["activities"] == 2 + 4 + 8
+        assert await count(test_session, Building) == 5
+        assert await count(test_session, OrganizationSearch) == 30
+        assert await count(test_session, ActivityClosure) == 14 + 12 + 8
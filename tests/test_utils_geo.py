@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sqlalchemy import select, literal
+from src.utils.geo import (
+    bounding_box, calculate_distance_km, calculate_distances_km, haversine_distance_sql, within_radius_km
+)
+
+
+class TestBatchDistance:
+
+    def test_matches_scalar_distance(self):
+        lats = np.array([55.75, 55.76, -33.86, 0.0])
+        lons = np.array([37.59, 37.61, 151.21, 180.0])
+        expected = [calculate_distance_km(55.76, 37.61, lat, lon) for lat, lon in zip(lats, lons)]
+        assert calculate_distances_km(55.76, 37.61, lats, lons) == pytest.approx(expected)
+
+    def test_within_radius_mask(self):
+        mask, distances = within_radius_km(55.76, 37.61, np.array([55.76, 55.75]), np.array([37.61, 37.59]), 1.0)
+        assert mask.tolist() == [True, False]
+        assert distances[0] == pytest.approx(0.0)
+
+
+class TestBoundingBox:
+
+    def test_box_encloses_circle(self):
+        box = bounding_box(55.76, 37.61, 10)
+        (min_lng, max_lng), = box.lng_ranges
+        assert calculate_distance_km(55.76, 37.61, box.max_lat, 37.61) == pytest.approx(10, rel=1e-6)
+        assert calculate_distance_km(55.76, 37.61, 55.76, max_lng) >= 10
+        assert min_lng < 37.61 < max_lng
+
+    def test_box_splits_across_antimeridian(self):
+        box = bounding_box(0, 179.99, 10)
+        assert len(box.lng_ranges) == 2
+        assert box.lng_ranges[1][0] == -180.0
+
+    def test_box_covers_all_longitudes_near_pole(self):
+        box = bounding_box(89.99, 0, 10)
+        assert box.lng_ranges == [(-180.0, 180.0)]
+        assert box.max_lat == 90.0
+
+
+@pytest.mark.asyncio
+class TestHaversineSQL:
+
+    async def test_matches_python_distance(self, test_session):
+        distance = haversine_distance_sql(55.76, 37.61, literal(55.75), literal(37.59))
+        result = await test_session.execute(select(distance))
+        assert result.scalar() == pytest.approx(calculate_distance_km(55.76, 37.61, 55.75, 37.59))
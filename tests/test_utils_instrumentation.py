@@ -0,0 +1,75 @@
+import pytest
+from src.utils.instrumentation import RequestTimings, current_timings, request_seconds, requests_total, stage_seconds, timed
+from src.utils.metrics import MetricsRegistry
+
+API_KEY_HEADER = {"X-API-Key": "test-key"}
+
+
+class TestMetricsRegistry:
+
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", ("route",))
+        hits = registry.counter("hits_total", "Hits", ("route",))
+        latency.labels('/a/"b"').observe(0.002)
+        hits.inc("/a", amount=3)
+
+        lines = registry.render()
+
+        assert "# TYPE latency_seconds histogram" in lines
+        assert 'latency_seconds_bucket{route="/a/\\"b\\"",le="0.001"} 0' in lines
+        assert 'latency_seconds_bucket{route="/a/\\"b\\"",le="+Inf"} 1' in lines
+        assert 'latency_seconds_count{route="/a/\\"b\\""} 1' in lines
+        assert 'hits_total{route="/a"} 3' in lines
+
+    def test_timed_outside_request_is_noop(self):
+        with timed("db"):
+            pass
+        assert current_timings.get() is None
+
+    def test_timed_accumulates(self):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            for _ in range(2):
+                with timed("serialize"):
+                    pass
+        finally:
+            current_timings.reset(token)
+        assert timings.serialize > 0
+        assert timings.db == timings.cache == 0
+
+
+@pytest.mark.asyncio
+class TestInstrumentationMiddleware:
+
+    async def test_requests_are_recorded_by_route_name(self, test_client, seed_test_data):
+        route = "organization_detail"
+        before = request_seconds.labels("GET", route).count
+        org_id = seed_test_data["orgs"][0].id
+
+        await test_client.get(f"/organizations/{org_id}", headers=API_KEY_HEADER)
+        await test_client.get("/organizations/999999", headers=API_KEY_HEADER)
+
+        assert request_seconds.labels("GET", route).count == before + 2
+        assert requests_total.value("GET", route, 404) >= 1
+        assert stage_seconds.labels(route, "db").sum > 0
+        assert stage_seconds.labels(route, "serialize").sum > 0
+        assert stage_seconds.labels(route, "cache").count >= 2
+
+    async def test_metrics_endpoint(self, test_client, seed_test_data):
+        await test_client.get("/organizations/buildings/", headers=API_KEY_HEADER)
+
+        response = await test_client.get("/metrics", headers=API_KEY_HEADER)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'http_request_duration_seconds_count{method="GET",route="list_buildings"}' in body
+        assert 'http_request_stage_duration_seconds_bucket{route="list_buildings",stage="db",le="+Inf"}' in body
+        assert "db_pool_wait_seconds_count" in body
+        assert 'response_cache_lookups_total{result="miss"}' in body
+
+    async def test_metrics_require_api_key(self, test_client):
+        response = await test_client.get("/metrics")
+        assert response.status_code == 422
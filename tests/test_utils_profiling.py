@@ -0,0 +1,60 @@
+import logging
+import pytest
+from httpx import AsyncClient, ASGITransport
+from src.crud.organization import organization_crud
+from src.main import app
+from src.models import Organization
+from src.utils.profiling import QueryProfilingMiddleware, profile_queries, statement_shape
+from sqlalchemy import select, text
+
+API_KEY_HEADER = {"X-API-Key": "test-key"}
+
+
+class TestStatementShape:
+
+    def test_placeholder_lists_collapse(self):
+        assert statement_shape("SELECT * FROM t WHERE id IN ($1, $2, $3)") == \
+            statement_shape("SELECT *\n  FROM t WHERE id IN ($1)")
+
+    def test_different_statements_differ(self):
+        assert statement_shape("SELECT a FROM t WHERE id = $1") != statement_shape("SELECT b FROM t WHERE id = $1")
+
+
+@pytest.mark.asyncio
+class TestQueryProfiling:
+
+    async def test_counts_statements(self, test_session, seed_test_data):
+        with profile_queries(slow_ms=10_000) as profile:
+            await organization_crud.get_by_building(test_session, seed_test_data["buildings"][0].id, as_dicts=True)
+        assert profile.statements == 1
+        assert profile.slow == []
+
+    async def test_slow_statement_logged_with_plan(self, test_session, seed_test_data, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.sql"), profile_queries(slow_ms=0):
+            await test_session.execute(select(Organization.id).where(Organization.id == 1))
+        message = caplog.records[-1].getMessage()
+        assert message.startswith("Slow statement")
+        assert "Parameters: (1," in message
+        assert "Scan" in message
+
+    async def test_failed_explain_keeps_transaction_usable(self, test_session, seed_test_data, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.sql"), profile_queries(slow_ms=0):
+            await test_session.execute(text("SHOW server_version"))
+            assert "EXPLAIN failed" in caplog.records[-1].getMessage()
+            names = (await test_session.execute(select(Organization.name))).scalars().all()
+        assert len(names) == 3
+
+    async def test_repeated_shapes_reported(self, test_session, seed_test_data, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.sql"), \
+                profile_queries(slow_ms=10_000, repeat_threshold=3) as profile:
+            for org in seed_test_data["orgs"]:
+                await test_session.execute(select(Organization.name).where(Organization.id == org.id))
+            profile.report("test")
+        assert profile.repeated()[0][1] == 3
+        assert "possible N+1, statement executed 3 times" in caplog.text
+
+    async def test_middleware_adds_query_count(self, test_client, seed_test_data):
+        async with AsyncClient(transport=ASGITransport(app=QueryProfilingMiddleware(app)), base_url="http://test") as client:
+            response = await client.get(f"/organizations/{seed_test_data['orgs'][0].id}", headers=API_KEY_HEADER)
+        assert response.status_code == 200
+        assert int(response.headers["X-Query-Count"]) >= 1
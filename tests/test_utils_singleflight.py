@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.config.settings import settings
+from src.crud.organization import organization_crud, organization_flight
+from src.utils.singleflight import SingleFlight, freeze
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["result"]
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats() == {"leaders": 1, "followers": 4, "coalescing_ratio": 0.8, "in_flight": 0}
+
+    async def test_sequential_calls_run_again(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            return object()
+
+        assert await flight.do("key", fetch) is not await flight.do("key", fetch)
+        assert flight.followers == 0
+
+    async def test_error_propagates_to_all_callers(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("key", fetch))
+        follower = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == "done"
+
+    async def test_freeze(self):
+        assert freeze([1, [2, 3]]) == (1, (2, 3))
+        assert freeze({"b": [1], "a": 2}) == (("a", 2), ("b", (1,)))
+
+
+@pytest.mark.asyncio
+class TestCoalescedCRUD:
+
+    async def test_identical_dict_lookups_issue_one_query(self, test_session, seed_test_data, query_counter):
+        b1 = seed_test_data["buildings"][0]
+        followers = organization_flight.followers
+        with query_counter.expect(1):
+            results = await asyncio.gather(*(
+                organization_crud.get_by_building(test_session, b1.id, as_dicts=True) for _ in range(5)
+            ))
+        assert all(result == results[0] for result in results)
+        assert organization_flight.followers == followers + 4
+
+    async def test_orm_lookups_are_not_shared(self, test_session, seed_test_data):
+        o1 = seed_test_data["orgs"][0]
+        followers = organization_flight.followers
+        await organization_crud.get_by_id(test_session, o1.id)
+        assert organization_flight.followers == followers
+
+    async def test_cancelled_leader_does_not_break_followers(self, test_engine, seed_test_data):
+        b1 = seed_test_data["buildings"][0]
+        sessions = async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession)
+
+        async def request():
+            # Like get_db: the session is closed when the request is cancelled
+            async with sessions() as db:
+                return await organization_crud.get_by_building(db, b1.id, as_dicts=True)
+
+        async with test_engine.connect() as blocker:
+            # Keeps the lookup waiting in the database while the leader is cancelled
+            await blocker.execute(text("LOCK TABLE organizations, organization_search IN ACCESS EXCLUSIVE MODE"))
+            leader = asyncio.ensure_future(request())
+            await asyncio.sleep(0.1)
+            followers = [asyncio.ensure_future(request()) for _ in range(3)]
+            await asyncio.sleep(0.1)
+            leader.cancel()
+            await asyncio.sleep(0.1)
+            await blocker.rollback()
+
+        results = await asyncio.wait_for(asyncio.gather(*followers), timeout=5)
+        assert all(len(result) == 2 for result in results)
+        assert leader.cancelled()
+
+    async def test_lookups_on_different_engines_are_not_shared(self, test_engine, seed_test_data):
+        b1 = seed_test_data["buildings"][0]
+        other_engine = create_async_engine(settings.DB_URL)
+        try:
+            followers = organization_flight.followers
+            async with AsyncSession(test_engine) as primary, AsyncSession(other_engine) as replica:
+                await asyncio.gather(
+                    organization_crud.get_by_building(primary, b1.id, as_dicts=True),
+                    organization_crud.get_by_building(replica, b1.id, as_dicts=True),
+                )
+            assert organization_flight.followers == followers
+        finally:
+            await other_engine.dispose()